@@ -1,5 +1,15 @@
+import argparse
+import os
+import time
+
+from instrumentation import StageRecord, add_report_arguments, finish_report, report_from_args
+from ko_index import KOIndex
+
+# Campos de cada línea del archivo de consultas del modo por lotes (y de su encabezado opcional)
+QUERY_SPEC_HEADER = ('kos_file', 'min_kos', 'fixed_ko', 'output_file')
+
 # Leer y procesar el archivo de texto con especies y KOs asociados
-def find_species_with_min_kos_and_fixed_ko(file_name, kos_list, min_kos=3, fixed_ko=None):
+def find_species_with_min_kos_and_fixed_ko(file_name, kos_list, min_kos=3, fixed_ko=None, stage=None):
     """
     Encuentra especies que contienen un número mínimo de KOs de una lista especificada y un KO fijo opcional.
 
@@ -8,11 +18,12 @@ def find_species_with_min_kos_and_fixed_ko(file_name, kos_list, min_kos=3, fixed
         kos_list (set): Conjunto de identificadores de KOs de interés.
         min_kos (int): Número mínimo de KOs que una especie debe tener de la lista especificada (default: 3).
         fixed_ko (str): KO fijo que cada especie debe tener para ser incluida en los resultados.
+        stage (StageRecord): Mediciones donde sumar las líneas leídas (opcional).
 
     Returns:
         list: Especies que cumplen con los criterios de selección.
     """
-    
+
     matching_species = []
     with open(file_name, 'r') as file:
         lines = file.readlines()
@@ -33,6 +44,8 @@ def find_species_with_min_kos_and_fixed_ko(file_name, kos_list, min_kos=3, fixed
             if len(matching_kos) >= min_kos:
                 matching_species.append(line.strip())  # Guardar la línea completa si cumple con los criterios
 
+    if stage is not None:
+        stage.add_records(len(lines), os.path.getsize(file_name))
     return matching_species
 
 # Leer la lista de KOs de interés desde un archivo de texto
@@ -52,39 +65,214 @@ def load_kos_from_file(file_path):
             kos_set.add(line.strip())  # Agregar cada KO, eliminando espacios en blanco
     return kos_set
 
-# Cargar la lista de KOs desde un archivo de texto proporcionado por el usuario
-kos_file = input("Ingrese el nombre del archivo que contiene la lista de KOs (un KO por línea): ")
-kos_list = load_kos_from_file(kos_file)
-
-# Definir el KO fijo que todas las especies deben tener
-fixed_ko = input("Ingrese el KO fijo requerido (o presione Enter para omitir): ").strip() or None
-
-# Solicitar archivo de entrada y número mínimo de KOs, y ejecutar la búsqueda
-file_name = input("Ingrese el nombre del archivo de entrada con los datos de especies y KOs: ")
-min_kos = int(input("Ingrese el número mínimo de KOs que una especie debe tener de la lista: "))
-matching_species = find_species_with_min_kos_and_fixed_ko(file_name, kos_list, min_kos, fixed_ko)
-
-# Imprimir o guardar las especies coincidentes junto con el contador
-species_count = len(matching_species)  # Contar cuántas especies coinciden con los criterios
-
-# Imprimir el resultado en consola
-if species_count > 0:
-    print(f"Número de coincidencias con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}': {species_count}")
-    print("Lista de coincidencias:")
-    for line in matching_species:
-        print(line)  # Imprime la línea completa original
-else:
-    print(f"No se encontraron especies con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}'.")
-
-# Guardar el resultado en un archivo .txt con las líneas originales
-output_file = input("Ingrese el nombre del archivo de salida para guardar los resultados: ")
-with open(output_file, 'w') as output:
-    output.write(f"Número de especies con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}': {species_count}\n")
+# Leer las consultas del modo por lotes desde un archivo tabulado
+def load_query_specs(file_path):
+    """
+    Carga las consultas del modo por lotes desde un archivo separado por tabuladores.
+
+    Cada línea contiene el archivo con la lista de KOs, el número mínimo de KOs, el KO fijo
+    ('-' o vacío para omitirlo) y el nombre del archivo de salida. Se ignoran las líneas vacías,
+    los comentarios que empiezan por '#' y un encabezado opcional en la primera línea de datos
+    cuyos campos sean exactamente los de QUERY_SPEC_HEADER.
+
+    Args:
+        file_path (str): Ruta del archivo de consultas.
+
+    Returns:
+        list: Lista de diccionarios con las claves 'kos_file', 'kos_list', 'min_kos', 'fixed_ko' y 'output_file'.
+    """
+    queries = []
+    first = True
+    with open(file_path, 'r') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip() or line.startswith('#'):
+                continue
+            fields = [field.strip() for field in line.rstrip('\n').split('\t')]
+            if first and tuple(fields) == QUERY_SPEC_HEADER:
+                first = False
+                continue
+            first = False
+            if len(fields) != len(QUERY_SPEC_HEADER):
+                raise ValueError(f"{file_path}:{line_number}: se esperaban {len(QUERY_SPEC_HEADER)} campos separados "
+                                 f"por tabuladores ({', '.join(QUERY_SPEC_HEADER)}) y hay {len(fields)}")
+            kos_file, min_kos, fixed_ko, output_file = fields
+            queries.append({
+                'kos_file': kos_file,
+                'kos_list': load_kos_from_file(kos_file),
+                'min_kos': int(min_kos),
+                'fixed_ko': fixed_ko if fixed_ko not in ('', '-') else None,
+                'output_file': output_file,
+            })
+    return queries
+
+# Resolver varias consultas con una sola lectura del archivo de especies y KOs
+def find_species_for_queries(file_name, queries, stage=None):
+    """
+    Encuentra las especies que cumplen los criterios de cada consulta leyendo el archivo una sola vez.
+
+    Para cada KO se guarda la lista de consultas que lo incluyen, de modo que el coste por línea
+    depende del número de KOs de la línea y de las consultas afectadas, no del total de consultas.
+
+    Args:
+        file_name (str): Nombre del archivo de entrada que contiene datos de especies y KOs.
+        queries (list): Consultas con las claves 'kos_list', 'min_kos' y 'fixed_ko'.
+        stage (StageRecord): Mediciones donde sumar las líneas leídas (opcional).
+
+    Returns:
+        list: Para cada consulta, lista de líneas completas de las especies que cumplen los criterios.
+    """
+    # Consultas que incluyen cada KO
+    queries_by_ko = {}
+    for index, query in enumerate(queries):
+        for ko in query['kos_list']:
+            queries_by_ko.setdefault(ko, []).append(index)
+    # Consultas que cualquier especie puede cumplir sin tener KOs de la lista
+    always_candidates = [index for index, query in enumerate(queries) if query['min_kos'] <= 0]
+
+    results = [[] for _ in queries]
+    line_count = 0
+    with open(file_name, 'r') as file:
+        for line in file:
+            line_count += 1
+            parts = line.split()
+            if not parts:
+                continue
+            ko_set = set(parts[:-1])  # Todos los KOs de la línea (excluyendo el nombre de la especie)
+
+            # Contar los KOs coincidentes de cada consulta afectada
+            counts = dict.fromkeys(always_candidates, 0)
+            for ko in ko_set:
+                for index in queries_by_ko.get(ko, ()):
+                    counts[index] = counts.get(index, 0) + 1
+
+            for index, count in counts.items():
+                query = queries[index]
+                if query['fixed_ko'] and query['fixed_ko'] not in ko_set:
+                    continue
+                if count >= query['min_kos']:
+                    results[index].append(line.strip())
+
+    if stage is not None:
+        stage.add_records(line_count, os.path.getsize(file_name))
+    return results
+
+# Guardar el resultado de una consulta con las líneas originales
+def write_matching_species(output_file, matching_species, min_kos, fixed_ko):
+    """
+    Guarda las especies coincidentes y el contador en un archivo de texto.
+
+    Args:
+        output_file (str): Nombre del archivo de salida.
+        matching_species (list): Líneas completas de las especies que cumplen los criterios.
+        min_kos (int): Número mínimo de KOs usado en la búsqueda.
+        fixed_ko (str): KO fijo usado en la búsqueda, o None.
+    """
+    species_count = len(matching_species)
+    with open(output_file, 'w') as output:
+        output.write(f"Número de especies con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}': {species_count}\n")
+        if species_count > 0:
+            output.write("Lista de especies:\n")
+            for line in matching_species:
+                output.write(line + '\n')  # Guardar la línea completa tal cual estaba
+        else:
+            output.write(f"No se encontraron especies con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}'.\n")
+
+# Ejecutar todas las consultas de un archivo de consultas y guardar un resumen
+def run_batch(file_name, spec_file, summary_file, index_dir=None, stage=None):
+    """
+    Ejecuta el modo por lotes: un archivo de resultados por consulta y un resumen en formato TSV.
+
+    Args:
+        file_name (str): Nombre del archivo de entrada con los datos de especies y KOs.
+        spec_file (str): Archivo de consultas (ver load_query_specs).
+        summary_file (str): Archivo TSV donde se guarda el número de especies de cada consulta.
+        index_dir (str): Carpeta del índice de bits de KOs; si se indica, cada consulta usa el índice.
+        stage (StageRecord): Mediciones de la etapa (opcional).
+    """
+    stage = stage or StageRecord('batch')
+    with stage.step('load_queries'):
+        queries = load_query_specs(spec_file)
+    stage.details['queries'] = len(queries)
+    # Los registros de la etapa son las líneas (especies) del archivo de entrada
+    start, records = time.perf_counter(), stage.records
+    if index_dir:
+        index = KOIndex.open_or_build(file_name, index_dir)
+        results = [index.find_species(query['kos_list'], query['min_kos'], query['fixed_ko']) for query in queries]
+        stage.add_records(len(index), os.path.getsize(file_name))
+    else:
+        results = find_species_for_queries(file_name, queries, stage)
+    stage.add_step('ko_scan', time.perf_counter() - start, records=stage.records - records,
+                   nbytes=os.path.getsize(file_name))
+
+    with stage.step('write_results'), open(summary_file, 'w') as summary:
+        summary.write('output_file\tkos_file\tmin_kos\tfixed_ko\tspecies_count\n')
+        for query, matching_species in zip(queries, results):
+            write_matching_species(query['output_file'], matching_species, query['min_kos'], query['fixed_ko'])
+            summary.write(f"{query['output_file']}\t{query['kos_file']}\t{query['min_kos']}\t{query['fixed_ko'] or '-'}\t{len(matching_species)}\n")
+            print(f"{query['output_file']}: {len(matching_species)} especies")
+
+    print(f"Se resolvieron {len(queries)} consultas. El resumen se guardó en '{summary_file}'")
+
+def main():
+    # Opciones de línea de comandos
+    parser = argparse.ArgumentParser(description="Filtro de especies por presencia de KOs.")
+    parser.add_argument('--index', metavar='CARPETA',
+                        help="Carpeta del índice de bits de KOs; se construye si no existe o si el archivo de entrada cambió")
+    parser.add_argument('--batch', metavar='CONSULTAS',
+                        help="Archivo TSV de consultas (archivo de KOs, mínimo de KOs, KO fijo, archivo de salida)")
+    parser.add_argument('--input', metavar='ARCHIVO', help="Archivo de entrada con los datos de especies y KOs")
+    parser.add_argument('--summary', default='batch_summary.tsv',
+                        help="Archivo TSV con el número de especies de cada consulta (default: batch_summary.tsv)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report = report_from_args('C1', args)
+
+    if args.batch:
+        file_name = args.input or input("Ingrese el nombre del archivo de entrada con los datos de especies y KOs: ")
+        with report.stage('batch') as stage:
+            run_batch(file_name, args.batch, args.summary, args.index, stage)
+        finish_report(report, args)
+        return
+
+    # Cargar la lista de KOs desde un archivo de texto proporcionado por el usuario
+    kos_file = input("Ingrese el nombre del archivo que contiene la lista de KOs (un KO por línea): ")
+    kos_list = load_kos_from_file(kos_file)
+
+    # Definir el KO fijo que todas las especies deben tener
+    fixed_ko = input("Ingrese el KO fijo requerido (o presione Enter para omitir): ").strip() or None
+
+    # Solicitar archivo de entrada y número mínimo de KOs, y ejecutar la búsqueda
+    file_name = args.input or input("Ingrese el nombre del archivo de entrada con los datos de especies y KOs: ")
+    min_kos = int(input("Ingrese el número mínimo de KOs que una especie debe tener de la lista: "))
+    with report.stage('ko_filter') as stage:
+        if args.index:
+            # Usar el índice de bits, construyéndolo si no existe o si el archivo de entrada cambió
+            index = KOIndex.open_or_build(file_name, args.index)
+            matching_species = index.find_species(kos_list, min_kos, fixed_ko)
+            stage.add_records(len(index), os.path.getsize(file_name))
+        else:
+            # Las líneas se cuentan durante la misma lectura del archivo
+            matching_species = find_species_with_min_kos_and_fixed_ko(file_name, kos_list, min_kos, fixed_ko, stage)
+        stage.details['matches'] = len(matching_species)
+
+    # Imprimir o guardar las especies coincidentes junto con el contador
+    species_count = len(matching_species)  # Contar cuántas especies coinciden con los criterios
+
+    # Imprimir el resultado en consola
     if species_count > 0:
-        output.write("Lista de especies:\n")
+        print(f"Número de coincidencias con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}': {species_count}")
+        print("Lista de coincidencias:")
         for line in matching_species:
-            output.write(line + '\n')  # Guardar la línea completa tal cual estaba
+            print(line)  # Imprime la línea completa original
     else:
-        output.write(f"No se encontraron especies con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}'.\n")
+        print(f"No se encontraron especies con al menos {min_kos} KOs de los especificados y el KO fijo '{fixed_ko}'.")
+
+    # Guardar el resultado en un archivo .txt con las líneas originales
+    output_file = input("Ingrese el nombre del archivo de salida para guardar los resultados: ")
+    write_matching_species(output_file, matching_species, min_kos, fixed_ko)
+
+    print(f"Los resultados se guardaron en '{output_file}'")
+    finish_report(report, args)
 
-print(f"Los resultados se guardaron en '{output_file}'")
+if __name__ == '__main__':
+    main()
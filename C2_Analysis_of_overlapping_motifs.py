@@ -1,33 +1,24 @@
+import argparse
+import os
 import re
 
+from instrumentation import add_report_arguments, finish_report, report_from_args
+from motif_models import DEFAULT_PVALUE, load_motif_models
+from overlap_analysis import run_overlap_analysis
+from sequence_io import iter_fasta
+
 # Función para cargar secuencias en formato FASTA
 def load_fasta(filename):
     """
     Carga secuencias de un archivo en formato FASTA.
 
     Args:
-        filename (str): Nombre del archivo FASTA.
+        filename (str): Nombre del archivo FASTA (puede estar comprimido con gzip).
 
     Returns:
         dict: Diccionario con identificadores de secuencia como claves y secuencias como valores.
     """
-    sequences = {}
-    with open(filename, 'r') as file:
-        current_seq_id = None
-        current_seq = []
-        for line in file:
-            line = line.strip()
-            if line.startswith(">"):
-                if current_seq_id:
-                    sequences[current_seq_id] = ''.join(current_seq)
-                current_seq_id = line[1:]  # Guardar el identificador sin el ">"
-                current_seq = []
-            else:
-                current_seq.append(line)
-        # Agregar la última secuencia
-        if current_seq_id:
-            sequences[current_seq_id] = ''.join(current_seq)
-    return sequences
+    return dict(iter_fasta(filename))
 
 # Función para cargar motivos desde un archivo de texto
 def load_motifs(filename):
@@ -71,64 +62,62 @@ def check_superposition(pos1, pos2):
     """
     return pos1[0] < pos2[1] and pos1[1] > pos2[0]
 
-# Solicitar los nombres de archivos de entrada al usuario
-fasta_file = input("Ingrese el nombre del archivo de secuencias en formato FASTA: ")
-motif_file1 = input("Ingrese el nombre del archivo con el primer conjunto de motivos: ")
-motif_file2 = input("Ingrese el nombre del archivo con el segundo conjunto de motivos: ")
-
-# Cargar secuencias y motivos desde los archivos
-sequences = load_fasta(fasta_file)
-motifs1 = load_motifs(motif_file1)
-motifs2 = load_motifs(motif_file2)
-
-# Convertir secuencias y motivos a minúsculas para evitar problemas de sensibilidad de mayúsculas/minúsculas
-sequences = {seq_id: seq.lower() for seq_id, seq in sequences.items()}
-motifs1 = [motif.lower() for motif in motifs1]
-motifs2 = [motif.lower() for motif in motifs2]
-
-# Solicitar nombres de archivos de salida al usuario
-output_filename_with_superpositions = input("Ingrese el nombre del archivo de salida para secuencias con superposiciones: ")
-output_filename_without_superpositions = input("Ingrese el nombre del archivo de salida para secuencias sin superposiciones: ")
-
-# Abrir archivos de salida para guardar los resultados
-with open(output_filename_with_superpositions, "w") as output_file_with, open(output_filename_without_superpositions, "w") as output_file_without:
-    # Recorrer todas las secuencias
-    for seq_id, seq in sequences.items():
-        found_overlap = False  # Bandera para verificar si se encontró alguna superposición
-        output_file_with.write(f"Secuencia '{seq_id}':\n")
-        output_file_without.write(f"Secuencia '{seq_id}':\n")
-        
-        # Buscar posiciones de motivos del primer archivo en la secuencia actual
-        motif_positions1 = {}
-        for motif1 in motifs1:
-            positions1 = find_motif_positions(seq, motif1)
-            if positions1:
-                motif_positions1[motif1] = positions1
-        
-        # Buscar posiciones de motivos del segundo archivo en la secuencia actual
-        motif_positions2 = {}
-        for motif2 in motifs2:
-            positions2 = find_motif_positions(seq, motif2)
-            if positions2:
-                motif_positions2[motif2] = positions2
-
-        # Verificar superposiciones entre todos los motivos de ambos archivos encontrados
-        for motif1, positions1 in motif_positions1.items():
-            for motif2, positions2 in motif_positions2.items():
-                for pos1 in positions1:
-                    for pos2 in positions2:
-                        if check_superposition(pos1, pos2):
-                            result = (f"  Superposición encontrada:\n"
-                                      f"  Motivo 1 '{motif1}' en {pos1} y Motivo 2 '{motif2}' en {pos2}\n"
-                                      f"  Secuencia solapada: {seq[min(pos1[0], pos2[0]):max(pos1[1], pos2[1])]}\n")
-                            output_file_with.write(result)
-                            found_overlap = True
-        
-        # Escribir en el archivo correspondiente según si hay superposición o no
-        if not found_overlap:
-            output_file_without.write(f"  No se encontraron superposiciones en la secuencia '{seq_id}'.\n")
-        else:
-            # Si se encontró alguna superposición, escribir la secuencia también en el archivo correspondiente
-            output_file_with.write(f"Secuencia completa: {seq}\n\n")
-
-print(f"Análisis completado. Los resultados se han guardado en '{output_filename_with_superpositions}' y '{output_filename_without_superpositions}'.")
+def main():
+    # Opciones de línea de comandos
+    parser = argparse.ArgumentParser(description="Análisis de superposiciones entre dos conjuntos de motivos.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de procesos para repartir las secuencias (default: 1, ejecución en serie)")
+    parser.add_argument('--store', metavar='ALMACEN',
+                        help="Almacén de secuencias empaquetado (creado con sequence_store.py) en lugar del archivo FASTA")
+    parser.add_argument('--pvalue', type=float, default=DEFAULT_PVALUE,
+                        help="P-valor máximo de los sitios de las matrices de archivos en formato MEME (default: 1e-4)")
+    parser.add_argument('--cache', metavar='ARCHIVO',
+                        help="Archivo SQLite con la caché de posiciones de motivos por secuencia")
+    parser.add_argument('--cache-size', type=int, default=1024, metavar='MB',
+                        help="Tamaño máximo de la caché en MB (default: 1024)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report = report_from_args('C2', args)
+
+    # Solicitar los nombres de archivos de entrada al usuario
+    fasta_file = None if args.store else input("Ingrese el nombre del archivo de secuencias en formato FASTA: ")
+    motif_file1 = input("Ingrese el nombre del archivo con el primer conjunto de motivos: ")
+    motif_file2 = input("Ingrese el nombre del archivo con el segundo conjunto de motivos: ")
+
+    # Leer las secuencias como flujo, convertidas a minúsculas durante la lectura, y cargar los motivos
+    sequences = iter_fasta(fasta_file, lowercase=True) if fasta_file else None
+    # Cada archivo puede contener motivos literales, consensos IUPAC o matrices en formato MEME;
+    # los motivos de texto se convierten a minúsculas para evitar problemas de sensibilidad de mayúsculas/minúsculas
+    # Los nombres de las matrices llevan el nombre de su archivo; si dos archivos distintos se
+    # llaman igual, se usa la ruta completa para que sus matrices no compartan nombre
+    namespaces = [os.path.basename(motif_file1), os.path.basename(motif_file2)]
+    if namespaces[0] == namespaces[1] and os.path.realpath(motif_file1) != os.path.realpath(motif_file2):
+        namespaces = [motif_file1, motif_file2]
+    with report.stage('load_motifs') as stage:
+        motifs1, models1 = load_motif_models(motif_file1, args.pvalue, namespaces[0])
+        motifs2, models2 = load_motif_models(motif_file2, args.pvalue, namespaces[1])
+        stage.add_records(len(motifs1) + len(motifs2))
+
+    # Solicitar nombres de archivos de salida al usuario
+    output_filename_with_superpositions = input("Ingrese el nombre del archivo de salida para secuencias con superposiciones: ")
+    output_filename_without_superpositions = input("Ingrese el nombre del archivo de salida para secuencias sin superposiciones: ")
+
+    # Abrir archivos de salida y analizar todas las secuencias, en serie o en paralelo
+    with report.stage('overlap_analysis') as stage, \
+            open(output_filename_with_superpositions, "w") as output_file_with, open(output_filename_without_superpositions, "w") as output_file_without:
+        cache_stats = run_overlap_analysis(sequences, motifs1, motifs2, output_file_with, output_file_without,
+                                           workers=args.workers, cache_path=args.cache,
+                                           cache_max_bytes=args.cache_size * 1024 * 1024, store_path=args.store,
+                                           models=models1 + models2, stage=stage)
+        if cache_stats is not None:
+            stage.details['cache'] = cache_stats
+
+    print(f"Análisis completado. Los resultados se han guardado en '{output_filename_with_superpositions}' y '{output_filename_without_superpositions}'.")
+    if cache_stats is not None:
+        lookups = cache_stats['hits'] + cache_stats['misses']
+        hit_rate = cache_stats['hits'] / lookups * 100 if lookups else 0
+        print(f"Caché de motivos: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos ({hit_rate:.1f}% de aciertos).")
+    finish_report(report, args)
+
+if __name__ == '__main__':
+    main()
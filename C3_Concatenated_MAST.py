@@ -1,5 +1,7 @@
-import subprocess
-import os
+import argparse
+
+from instrumentation import add_report_arguments, finish_report, report_from_args
+from mast_scheduler import MANIFEST_NAME, schedule_mast_jobs
 
 # Función para leer los IDs de especies desde un archivo
 def read_species_ids(file_path):
@@ -17,45 +19,60 @@ def read_species_ids(file_path):
     return species_ids
 
 # Función para ejecutar MAST en cada especie con su propio directorio de salida
-def run_mast_for_species(meme_file, species_ids, species_folder, output_base_folder):
+def run_mast_for_species(meme_file, species_ids, species_folder, output_base_folder, jobs=1, stage=None):
     """
     Ejecuta MAST para cada especie, utilizando archivos específicos y generando resultados en directorios separados.
 
+    Se ejecutan hasta 'jobs' procesos de MAST a la vez. El código de salida, la duración y los errores de
+    cada trabajo se guardan en el registro 'mast_manifest.json' de la carpeta base, y las especies con un
+    resultado terminado se omiten, de modo que una ejecución interrumpida puede reanudarse.
+
     Args:
         meme_file (str): Ruta del archivo de motivos en formato MEME.
         species_ids (list): Lista de IDs de especies.
         species_folder (str): Carpeta que contiene los archivos .ur de cada especie.
         output_base_folder (str): Carpeta base donde se crearán subcarpetas con los resultados de MAST.
+        jobs (int): Número máximo de procesos de MAST simultáneos (default: 1).
+        stage (StageRecord): Mediciones de los trabajos ejecutados (opcional).
+
+    Returns:
+        tuple: Registro de trabajos por especie y lista de las especies ejecutadas en esta llamada.
     """
-    for species_id in species_ids:
-        species_ur_file = os.path.join(species_folder, f'{species_id}.ur')
-        output_species_folder = os.path.join(output_base_folder, f'{species_id}_mast_out')
-
-        if os.path.exists(species_ur_file):
-            print(f"Ejecutando MAST para {species_id}...")
-
-            # Crear el directorio de salida para la especie si no existe
-            os.makedirs(output_species_folder, exist_ok=True)
-
-            # Ejecutar el comando MAST con el archivo meme.txt y el archivo .ur de la especie
-            subprocess.run(
-                ['mast', meme_file, species_ur_file, '-oc', output_species_folder],
-                stdout=subprocess.PIPE,  # Captura la salida estándar
-                stderr=subprocess.PIPE  # Captura los errores
-            )
-        else:
-            print(f"Advertencia: El archivo {species_ur_file} no existe. Saltando...")
-
-# Solicitar parámetros de entrada al usuario
-meme_file = input("Ingrese la ruta del archivo de motivos en formato MEME: ")
-species_file = input("Ingrese la ruta del archivo con los IDs de las especies: ")
-species_folder = input("Ingrese la carpeta donde se encuentran los archivos .ur de las especies: ")
-output_base_folder = input("Ingrese la carpeta base para los resultados de MAST: ")
-
-# Leer los IDs de especies
-species_ids = read_species_ids(species_file)
-
-# Ejecutar MAST para cada especie y guardar los resultados en directorios separados
-run_mast_for_species(meme_file, species_ids, species_folder, output_base_folder)
-
-print("Ejecución de MAST completada. Los resultados se han guardado en directorios separados.")
+    return schedule_mast_jobs(meme_file, species_ids, species_folder, output_base_folder, jobs=jobs, stage=stage)
+
+def main():
+    # Opciones de línea de comandos
+    parser = argparse.ArgumentParser(description="Ejecución de MAST para una lista de especies.")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Número máximo de procesos de MAST simultáneos (default: 1)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report = report_from_args('C3', args)
+
+    # Solicitar parámetros de entrada al usuario
+    meme_file = input("Ingrese la ruta del archivo de motivos en formato MEME: ")
+    species_file = input("Ingrese la ruta del archivo con los IDs de las especies: ")
+    species_folder = input("Ingrese la carpeta donde se encuentran los archivos .ur de las especies: ")
+    output_base_folder = input("Ingrese la carpeta base para los resultados de MAST: ")
+
+    # Leer los IDs de especies
+    species_ids = read_species_ids(species_file)
+
+    # Ejecutar MAST para cada especie y guardar los resultados en directorios separados
+    with report.stage('mast') as stage:
+        # Cada trabajo ejecutado se registra como subetapa 'mast_job' con su tiempo por especie
+        manifest, ran = run_mast_for_species(meme_file, species_ids, species_folder, output_base_folder,
+                                             jobs=args.jobs, stage=stage)
+        # Solo cuentan los trabajos ejecutados, no las especies omitidas por estar terminadas
+        stage.add_records(len(ran))
+        stage.details['skipped'] = len(species_ids) - len(ran)
+
+    failed = [species_id for species_id in species_ids if manifest.get(species_id, {}).get('status') == 'failed']
+    stage.details['failed'] = failed
+    print("Ejecución de MAST completada. Los resultados se han guardado en directorios separados.")
+    if failed:
+        print(f"MAST falló para {len(failed)} especies; consulte '{MANIFEST_NAME}' para ver los errores.")
+    finish_report(report, args)
+
+if __name__ == '__main__':
+    main()
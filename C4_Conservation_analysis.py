@@ -1,5 +1,8 @@
-# Importar módulo necesario para manejo de archivos
-import os
+# Importar módulos necesarios para las opciones y la matriz de conservación
+import argparse
+
+from instrumentation import add_report_arguments, finish_report, report_from_args
+from conservation_matrix import WRITERS, build_presence_matrix, conservation_counts
 
 # Función para leer especies desde un archivo
 def read_species(filename):
@@ -15,46 +18,51 @@ def read_species(filename):
     with open(filename, 'r') as f:
         return set(line.strip() for line in f)
 
-# Leer el archivo principal con la lista completa de especies
-main_species_file = input("Ingrese la ruta del archivo de la lista principal de especies: ")
-main_species = sorted(read_species(main_species_file))  # Ordenar alfabéticamente para salida ordenada
-
-# Solicitar al usuario las rutas de archivo para cada grupo de especies
-species_files = {
-    'SigE_KO': input("Ingrese la ruta del archivo para 'SigE_KO': "),
-    'SigE_motivo': input("Ingrese la ruta del archivo para 'SigE_motivo': "),
-    'SpoIIIAA': input("Ingrese la ruta del archivo para 'SpoIIIAA': "),
-    'SpoIIID_KO': input("Ingrese la ruta del archivo para 'SpoIIID_KO': "),
-    'SpoIIID_motivo': input("Ingrese la ruta del archivo para 'SpoIIID_motivo': ")
-}
-
-# Leer los archivos de cada grupo y almacenar las especies presentes en cada archivo
-species_dict = {key: read_species(file) for key, file in species_files.items()}
-
-# Inicializar contadores para cada grupo para llevar registro de las especies conservadas
-conservacion = {key: 0 for key in species_files.keys()}
-
-# Nombre del archivo de salida donde se guardará el resultado
-output_file = input("Ingrese el nombre del archivo de salida para guardar los resultados: ")
-
-# Escribir el encabezado y los datos de conservación en el archivo de salida
-with open(output_file, 'w') as f:
-    # Escribir el encabezado con los nombres de cada grupo
-    f.write('ID\tSigE_KO\tSigE_motivo\tSpoIIIAA\tSpoIIID_KO\tSpoIIID_motivo\n')
-    
-    # Para cada especie en la lista principal, verificar su presencia en cada grupo y registrar el resultado
-    for species in main_species:
-        row = [species]
-        for key in species_dict.keys():
-            # Comprobar si la especie está en el grupo actual
-            if species in species_dict[key]:
-                row.append('1')  # Agregar '1' si la especie está presente
-                conservacion[key] += 1  # Aumentar el contador para el grupo correspondiente
-            else:
-                row.append('0')  # Agregar '0' si la especie no está presente
-        f.write('\t'.join(row) + '\n')  # Escribir la línea de datos en el archivo
-
-# Mostrar los resultados de conservación en la consola
-print("Conservación por cada grupo:")
-for group, count in conservacion.items():
-    print(f"{group}: {count} especies conservadas")
+# Grupos de especies que se solicitan al usuario si no se indican con --group
+DEFAULT_GROUPS = ['SigE_KO', 'SigE_motivo', 'SpoIIIAA', 'SpoIIID_KO', 'SpoIIID_motivo']
+
+def main():
+    # Opciones de línea de comandos
+    parser = argparse.ArgumentParser(description="Matriz de conservación de especies por grupo.")
+    parser.add_argument('--group', action='append', default=[], metavar='NOMBRE=RUTA',
+                        help="Grupo de especies y archivo con su lista (se puede repetir; por defecto se solicitan los cinco grupos habituales)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='tsv',
+                        help="Formato del archivo de salida (default: tsv)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report = report_from_args('C4', args)
+
+    # Leer el archivo principal con la lista completa de especies
+    main_species_file = input("Ingrese la ruta del archivo de la lista principal de especies: ")
+    main_species = read_species(main_species_file)
+
+    # Rutas de archivo para cada grupo de especies, desde la línea de comandos o solicitadas al usuario
+    if args.group:
+        species_files = dict(spec.split('=', 1) for spec in args.group)
+    else:
+        species_files = {key: input(f"Ingrese la ruta del archivo para '{key}': ") for key in DEFAULT_GROUPS}
+
+    # Leer los archivos de cada grupo y almacenar las especies presentes en cada archivo
+    with report.stage('read_species') as stage:
+        species_dict = {key: read_species(file) for key, file in species_files.items()}
+        stage.add_records(len(main_species) + sum(len(group) for group in species_dict.values()))
+
+    # Nombre del archivo de salida donde se guardará el resultado
+    output_file = input("Ingrese el nombre del archivo de salida para guardar los resultados: ")
+
+    # Construir la matriz de presencia/ausencia (especies ordenadas alfabéticamente) y guardarla
+    with report.stage('build_matrix') as stage:
+        species, groups, matrix = build_presence_matrix(main_species, species_dict)
+        stage.add_records(len(species))
+    with report.stage('write_matrix') as stage:
+        WRITERS[args.format](output_file, species, groups, matrix)
+        stage.add_records(len(species))
+
+    # Mostrar los resultados de conservación en la consola, a partir de las sumas por columna
+    print("Conservación por cada grupo:")
+    for group, count in conservation_counts(groups, matrix).items():
+        print(f"{group}: {count} especies conservadas")
+    finish_report(report, args)
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,11 @@
+import argparse
 import csv
+import os
 from collections import defaultdict
 
+from instrumentation import add_report_arguments, finish_report, report_from_args
+from class_aggregation import DEFAULT_GROUP_BY, aggregate_by_group, read_combined_columns, write_aggregation
+
 # Función para leer el archivo combinado de KOs y motivos
 def read_combined_file(filename):
     """
@@ -107,17 +112,39 @@ def write_conservation_output(conservation_by_class, output_filename):
         # Escribir totales al final del archivo
         f_out.write(f'\nTotal\t{total_sigE_KO}\t{total_spoIIIAA_KO}\t{total_spoIIID_KO}\t{total_sigE_motivo}\t{total_spoIIID_motivo}\n')
 
-# Solicitar archivos de entrada y salida al usuario
-input_combined_file = input("Ingrese el nombre del archivo combinado de KOs y motivos (ejemplo: 'Dataframe.txt'): ")  # Archivo de entrada
-output_combined_file = input("Ingrese el nombre del archivo de salida para los resultados combinados (ejemplo: 'conservation_combined.txt'): ")  # Archivo de salida
-
-# Leer los datos combinados del archivo
-combined_data = read_combined_file(input_combined_file)
-
-# Contar la conservación por clase, combinando KOs y motivos
-conservation_by_class_combined = count_conservation_by_class(combined_data)
-
-# Escribir los resultados en un archivo de salida único con porcentajes
-write_conservation_output(conservation_by_class_combined, output_combined_file)
-
-print("Conservación de KOs y motivos por clase completada. Los resultados se han guardado en el archivo de salida combinado.")
+def main():
+    # Opciones de línea de comandos
+    parser = argparse.ArgumentParser(description="Conservación de KOs y motivos por clase taxonómica.")
+    parser.add_argument('--group-by', action='append', metavar='COLUMNA',
+                        help="Columna taxonómica por la que agrupar, p. ej. 'Phylum' (se puede repetir; default: 'KEGG Class')")
+    parser.add_argument('--value-column', action='append', metavar='COLUMNA',
+                        help="Columna de genes o motivos a sumar (se puede repetir; default: columnas '_KO' y '_motivo')")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report = report_from_args('C5', args)
+    group_by = tuple(args.group_by) if args.group_by else DEFAULT_GROUP_BY
+
+    # Solicitar archivos de entrada y salida al usuario
+    input_combined_file = input("Ingrese el nombre del archivo combinado de KOs y motivos (ejemplo: 'Dataframe.txt'): ")  # Archivo de entrada
+    output_combined_file = input("Ingrese el nombre del archivo de salida para los resultados combinados (ejemplo: 'conservation_combined.txt'): ")  # Archivo de salida
+
+    # Leer los datos combinados en columnas, detectando las columnas de genes y motivos del encabezado
+    with report.stage('read_table') as stage:
+        combined_table = read_combined_columns(input_combined_file, group_by, args.value_column)
+        stage.add_records(len(combined_table['keys']), os.path.getsize(input_combined_file))
+
+    # Sumar la conservación por clase y calcular los porcentajes de forma vectorizada
+    with report.stage('aggregate') as stage:
+        conservation_by_class_combined = aggregate_by_group(combined_table)
+        stage.add_records(len(combined_table['keys']))
+
+    # Escribir los resultados en un archivo de salida único con porcentajes
+    with report.stage('write_output') as stage:
+        write_aggregation(conservation_by_class_combined, output_combined_file)
+        stage.add_records(len(conservation_by_class_combined['groups']))
+
+    print("Conservación de KOs y motivos por clase completada. Los resultados se han guardado en el archivo de salida combinado.")
+    finish_report(report, args)
+
+if __name__ == '__main__':
+    main()
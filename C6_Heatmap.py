@@ -0,0 +1,277 @@
+import argparse
+import os
+
+import numpy as np
+
+import matplotlib
+matplotlib.use('Agg')  # Renderizado sin pantalla (servidores Linux)
+import matplotlib.pyplot as plt
+
+from conservation_matrix import read_presence_npz
+from instrumentation import add_report_arguments, finish_report, report_from_args
+
+# Número máximo de celdas con el valor escrito dentro (como geom_text en C6_Heatmap.r)
+ANNOTATE_MAX_CELLS = 400
+
+# Número máximo de etiquetas por eje; con más filas o columnas se omiten las etiquetas
+MAX_TICK_LABELS = 60
+
+# Número máximo de filas (o columnas) distintas que se agrupan con clustering jerárquico
+MAX_CLUSTER_ITEMS = 20000
+
+# Valores de la tabla de C5 que se pueden representar y sufijo de sus columnas
+# (al de 'pct_class' le siguen los nombres de las columnas de agrupación, p. ej. ' % by Class')
+CLASS_VALUES = {
+    'conserved': ' Conserved',
+    'pct_class': ' % by ',
+    'pct_total': ' % Total',
+}
+
+# Función para leer la tabla de conservación por clase de C5
+def read_class_table(filename, value='conserved'):
+    """
+    Lee la tabla de conservación por clase escrita por C5 (o por pipeline.py).
+
+    Args:
+        filename (str): Archivo de salida de C5.
+        value (str): Valores a leer: 'conserved' (número de especies), 'pct_class' o 'pct_total'.
+
+    Returns:
+        tuple: Etiquetas de las filas (clases), etiquetas de las columnas (genes y motivos)
+               y matriz float de forma (clases, columnas).
+    """
+    with open(filename, 'r') as f:
+        lines = f.read().splitlines()
+    header = lines[0].split('\t')
+    # Las columnas de agrupación son las anteriores a la primera columna de conservados
+    n_keys = next(index for index, name in enumerate(header) if name.endswith(' Conserved'))
+    suffix = CLASS_VALUES[value]
+    if value == 'pct_class':
+        suffix += ' / '.join(header[:n_keys])
+    columns = [index for index, name in enumerate(header) if name.endswith(suffix)]
+
+    row_labels, rows = [], []
+    for line in lines[1:]:
+        # La tabla termina en una línea vacía seguida de la fila de totales
+        if not line.strip():
+            break
+        fields = line.split('\t')
+        row_labels.append(' / '.join(fields[:n_keys]))
+        rows.append([float(fields[index]) for index in columns])
+    column_labels = [header[index][:-len(suffix)] for index in columns]
+    matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(columns))
+    return row_labels, column_labels, matrix
+
+# Función para leer la matriz de presencia/ausencia de C4
+def read_species_matrix(filename):
+    """
+    Lee la matriz de presencia/ausencia de C4, en formato TSV o NPZ.
+
+    Args:
+        filename (str): Archivo de salida de C4.
+
+    Returns:
+        tuple: Etiquetas de las filas (especies), etiquetas de las columnas (grupos) y matriz.
+    """
+    if filename.endswith('.npz'):
+        species, groups, matrix = read_presence_npz(filename)
+        return species.tolist(), groups, matrix
+    with open(filename, 'r') as f:
+        groups = f.readline().rstrip('\n').split('\t')[1:]
+        table = np.loadtxt(f, dtype=str, delimiter='\t', ndmin=2)
+    species = table[:, 0].tolist() if table.size else []
+    matrix = table[:, 1:].astype(np.uint8) if table.size else np.zeros((0, len(groups)), dtype=np.uint8)
+    return species, groups, matrix
+
+# Función para detectar si un archivo es la matriz de C4 o la tabla de C5
+def detect_source(filename):
+    """
+    Devuelve 'matrix' si el archivo es la matriz de especies de C4 y 'classes' si es la tabla de C5.
+    """
+    if filename.endswith('.npz'):
+        return 'matrix'
+    with open(filename, 'r') as f:
+        first_field = f.readline().split('\t', 1)[0]
+    return 'matrix' if first_field == 'ID' else 'classes'
+
+# Función para ordenar filas por clustering jerárquico
+def cluster_order(matrix, method='average', metric='euclidean'):
+    """
+    Calcula el orden de las filas según un clustering jerárquico (requiere scipy).
+
+    Las filas idénticas se agrupan antes del clustering, por lo que una matriz de
+    presencia/ausencia con muchas especies pero pocos patrones distintos se ordena rápido.
+
+    Args:
+        matrix (ndarray): Matriz cuyas filas se ordenan.
+        method (str): Método de enlace de scipy (default: 'average').
+        metric (str): Distancia entre filas (default: 'euclidean').
+
+    Returns:
+        ndarray: Índices de las filas en el orden del dendrograma.
+    """
+    try:
+        from scipy.cluster.hierarchy import leaves_list, linkage
+    except ImportError:
+        raise ImportError("Para el clustering jerárquico es necesario instalar scipy") from None
+    if len(matrix) < 3:
+        return np.arange(len(matrix))
+    patterns, inverse = np.unique(matrix, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    if len(patterns) > MAX_CLUSTER_ITEMS:
+        raise ValueError(f"Demasiadas filas distintas para el clustering ({len(patterns)} > {MAX_CLUSTER_ITEMS})")
+    if len(patterns) < 2:
+        return np.arange(len(matrix))
+    leaves = leaves_list(linkage(patterns.astype(np.float64), method=method, metric=metric))
+    # Posición de cada patrón en el dendrograma y orden estable de las filas por esa posición
+    rank = np.empty(len(leaves), dtype=np.int64)
+    rank[leaves] = np.arange(len(leaves))
+    return np.argsort(rank[inverse], kind='stable')
+
+# Función para reducir una matriz a un número máximo de filas promediando bloques
+def reduce_rows(matrix, max_rows):
+    """
+    Promedia bloques de filas consecutivas para que la matriz no tenga más filas que píxeles
+    la imagen; evita que matplotlib remuestree una imagen de millones de celdas.
+
+    Args:
+        matrix (ndarray): Matriz de valores.
+        max_rows (int): Número máximo de filas del resultado.
+
+    Returns:
+        ndarray: Matriz float con como mucho 'max_rows' filas.
+    """
+    n_rows = matrix.shape[0]
+    if n_rows <= max_rows:
+        return matrix
+    factor = -(-n_rows // max_rows)
+    padded = np.full((-(-n_rows // factor) * factor, matrix.shape[1]), np.nan)
+    padded[:n_rows] = matrix
+    return np.nanmean(padded.reshape(-1, factor, matrix.shape[1]), axis=1)
+
+# Función para dibujar el mapa de calor como una sola imagen
+def render_heatmap(matrix, row_labels, column_labels, output_file, title="Heatmap de conservación de KOs y Motivos por clase",
+                   xlabel="KOs y Motivos", ylabel="Clase", colorbar_label="Conservación\n(Número de especies)",
+                   cluster_rows=False, cluster_columns=False, annotate=None, dpi=300, figsize=(11, 8), cmap='viridis_r'):
+    """
+    Dibuja el mapa de calor como una única imagen ráster (imshow) en lugar de un rectángulo y
+    un texto por celda, y lo guarda en un archivo (PNG, PDF, SVG, ... según la extensión).
+    Las matrices con más filas o columnas que píxeles se reducen antes promediando bloques.
+
+    Args:
+        matrix (ndarray): Valores de forma (filas, columnas).
+        row_labels (list): Etiquetas de las filas.
+        column_labels (list): Etiquetas de las columnas.
+        output_file (str): Archivo de salida.
+        title, xlabel, ylabel, colorbar_label (str): Textos del gráfico.
+        cluster_rows (bool): Ordenar las filas por clustering jerárquico (requiere scipy).
+        cluster_columns (bool): Ordenar las columnas por clustering jerárquico (requiere scipy).
+        annotate (bool): Escribir el valor en cada celda (default: solo si hay pocas celdas).
+        dpi (int): Resolución de la imagen (default: 300).
+        figsize (tuple): Tamaño de la figura en pulgadas (default: 11 x 8, como el PNG de C6_Heatmap.r).
+        cmap (str): Mapa de colores (default: viridis invertido, como scale_fill_viridis_c(direction = -1)).
+
+    Returns:
+        tuple: Orden de las filas y orden de las columnas usados en el gráfico.
+    """
+    matrix = np.asarray(matrix)
+    row_order = cluster_order(matrix) if cluster_rows else np.arange(matrix.shape[0])
+    column_order = cluster_order(matrix.T) if cluster_columns else np.arange(matrix.shape[1])
+    data = matrix[np.ix_(row_order, column_order)]
+    n_rows, n_columns = data.shape
+
+    # La fuente se fija solo durante el dibujo, sin cambiar la configuración global de matplotlib
+    with plt.rc_context({'font.family': 'serif',
+                         'font.serif': ['Times New Roman', 'Times', 'Liberation Serif', 'DejaVu Serif']}):
+        fig, ax = plt.subplots(figsize=figsize)
+        # Con más filas o columnas que píxeles, promediar bloques antes de dibujar; 'extent' mantiene
+        # las coordenadas de las celdas originales
+        pixels = reduce_rows(reduce_rows(data, int(figsize[1] * dpi)).T, int(figsize[0] * dpi)).T
+        image = ax.imshow(pixels, aspect='auto', cmap=cmap, interpolation='nearest',
+                          extent=(-0.5, n_columns - 0.5, n_rows - 0.5, -0.5))
+        colorbar = fig.colorbar(image, ax=ax)
+        colorbar.set_label(colorbar_label)
+
+        # Etiquetas de los ejes solo si caben
+        if n_columns <= MAX_TICK_LABELS:
+            ax.set_xticks(np.arange(n_columns))
+            ax.set_xticklabels([column_labels[index] for index in column_order], rotation=45, ha='right')
+        else:
+            ax.set_xticks([])
+            xlabel = f"{xlabel} ({n_columns})"
+        if n_rows <= MAX_TICK_LABELS:
+            ax.set_yticks(np.arange(n_rows))
+            ax.set_yticklabels([row_labels[index] for index in row_order])
+        else:
+            ax.set_yticks([])
+            ylabel = f"{ylabel} ({n_rows})"
+
+        # Valores dentro de las celdas, en blanco sobre los colores oscuros
+        if annotate is None:
+            annotate = data.size <= ANNOTATE_MAX_CELLS
+        if annotate and data.size:
+            low, high = float(data.min()), float(data.max())
+            middle = (low + high) / 2
+            integral = np.all(np.mod(data, 1) == 0)
+            for row in range(n_rows):
+                for column in range(n_columns):
+                    value = data[row, column]
+                    ax.text(column, row, f'{value:.0f}' if integral else f'{value:.1f}', ha='center', va='center',
+                            color='white' if value > middle and high > low else 'black', fontsize=8)
+
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        fig.tight_layout()
+        fig.savefig(output_file, dpi=dpi)
+        plt.close(fig)
+    return row_order, column_order
+
+def main():
+    # Opciones de línea de comandos
+    parser = argparse.ArgumentParser(description="Mapa de calor de la conservación por clase (C5) o por especie (C4).")
+    parser.add_argument('--input', metavar='ARCHIVO', help="Tabla por clase de C5 o matriz de especies de C4 (.tsv o .npz)")
+    parser.add_argument('--output', metavar='IMAGEN', help="Archivo de imagen de salida (p. ej. Conservación.png)")
+    parser.add_argument('--source', choices=('auto', 'classes', 'matrix'), default='auto',
+                        help="Tipo de tabla de entrada (default: detección automática)")
+    parser.add_argument('--value', choices=sorted(CLASS_VALUES), default='conserved',
+                        help="Valor representado de la tabla de C5 (default: conserved, número de especies)")
+    parser.add_argument('--cluster-rows', action='store_true', help="Ordenar las filas por clustering jerárquico (requiere scipy)")
+    parser.add_argument('--cluster-columns', action='store_true', help="Ordenar las columnas por clustering jerárquico (requiere scipy)")
+    parser.add_argument('--annotate', choices=('auto', 'always', 'never'), default='auto',
+                        help=f"Escribir los valores en las celdas (default: auto, hasta {ANNOTATE_MAX_CELLS} celdas)")
+    parser.add_argument('--dpi', type=int, default=300, help="Resolución de la imagen (default: 300)")
+    parser.add_argument('--title', default="Heatmap de conservación de KOs y Motivos por clase", help="Título del gráfico")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report = report_from_args('C6', args)
+
+    # Solicitar los archivos de entrada y salida si no se indicaron como opciones
+    input_file = args.input or input("Ingrese el nombre del archivo de conservación (tabla de C5 o matriz de C4): ")
+    output_file = args.output or input("Ingrese el nombre del archivo de imagen de salida (ejemplo: 'Conservación.png'): ")
+    source = detect_source(input_file) if args.source == 'auto' else args.source
+
+    # Leer la tabla de entrada
+    with report.stage('read_table') as stage:
+        if source == 'matrix':
+            row_labels, column_labels, matrix = read_species_matrix(input_file)
+            ylabel, colorbar_label = "Especie", "Presencia"
+        else:
+            row_labels, column_labels, matrix = read_class_table(input_file, args.value)
+            ylabel = "Clase"
+            colorbar_label = "Conservación\n(Número de especies)" if args.value == 'conserved' else "Conservación (%)"
+        stage.add_records(matrix.size, os.path.getsize(input_file))
+
+    # Dibujar y guardar el mapa de calor
+    with report.stage('render') as stage:
+        annotate = {'auto': None, 'always': True, 'never': False}[args.annotate]
+        render_heatmap(matrix, row_labels, column_labels, output_file, title=args.title, ylabel=ylabel,
+                       colorbar_label=colorbar_label, cluster_rows=args.cluster_rows,
+                       cluster_columns=args.cluster_columns, annotate=annotate, dpi=args.dpi)
+        stage.add_records(matrix.size)
+
+    print(f"Mapa de calor de {matrix.shape[0]} filas y {matrix.shape[1]} columnas guardado en '{output_file}'.")
+    finish_report(report, args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compara el tiempo de dibujar un mapa de calor como una sola imagen ráster (render_heatmap
+de C6_Heatmap.py) con el enfoque de C6_Heatmap.r: un rectángulo con borde y un texto por
+celda (geom_tile + geom_text), reproducido con matplotlib. Se usan matrices de 10^2, 10^4
+y 10^6 celdas; el enfoque por celda solo se mide hasta --max-per-cell celdas.
+
+Uso:
+    python benchmarks/bench_heatmap.py [--max-per-cell 10000] [--seed 1]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from C6_Heatmap import plt, render_heatmap
+
+# Forma (filas, columnas) de cada tamaño de matriz
+SHAPES = [(20, 5), (2_000, 5), (100_000, 10)]
+
+
+def render_per_cell(matrix, output_file, dpi=300):
+    """
+    Dibuja un rectángulo con borde y un texto por celda, como C6_Heatmap.r.
+    """
+    n_rows, n_columns = matrix.shape
+    fig, ax = plt.subplots(figsize=(11, 8))
+    cmap = plt.get_cmap('viridis_r')
+    low, high = float(matrix.min()), float(matrix.max())
+    scale = high - low or 1.0
+    for row in range(n_rows):
+        for column in range(n_columns):
+            value = matrix[row, column]
+            ax.add_patch(plt.Rectangle((column - 0.5, row - 0.5), 1, 1, facecolor=cmap((value - low) / scale),
+                                       edgecolor='black', linewidth=0.5))
+            ax.text(column, row, f'{value:.0f}', ha='center', va='center', fontsize=4,
+                    color='white' if value > 150 else 'black')
+    ax.set_xlim(-0.5, n_columns - 0.5)
+    ax.set_ylim(n_rows - 0.5, -0.5)
+    fig.savefig(output_file, dpi=dpi)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-per-cell', type=int, default=10_000,
+                        help='Número máximo de celdas para medir el enfoque por celda (default: 10000)')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador aleatorio')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'Celdas':>10}\t{'Forma':>12}\t{'Por celda (s)':>13}\t{'Ráster (s)':>10}\t{'Aceleración':>11}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n_rows, n_columns in SHAPES:
+            matrix = rng.integers(0, 300, size=(n_rows, n_columns)).astype(np.float64)
+            rows = [f'fila{index}' for index in range(n_rows)]
+            columns = [f'col{index}' for index in range(n_columns)]
+
+            start = time.perf_counter()
+            render_heatmap(matrix, rows, columns, os.path.join(work_dir, 'raster.png'))
+            raster_time = time.perf_counter() - start
+
+            per_cell_time = None
+            if matrix.size <= args.max_per_cell:
+                start = time.perf_counter()
+                render_per_cell(matrix, os.path.join(work_dir, 'per_cell.png'))
+                per_cell_time = time.perf_counter() - start
+
+            per_cell_text = f'{per_cell_time:>13.3f}' if per_cell_time is not None else f"{'-':>13}"
+            speedup = f'{per_cell_time / raster_time:>10.1f}x' if per_cell_time is not None else f"{'-':>11}"
+            print(f"{matrix.size:>10}\t{f'{n_rows}x{n_columns}':>12}\t{per_cell_text}\t{raster_time:>10.3f}\t{speedup}")
+
+
+if __name__ == '__main__':
+    main()
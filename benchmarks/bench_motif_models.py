@@ -0,0 +1,76 @@
+"""
+Compara la búsqueda de motivos degenerados (consenso IUPAC) con ventanas deslizantes
+(motif_models) con la alternativa anterior: expandir cada consenso en todos sus motivos
+literales, añadir sus complementarios inversos y buscarlos uno a uno con expresiones
+regulares como find_motif_positions de C2.
+
+Uso:
+    python benchmarks/bench_motif_models.py [--seed 1]
+"""
+import argparse
+import itertools
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motif_models import IUPAC_CODES, encode_bases, iupac_model
+
+GENOME_SIZES = [10_000, 100_000, 1_000_000]
+
+# Consensos de ejemplo con distinto grado de degeneración
+CONSENSUS = ['ggaatrt', 'catanwtr', 'kmatatwn', 'rgwwnngaatrt']
+
+COMPLEMENT = str.maketrans('acgt', 'tgca')
+
+
+def random_sequence(rng, length):
+    return ''.join(rng.choice('acgt') for _ in range(length))
+
+
+def expand(consensus):
+    literals = [''.join(bases) for bases in itertools.product(*(IUPAC_CODES[char] for char in consensus))]
+    reverse = [literal.translate(COMPLEMENT)[::-1] for literal in literals]
+    return list(dict.fromkeys(literals + reverse))
+
+
+def regex_scan(sequence, literals):
+    starts = set()
+    for literal in literals:
+        starts.update(m.start() for m in re.finditer(f'(?={literal})', sequence))
+    return sorted(starts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador aleatorio')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    expanded = {consensus: expand(consensus) for consensus in CONSENSUS}
+    models = {consensus: iupac_model(consensus) for consensus in CONSENSUS}
+    print(f"{'Tamaño':>10}\t{'Consenso':>16}\t{'Literales':>9}\t{'Regex (s)':>10}\t{'Modelo (s)':>10}\t{'Aceleración':>11}")
+
+    for size in GENOME_SIZES:
+        genome = random_sequence(rng, size)
+        codes = encode_bases(genome)
+        for consensus in CONSENSUS:
+            start = time.perf_counter()
+            expected = regex_scan(genome, expanded[consensus])
+            regex_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            observed = [position for position, _ in models[consensus].find(codes)]
+            model_time = time.perf_counter() - start
+
+            if observed != expected:
+                sys.exit(f"Error: los resultados difieren para '{consensus}' en el genoma de tamaño {size}")
+            print(f"{size:>10}\t{consensus:>16}\t{len(expanded[consensus]):>9}\t{regex_time:>10.4f}\t"
+                  f"{model_time:>10.4f}\t{regex_time / model_time:>10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compara el autómata de Aho-Corasick (MotifScanner) con la búsqueda por expresión
+regular de C2 (una llamada a find_motif_positions por motivo) sobre genomas sintéticos
+de tamaño creciente.
+
+Uso:
+    python benchmarks/bench_motif_scanner.py [--motifs 100] [--seed 1]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motif_scanner import MotifScanner
+
+GENOME_SIZES = [10_000, 100_000, 1_000_000]
+
+
+# Búsqueda de referencia, idéntica a find_motif_positions de C2
+def find_motif_positions(sequence, motif):
+    return [(m.start(), m.start() + len(motif)) for m in re.finditer(f'(?={motif})', sequence)]
+
+
+def random_sequence(rng, length):
+    return ''.join(rng.choice('acgt') for _ in range(length))
+
+
+def regex_scan(sequence, motifs):
+    hits = {}
+    for motif in motifs:
+        positions = find_motif_positions(sequence, motif)
+        if positions:
+            hits[motif] = positions
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--motifs', type=int, default=100, help='Número de motivos sintéticos')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador aleatorio')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    motifs = [random_sequence(rng, rng.randint(6, 12)) for _ in range(args.motifs)]
+
+    build_start = time.perf_counter()
+    scanner = MotifScanner(motifs)
+    build_time = time.perf_counter() - build_start
+    print(f"Construcción del autómata ({len(motifs)} motivos): {build_time:.4f} s")
+    print(f"{'Tamaño':>10}\t{'Regex (s)':>10}\t{'Aho-Corasick (s)':>16}\t{'Aceleración':>11}")
+
+    for size in GENOME_SIZES:
+        genome = random_sequence(rng, size)
+
+        start = time.perf_counter()
+        expected = regex_scan(genome, motifs)
+        regex_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        observed = scanner.scan(genome)
+        scanner_time = time.perf_counter() - start
+
+        if observed != expected:
+            sys.exit(f"Error: los resultados difieren para el genoma de tamaño {size}")
+        print(f"{size:>10}\t{regex_time:>10.4f}\t{scanner_time:>16.4f}\t{regex_time / scanner_time:>10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
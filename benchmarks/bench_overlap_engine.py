@@ -0,0 +1,76 @@
+"""
+Compara el barrido de intervalos (find_overlaps) con el recorrido anidado original de C2
+(motivo1 x motivo2 x pos1 x pos2 con check_superposition) y comprueba que ambos
+producen exactamente las mismas superposiciones y en el mismo orden.
+
+Las secuencias son de baja complejidad (ricas en AT) para que los motivos cortos
+aparezcan miles de veces.
+
+Uso:
+    python benchmarks/bench_overlap_engine.py [--seed 1]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motif_scanner import MotifScanner
+from overlap_engine import find_overlaps
+
+SEQUENCE_SIZES = [1_000, 5_000, 10_000]
+
+
+# Comprobación de referencia, idéntica a check_superposition de C2
+def check_superposition(pos1, pos2):
+    return pos1[0] < pos2[1] and pos1[1] > pos2[0]
+
+
+def brute_force_overlaps(motif_positions1, motif_positions2):
+    overlaps = []
+    for motif1, positions1 in motif_positions1.items():
+        for motif2, positions2 in motif_positions2.items():
+            for pos1 in positions1:
+                for pos2 in positions2:
+                    if check_superposition(pos1, pos2):
+                        overlaps.append((motif1, pos1, motif2, pos2))
+    return overlaps
+
+
+def at_rich_sequence(rng, length):
+    return ''.join(rng.choices('acgt', weights=[4, 1, 1, 4], k=length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador aleatorio')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    motifs1 = ['aa', 'at', 'tta', 'aaat', '']
+    motifs2 = ['ta', 'tt', 'aat', 'atta', 'a']
+    scanner = MotifScanner(motifs1 + motifs2)
+
+    print(f"{'Tamaño':>8}\t{'Pares':>8}\t{'Anidado (s)':>11}\t{'Barrido (s)':>11}\t{'Aceleración':>11}")
+    for size in SEQUENCE_SIZES:
+        hits = scanner.scan(at_rich_sequence(rng, size))
+        motif_positions1 = {motif: hits[motif] for motif in motifs1 if motif in hits}
+        motif_positions2 = {motif: hits[motif] for motif in motifs2 if motif in hits}
+
+        start = time.perf_counter()
+        expected = brute_force_overlaps(motif_positions1, motif_positions2)
+        brute_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        observed = find_overlaps(motif_positions1, motif_positions2)
+        sweep_time = time.perf_counter() - start
+
+        if observed != expected:
+            sys.exit(f"Error: las superposiciones difieren para la secuencia de tamaño {size}")
+        print(f"{size:>8}\t{len(expected):>8}\t{brute_time:>11.4f}\t{sweep_time:>11.4f}\t{brute_time / sweep_time:>10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
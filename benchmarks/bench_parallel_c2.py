@@ -0,0 +1,63 @@
+"""
+Mide la escalabilidad del análisis de superposiciones de C2 con 1, 2, 4, ... N procesos
+y comprueba que la salida de cada ejecución es idéntica a la de la ejecución en serie.
+
+Uso:
+    python benchmarks/bench_parallel_c2.py [--sequences 2000] [--length 5000] [--max-workers N]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from overlap_analysis import run_overlap_analysis
+
+
+def random_sequence(rng, length):
+    return ''.join(rng.choice('acgt') for _ in range(length))
+
+
+def worker_counts(max_workers):
+    count = 1
+    while count < max_workers:
+        yield count
+        count *= 2
+    yield max_workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sequences', type=int, default=2000, help='Número de secuencias sintéticas')
+    parser.add_argument('--length', type=int, default=5000, help='Longitud de cada secuencia')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='Número máximo de procesos')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador aleatorio')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    records = [(f'seq{i}', random_sequence(rng, args.length)) for i in range(args.sequences)]
+    motifs1 = [random_sequence(rng, rng.randint(5, 8)) for _ in range(50)]
+    motifs2 = [random_sequence(rng, rng.randint(5, 8)) for _ in range(50)]
+    total_bases = args.sequences * args.length
+
+    reference = None
+    print(f"{'Procesos':>8}\t{'Tiempo (s)':>10}\t{'Mb/s':>8}\t{'Aceleración':>11}")
+    for workers in worker_counts(args.max_workers):
+        output_with, output_without = io.StringIO(), io.StringIO()
+        start = time.perf_counter()
+        run_overlap_analysis(iter(records), motifs1, motifs2, output_with, output_without, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        outputs = (output_with.getvalue(), output_without.getvalue())
+        if reference is None:
+            reference = (outputs, elapsed)
+        elif outputs != reference[0]:
+            sys.exit(f"Error: la salida con {workers} procesos difiere de la ejecución en serie")
+        print(f"{workers:>8}\t{elapsed:>10.3f}\t{total_bases / elapsed / 1e6:>8.2f}\t{reference[1] / elapsed:>10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Generadores reproducibles (con semilla) de datos sintéticos en los formatos de entrada de
+los scripts C1-C5:
+
+  - genomas FASTA con tamaño y contenido GC configurables y motivos insertados (C2),
+  - tablas de especies y KOs en el formato de C1 y paneles de KOs,
+  - listas de especies por grupo para C4,
+  - tablas combinadas con 'KEGG Class' y columnas de genes/motivos para C5.
+
+Uso:
+    python benchmarks/generators.py CARPETA [--tier small] [--seed 1]
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+BASES = np.array(list('acgt'))
+
+# Tamaños de cada nivel de los conjuntos de datos
+TIERS = {
+    'small': {'sequences': 100, 'length': 5_000, 'species': 1_000, 'kos': 300, 'classes': 10},
+    'medium': {'sequences': 500, 'length': 20_000, 'species': 10_000, 'kos': 1_000, 'classes': 30},
+    'large': {'sequences': 500, 'length': 50_000, 'species': 100_000, 'kos': 3_000, 'classes': 60},
+}
+
+# Grupos de C4/C5 y fracción de especies conservadas en cada uno
+DEFAULT_GROUPS = {'SigE_KO': 0.6, 'SigE_motivo': 0.4, 'SpoIIIAA_KO': 0.3, 'SpoIIID_KO': 0.5, 'SpoIIID_motivo': 0.2}
+
+# Motivos de ejemplo (literales) que se insertan en los genomas
+DEFAULT_MOTIFS = ['ggaatatt', 'gcataatt', 'catatagt', 'ttgtcaaa', 'gggtaaga']
+
+
+def ko_name(index):
+    return f'K{index:05d}'
+
+
+def species_name(index):
+    return f'sp{index}'
+
+
+def random_genome(rng, length, gc=0.5):
+    """
+    Genera una secuencia aleatoria con el contenido GC indicado.
+    """
+    probabilities = [(1 - gc) / 2, gc / 2, gc / 2, (1 - gc) / 2]
+    return ''.join(rng.choice(BASES, size=length, p=probabilities))
+
+
+def plant_motifs(rng, sequence, motifs, count):
+    """
+    Inserta 'count' copias de motivos elegidos al azar en posiciones aleatorias.
+
+    Returns:
+        tuple: Secuencia con los motivos y lista de tuplas (motivo, inicio).
+    """
+    chars = list(sequence)
+    planted = []
+    for _ in range(count):
+        motif = motifs[rng.integers(len(motifs))]
+        if len(motif) > len(chars):
+            continue
+        start = int(rng.integers(len(chars) - len(motif) + 1))
+        chars[start:start + len(motif)] = motif
+        planted.append((motif, start))
+    return ''.join(chars), planted
+
+
+def write_fasta(filename, rng, sequences, length, gc=0.5, motifs=DEFAULT_MOTIFS, plants_per_sequence=5, line_width=60):
+    """
+    Escribe un archivo FASTA de genomas sintéticos con motivos insertados.
+
+    Returns:
+        dict: Identificador de cada secuencia y lista de motivos insertados (motivo, inicio).
+    """
+    planted = {}
+    with open(filename, 'w') as f:
+        for index in range(sequences):
+            seq_id = f'seq{index}'
+            sequence, planted[seq_id] = plant_motifs(rng, random_genome(rng, length, gc), motifs, plants_per_sequence)
+            f.write(f'>{seq_id}\n')
+            for start in range(0, len(sequence), line_width):
+                f.write(sequence[start:start + line_width] + '\n')
+    return planted
+
+
+def write_motifs(filename, motifs):
+    """
+    Escribe un archivo de motivos de C2 (uno por línea).
+    """
+    with open(filename, 'w') as f:
+        f.write('\n'.join(motifs) + '\n')
+
+
+def write_ko_table(filename, rng, species, kos, mean_kos=40):
+    """
+    Escribe una tabla de especies y KOs en el formato de C1: los KOs de cada especie
+    separados por espacios y el nombre de la especie al final de la línea.
+
+    Returns:
+        list: Nombres de las especies.
+    """
+    names = [species_name(index) for index in range(species)]
+    counts = rng.poisson(mean_kos, size=species) + 1
+    with open(filename, 'w') as f:
+        for name, count in zip(names, counts):
+            row = rng.integers(kos, size=count)
+            f.write(' '.join(ko_name(ko) for ko in row) + f' {name}  \n')
+    return names
+
+
+def write_ko_panel(filename, rng, kos, size=10):
+    """
+    Escribe un panel de KOs para C1 (un KO por línea) y devuelve sus KOs.
+    """
+    panel = [ko_name(ko) for ko in rng.choice(kos, size=min(size, kos), replace=False)]
+    with open(filename, 'w') as f:
+        f.write('\n'.join(panel) + '\n')
+    return panel
+
+
+def membership(rng, species, groups=DEFAULT_GROUPS):
+    """
+    Decide al azar la presencia de cada especie en cada grupo.
+
+    Returns:
+        dict: Nombre de cada grupo y arreglo booleano de presencia por especie.
+    """
+    return {group: rng.random(len(species)) < fraction for group, fraction in groups.items()}
+
+
+def write_group_lists(folder, rng, species, groups=DEFAULT_GROUPS):
+    """
+    Escribe la lista principal de especies y una lista por grupo, en el formato que lee C4.
+
+    Returns:
+        dict: Ruta de la lista principal ('main') y de la lista de cada grupo.
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = {'main': os.path.join(folder, 'main_species.txt')}
+    with open(paths['main'], 'w') as f:
+        f.write('\n'.join(species) + '\n')
+    for group, present in membership(rng, species, groups).items():
+        paths[group] = os.path.join(folder, f'{group}.txt')
+        with open(paths[group], 'w') as f:
+            f.write('\n'.join(name for name, flag in zip(species, present) if flag) + '\n')
+    return paths
+
+
+def write_combined_table(filename, rng, species, classes, groups=DEFAULT_GROUPS):
+    """
+    Escribe una tabla combinada para C5 con las columnas 'ID', 'Phylum', 'KEGG Class' y una
+    columna 0/1 por grupo.
+    """
+    class_names = [f'Class{index}' for index in range(classes)]
+    # Clases de tamaño desigual, como en los paneles reales
+    weights = rng.dirichlet(np.ones(classes))
+    assigned = rng.choice(classes, size=len(species), p=weights)
+    present = membership(rng, species, groups)
+    with open(filename, 'w') as f:
+        f.write('\t'.join(['ID', 'Phylum', 'KEGG Class'] + list(groups)) + '\n')
+        for index, name in enumerate(species):
+            class_index = int(assigned[index])
+            values = [str(int(present[group][index])) for group in groups]
+            f.write('\t'.join([name, f'Phylum{class_index % 5}', class_names[class_index]] + values) + '\n')
+
+
+def write_dataset(folder, tier='small', seed=1, gc=0.5):
+    """
+    Escribe un conjunto de datos completo de un nivel de tamaño.
+
+    Returns:
+        dict: Rutas de los archivos generados y parámetros usados.
+    """
+    sizes = TIERS[tier]
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    paths = {
+        'fasta': os.path.join(folder, 'genomes.fa'),
+        'motifs1': os.path.join(folder, 'motifs1.txt'),
+        'motifs2': os.path.join(folder, 'motifs2.txt'),
+        'ko_table': os.path.join(folder, 'species_kos.txt'),
+        'ko_panel': os.path.join(folder, 'ko_panel.txt'),
+        'combined': os.path.join(folder, 'combined.txt'),
+    }
+    write_fasta(paths['fasta'], rng, sizes['sequences'], sizes['length'], gc)
+    write_motifs(paths['motifs1'], DEFAULT_MOTIFS[:3] + ['gaata', 'cataat'])
+    write_motifs(paths['motifs2'], DEFAULT_MOTIFS[3:] + ['aatatt', 'tgtca'])
+    species = write_ko_table(paths['ko_table'], rng, sizes['species'], sizes['kos'])
+    panel = write_ko_panel(paths['ko_panel'], rng, sizes['kos'])
+    paths['groups'] = write_group_lists(os.path.join(folder, 'groups'), rng, species)
+    write_combined_table(paths['combined'], rng, species, sizes['classes'])
+    dataset = {'tier': tier, 'seed': seed, 'gc': gc, 'sizes': sizes, 'fixed_ko': panel[0], 'paths': paths}
+    with open(os.path.join(folder, 'dataset.json'), 'w') as f:
+        json.dump(dataset, f, indent=2)
+    return dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', help='Carpeta donde escribir los datos')
+    parser.add_argument('--tier', choices=sorted(TIERS), default='small', help='Nivel de tamaño (default: small)')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador aleatorio')
+    parser.add_argument('--gc', type=float, default=0.5, help='Contenido GC de los genomas (default: 0.5)')
+    args = parser.parse_args()
+
+    dataset = write_dataset(args.folder, args.tier, args.seed, args.gc)
+    print(f"Datos '{args.tier}' generados en '{args.folder}' con semilla {args.seed}.")
+    for name, path in dataset['paths'].items():
+        if isinstance(path, str):
+            print(f"  {name}: {path}")
+
+
+if __name__ == '__main__':
+    main()
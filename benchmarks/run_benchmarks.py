@@ -0,0 +1,175 @@
+"""
+Mide el tiempo de las funciones más costosas de C1, C2 y C5 (y de sus versiones
+optimizadas) sobre datos sintéticos de tamaño creciente, y guarda los resultados como
+línea base en JSON para compararlos con ejecuciones posteriores.
+
+Funciones medidas:
+  - C1: find_species_with_min_kos_and_fixed_ko y la consulta con KOIndex
+  - C2: load_fasta, find_motif_positions (todos los motivos), MotifScanner.scan y el
+        bucle de superposiciones (run_overlap_analysis en serie)
+  - C5: count_conservation_by_class y aggregate_by_group
+
+Uso:
+    python benchmarks/run_benchmarks.py [--tiers small,medium] [--repeat 3] [--seed 1]
+                                        [--output resultados.json] [--compare base.json]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from C1_KO_Filter import find_species_with_min_kos_and_fixed_ko, load_kos_from_file
+from C2_Analysis_of_overlapping_motifs import find_motif_positions, load_fasta, load_motifs
+from C5_Results_by_class import count_conservation_by_class, read_combined_file
+from class_aggregation import aggregate_by_group, read_combined_columns
+from generators import TIERS, write_dataset
+from ko_index import KOIndex
+from motif_scanner import MotifScanner
+from overlap_analysis import run_overlap_analysis
+
+
+def time_function(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def benchmarks_for(dataset, work_dir):
+    """
+    Devuelve las mediciones de un conjunto de datos como tuplas (nombre, registros, función).
+    """
+    paths = dataset['paths']
+    sizes = dataset['sizes']
+    panel = load_kos_from_file(paths['ko_panel'])
+    fixed_ko = dataset['fixed_ko']
+    index = KOIndex.open_or_build(paths['ko_table'], os.path.join(work_dir, 'ko_index'))
+
+    sequences = {seq_id: seq.lower() for seq_id, seq in load_fasta(paths['fasta']).items()}
+    motifs1 = [motif.lower() for motif in load_motifs(paths['motifs1'])]
+    motifs2 = [motif.lower() for motif in load_motifs(paths['motifs2'])]
+    motifs = motifs1 + motifs2
+    scanner = MotifScanner(motifs)
+    bases = sizes['sequences'] * sizes['length']
+
+    combined_rows = read_combined_file(paths['combined'])
+    combined_table = read_combined_columns(paths['combined'])
+
+    def regex_scan():
+        for seq in sequences.values():
+            for motif in motifs:
+                find_motif_positions(seq, motif)
+
+    def scanner_scan():
+        for seq in sequences.values():
+            scanner.scan(seq)
+
+    def overlap_loop():
+        run_overlap_analysis(iter(sequences.items()), motifs1, motifs2, io.StringIO(), io.StringIO())
+
+    return [
+        ('c1_find_species_with_min_kos_and_fixed_ko', sizes['species'],
+         lambda: find_species_with_min_kos_and_fixed_ko(paths['ko_table'], panel, 3, fixed_ko)),
+        ('c1_ko_index_find_species', sizes['species'], lambda: index.find_species(panel, 3, fixed_ko)),
+        ('c2_load_fasta', bases, lambda: load_fasta(paths['fasta'])),
+        ('c2_find_motif_positions', bases, regex_scan),
+        ('c2_motif_scanner', bases, scanner_scan),
+        ('c2_overlap_loop', bases, overlap_loop),
+        ('c5_count_conservation_by_class', sizes['species'], lambda: count_conservation_by_class(combined_rows)),
+        ('c5_aggregate_by_group', sizes['species'], lambda: aggregate_by_group(combined_table)),
+    ]
+
+
+def run(tiers, repeat, seed, selected=None):
+    results = []
+    for tier in tiers:
+        with tempfile.TemporaryDirectory() as work_dir:
+            print(f"Generando datos '{tier}'...", file=sys.stderr)
+            dataset = write_dataset(os.path.join(work_dir, 'data'), tier, seed)
+            for name, records, function in benchmarks_for(dataset, work_dir):
+                if selected and name not in selected:
+                    continue
+                times = time_function(function, repeat)
+                best = min(times)
+                result = {
+                    'tier': tier,
+                    'benchmark': name,
+                    'records': records,
+                    'repeat': repeat,
+                    'min_s': round(best, 6),
+                    'median_s': round(statistics.median(times), 6),
+                    'records_per_s': round(records / best, 1) if best > 0 else None,
+                }
+                results.append(result)
+                print(f"{tier:>8}\t{name:<45}\t{best:>10.4f} s\t{result['records_per_s']:>14} registros/s")
+    return results
+
+
+def compare(baseline, results, tolerance):
+    previous = {(entry['tier'], entry['benchmark']): entry for entry in baseline['results']}
+    regressions = 0
+    print(f"\n{'Nivel':>8}\t{'Medición':<45}\t{'Base (s)':>10}\t{'Ahora (s)':>10}\t{'Cociente':>8}")
+    for entry in results:
+        old = previous.get((entry['tier'], entry['benchmark']))
+        if old is None or not old['min_s']:
+            continue
+        ratio = entry['min_s'] / old['min_s']
+        regression = ratio > 1 + tolerance
+        regressions += regression
+        flag = '  <-- regresión' if regression else ''
+        print(f"{entry['tier']:>8}\t{entry['benchmark']:<45}\t{old['min_s']:>10.4f}\t{entry['min_s']:>10.4f}\t{ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tiers', default='small,medium',
+                        help=f"Niveles de tamaño separados por comas ({', '.join(TIERS)}; default: small,medium)")
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones de cada medición (se guarda la mínima)')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla de los datos sintéticos')
+    parser.add_argument('--only', action='append', help='Ejecutar solo esta medición (se puede repetir)')
+    parser.add_argument('--output', help='Archivo JSON donde guardar los resultados como línea base')
+    parser.add_argument('--compare', metavar='BASE', help='Línea base JSON con la que comparar los resultados')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Aumento relativo de tiempo considerado regresión (default: 0.2)')
+    args = parser.parse_args()
+
+    tiers = [tier.strip() for tier in args.tiers.split(',') if tier.strip()]
+    unknown = [tier for tier in tiers if tier not in TIERS]
+    if unknown:
+        sys.exit(f"Niveles desconocidos: {', '.join(unknown)}")
+
+    results = run(tiers, args.repeat, args.seed, args.only)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados guardados en '{args.output}'.", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.tolerance)
+        if regressions:
+            sys.exit(f"{regressions} mediciones superan la tolerancia de {args.tolerance:.0%}.")
+
+
+if __name__ == '__main__':
+    main()
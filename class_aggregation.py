@@ -0,0 +1,204 @@
+import csv
+
+import numpy as np
+
+# Columna de clase taxonómica de la tabla combinada
+DEFAULT_GROUP_BY = ('KEGG Class',)
+
+# Sufijos de las columnas de genes ('_KO') y de motivos ('_motivo') de la tabla combinada
+VALUE_SUFFIXES = ('_KO', '_motivo')
+
+# Función para leer un archivo tabulado como columnas de NumPy
+def _read_columns(filename):
+    """
+    Lee un archivo separado por tabuladores con encabezado y devuelve sus columnas.
+
+    Si cada fila tiene tantos campos como el encabezado y no hay comillas, el archivo se
+    divide de una sola vez y se reorganiza como matriz; en caso contrario se usa el módulo csv,
+    que completa o recorta cada fila al número de columnas del encabezado.
+
+    Args:
+        filename (str): Archivo separado por tabuladores.
+
+    Returns:
+        dict: Nombre de cada columna y arreglo de objetos con sus valores de texto.
+    """
+    with open(filename, 'r') as f:
+        text = f.read()
+    lines = text.splitlines()
+    header = lines[0].split('\t') if lines else []
+    body = [line for line in lines[1:] if line]
+    separators = len(header) - 1
+    if '"' not in text and all(line.count('\t') == separators for line in body):
+        fields = '\t'.join(body).split('\t') if body else []
+        table = np.array(fields, dtype=object).reshape(len(body), len(header))
+    else:
+        rows = [row for row in csv.reader(body, delimiter='\t') if row]
+        table = np.empty((len(rows), len(header)), dtype=object)
+        for index, row in enumerate(rows):
+            row = (row + [''] * len(header))[:len(header)]
+            table[index] = row
+    return {name: table[:, index] for index, name in enumerate(header)}
+
+# Función para leer la tabla combinada en columnas con tipo
+def read_combined_columns(filename, group_by=DEFAULT_GROUP_BY, value_columns=None):
+    """
+    Lee la tabla combinada de KOs y motivos como columnas, en lugar de un diccionario por fila.
+
+    Si no se indican las columnas de valores, se toman del encabezado: las columnas de KOs
+    ('_KO') primero y las de motivos ('_motivo') después, respetando el orden del encabezado
+    dentro de cada tipo. Otras columnas numéricas (p. ej. 'Taxonomy ID') no se suman, y las
+    columnas detectadas deben contener solo 0 y 1.
+
+    Args:
+        filename (str): Archivo separado por tabuladores con encabezado.
+        group_by (tuple): Columnas taxonómicas por las que se agrupará (default: 'KEGG Class').
+        value_columns (list): Columnas de genes/motivos a sumar (default: columnas '_KO' y '_motivo').
+
+    Returns:
+        dict: Diccionario con 'keys' (lista de tuplas de rangos por fila), 'value_columns'
+              (nombres) y 'values' (matriz int64 de forma (filas, columnas)).
+    """
+    columns = _read_columns(filename)
+    header = list(columns)
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+
+    detected = value_columns is None
+    if detected:
+        value_columns = [name for suffix in VALUE_SUFFIXES for name in header
+                         if name.endswith(suffix) and name not in group_by]
+    parsed = {}
+    for name in value_columns:
+        if name not in columns:
+            raise ValueError(f"La columna '{name}' no está en el encabezado de '{filename}'")
+        parsed[name] = columns[name].astype(np.int64)
+        if detected and ((parsed[name] < 0) | (parsed[name] > 1)).any():
+            raise ValueError(f"La columna '{name}' de '{filename}' debe contener solo 0 y 1")
+
+    missing = [rank for rank in group_by if rank not in columns]
+    if missing:
+        raise ValueError(f"Las columnas de agrupación {', '.join(map(repr, missing))} no están en el "
+                         f"encabezado de '{filename}'")
+    keys = list(zip(*(columns[rank].tolist() for rank in group_by)))
+    values = np.column_stack([parsed[name] for name in value_columns]) if value_columns else np.zeros((n_rows, 0), dtype=np.int64)
+    return {'group_by': list(group_by), 'keys': keys, 'value_columns': list(value_columns), 'values': values}
+
+# Función para agregar la conservación por grupo taxonómico
+def aggregate_by_group(table):
+    """
+    Suma la conservación de cada columna por grupo taxonómico y calcula los porcentajes.
+
+    Los grupos se codifican como enteros y cada columna se suma por grupo con np.bincount;
+    los porcentajes se calculan como operaciones sobre matrices.
+
+    Args:
+        table (dict): Tabla devuelta por read_combined_columns.
+
+    Returns:
+        dict: Diccionario con 'groups' (en orden de primera aparición), 'value_columns',
+              'sums' (matriz grupos x columnas), 'species_count', 'pct_by_group',
+              'pct_total', 'totals' y 'total_species'.
+    """
+    keys = table['keys']
+    values = table['values']
+
+    # Codificar los grupos en orden de primera aparición
+    codes = {}
+    inverse = np.fromiter((codes.setdefault(key, len(codes)) for key in keys), dtype=np.int64, count=len(keys))
+    n_groups = len(codes)
+
+    species_count = np.bincount(inverse, minlength=n_groups)
+    sums = np.empty((n_groups, values.shape[1]), dtype=np.int64)
+    for column in range(values.shape[1]):
+        sums[:, column] = np.bincount(inverse, weights=values[:, column], minlength=n_groups).round()
+
+    return summarize_counts(table['group_by'], list(codes), table['value_columns'], sums, species_count)
+
+# Función para calcular los porcentajes y totales a partir de las sumas por grupo
+def summarize_counts(group_by, groups, value_columns, sums, species_count):
+    """
+    Completa el resultado de la agregación a partir de las sumas y del número de especies
+    de cada grupo (p. ej. contadores mantenidos de forma incremental).
+
+    Args:
+        group_by (list): Columnas taxonómicas usadas para agrupar.
+        groups (list): Claves de los grupos, en el orden de salida.
+        value_columns (list): Nombres de las columnas sumadas.
+        sums (ndarray): Matriz int64 de sumas (grupos x columnas).
+        species_count (ndarray): Número de especies de cada grupo.
+
+    Returns:
+        dict: Mismo formato que aggregate_by_group.
+    """
+    total_species = int(species_count.sum())
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_by_group = np.where(species_count[:, None] > 0, sums / species_count[:, None] * 100, 0.0)
+    pct_total = sums / total_species * 100 if total_species else np.zeros(sums.shape)
+
+    return {
+        'group_by': list(group_by),
+        'groups': list(groups),
+        'value_columns': list(value_columns),
+        'sums': sums,
+        'species_count': species_count,
+        'pct_by_group': pct_by_group,
+        'pct_total': pct_total,
+        'totals': sums.sum(axis=0),
+        'total_species': total_species,
+    }
+
+# Función para obtener la etiqueta de una columna en el archivo de salida
+def column_label(name):
+    """
+    Convierte el nombre de una columna en su etiqueta de salida, p. ej. 'SigE_motivo' -> 'SigE Motif'.
+    """
+    if name.endswith('_KO'):
+        return name[:-3].replace('_', ' ') + ' KO'
+    if name.endswith('_motivo'):
+        return name[:-7].replace('_', ' ') + ' Motif'
+    return name.replace('_', ' ')
+
+# Función para obtener las columnas de agrupación en el archivo de salida
+def group_header(group_by):
+    """
+    Devuelve los nombres de las columnas de agrupación del archivo de salida: 'Class' para la
+    clase de KEGG (como en C5) y los nombres de las columnas taxonómicas en otro caso.
+    """
+    return ['Class'] if list(group_by) == list(DEFAULT_GROUP_BY) else list(group_by)
+
+# Función para escribir la tabla de conservación por grupo
+def write_aggregation(result, output_filename):
+    """
+    Escribe la conservación por grupo con el mismo formato que write_conservation_output de C5.
+
+    Args:
+        result (dict): Resultado de aggregate_by_group.
+        output_filename (str): Nombre del archivo donde se guardarán los resultados.
+    """
+    labels = [column_label(name) for name in result['value_columns']]
+    key_header = group_header(result['group_by'])
+    # El porcentaje es por grupo: 'Class' por defecto o, p. ej., 'KEGG Phylum / KEGG Class'
+    group_label = ' / '.join(key_header)
+    header = (key_header
+              + [f'{label} Conserved' for label in labels]
+              + ['Species Count']
+              + [f'{label} % by {group_label}' for label in labels]
+              + [f'{label} % Total' for label in labels])
+
+    sums = result['sums'].tolist()
+    counts = result['species_count'].tolist()
+    pct_by_group = result['pct_by_group'].tolist()
+    pct_total = result['pct_total'].tolist()
+
+    with open(output_filename, 'w') as f_out:
+        f_out.write('\t'.join(header) + '\n')
+        for index, key in enumerate(result['groups']):
+            fields = (list(key)
+                      + [str(value) for value in sums[index]]
+                      + [str(counts[index])]
+                      + [f'{value:.2f}' for value in pct_by_group[index]]
+                      + [f'{value:.2f}' for value in pct_total[index]])
+            f_out.write('\t'.join(fields) + '\n')
+        # Escribir totales al final del archivo
+        f_out.write('\nTotal' + '\t' * len(key_header) + '\t'.join(str(value) for value in result['totals'].tolist()) + '\n')
@@ -0,0 +1,125 @@
+import numpy as np
+
+# Función para construir la matriz de presencia/ausencia de especies por grupo
+def build_presence_matrix(main_species, species_dict):
+    """
+    Construye la matriz de presencia/ausencia de cada especie en cada grupo.
+
+    Las especies se codifican como índices enteros de la lista principal ordenada y cada
+    columna se rellena con una búsqueda vectorizada de los miembros del grupo.
+
+    Args:
+        main_species (iterable): Lista principal de especies.
+        species_dict (dict): Nombre de cada grupo y conjunto de especies del grupo, en el orden de las columnas.
+
+    Returns:
+        tuple: Arreglo ordenado de especies, lista de nombres de grupos y matriz uint8
+               de forma (especies, grupos) con 1 si la especie está en el grupo.
+    """
+    species = np.array(sorted(set(main_species)), dtype=str)
+    groups = list(species_dict)
+    matrix = np.zeros((len(species), len(groups)), dtype=np.uint8)
+    for column, group in enumerate(groups):
+        members = np.array(list(species_dict[group]), dtype=str)
+        if not len(members) or not len(species):
+            continue
+        # Buscar la posición de cada miembro en la lista principal ordenada
+        codes = np.searchsorted(species, members)
+        codes[codes == len(species)] = 0
+        matrix[codes[species[codes] == members], column] = 1
+    return species, groups, matrix
+
+# Función para contar las especies conservadas en cada grupo
+def conservation_counts(groups, matrix):
+    """
+    Cuenta las especies presentes en cada grupo a partir de las sumas por columna.
+
+    Args:
+        groups (list): Nombres de los grupos.
+        matrix (ndarray): Matriz de presencia/ausencia.
+
+    Returns:
+        dict: Nombre de cada grupo y número de especies conservadas.
+    """
+    return dict(zip(groups, matrix.sum(axis=0, dtype=np.int64).tolist()))
+
+# Función para escribir la matriz en formato TSV
+def write_presence_tsv(filename, species, groups, matrix):
+    """
+    Escribe la matriz de presencia/ausencia en un archivo separado por tabuladores.
+
+    Las filas de ceros y unos se generan en bloque a partir de la matriz, y el encabezado
+    se construye con los nombres de los grupos en el mismo orden que las columnas.
+
+    Args:
+        filename (str): Ruta del archivo de salida.
+        species (ndarray): Especies de cada fila.
+        groups (list): Nombres de los grupos de cada columna.
+        matrix (ndarray): Matriz de presencia/ausencia.
+    """
+    n_rows, n_groups = matrix.shape
+    # Cada fila se codifica como "\t0\t1...\n" con un ancho fijo de 2 * grupos + 1 bytes
+    cells = np.empty((n_rows, 2 * n_groups + 1), dtype=np.uint8)
+    cells[:, 0:-1:2] = ord('\t')
+    cells[:, 1:-1:2] = matrix + ord('0')
+    cells[:, -1] = ord('\n')
+    row_text = cells.tobytes().decode('ascii')
+    width = cells.shape[1]
+    with open(filename, 'w') as f:
+        f.write('ID' + ''.join('\t' + group for group in groups) + '\n')
+        f.writelines(name + row_text[row * width:(row + 1) * width] for row, name in enumerate(species.tolist()))
+
+# Función para guardar la matriz en formato NPZ
+def write_presence_npz(filename, species, groups, matrix):
+    """
+    Guarda la matriz de presencia/ausencia y sus etiquetas en un archivo .npz comprimido.
+
+    Args:
+        filename (str): Ruta del archivo de salida.
+        species (ndarray): Especies de cada fila.
+        groups (list): Nombres de los grupos de cada columna.
+        matrix (ndarray): Matriz de presencia/ausencia.
+    """
+    np.savez_compressed(filename, species=species, groups=np.array(groups, dtype=str), matrix=matrix)
+
+# Función para leer una matriz guardada en formato NPZ
+def read_presence_npz(filename):
+    """
+    Lee una matriz de presencia/ausencia guardada con write_presence_npz.
+
+    Args:
+        filename (str): Ruta del archivo .npz.
+
+    Returns:
+        tuple: Arreglo de especies, lista de nombres de grupos y matriz uint8.
+    """
+    with np.load(filename) as data:
+        return data['species'], data['groups'].tolist(), data['matrix']
+
+# Función para guardar la matriz en formato Parquet
+def write_presence_parquet(filename, species, groups, matrix):
+    """
+    Guarda la matriz de presencia/ausencia en formato Parquet. Requiere pyarrow.
+
+    Args:
+        filename (str): Ruta del archivo de salida.
+        species (ndarray): Especies de cada fila.
+        groups (list): Nombres de los grupos de cada columna.
+        matrix (ndarray): Matriz de presencia/ausencia.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Para guardar en formato Parquet es necesario instalar pyarrow") from None
+    columns = {'ID': pa.array(species.tolist())}
+    for column, group in enumerate(groups):
+        columns[group] = pa.array(matrix[:, column])
+    pq.write_table(pa.table(columns), filename)
+
+# Escritores disponibles para cada formato de salida
+WRITERS = {
+    'tsv': write_presence_tsv,
+    'npz': write_presence_npz,
+    'parquet': write_presence_parquet,
+}
@@ -0,0 +1,396 @@
+"""
+Actualización incremental del análisis al añadir o retirar especies.
+
+'init' ejecuta el análisis completo (pipeline.py) con la configuración indicada y guarda el
+estado de cada etapa en la carpeta 'state_dir' de la configuración (default: 'incremental_state'):
+
+    - ko_hits / mast_hits: especies de cada grupo de KOs y de motivos (state.json),
+    - matrix.npz: matriz de presencia/ausencia de C4,
+    - classes.npz: clase de cada fila de la matriz y contadores por clase de C5.
+
+'update' procesa solo las especies del cambio: busca los KOs de las nuevas especies en un
+archivo con sus líneas (formato de C1; sin --add-kos, sus líneas se toman de 'species_ko_file'
+de la configuración), ejecuta MAST solo para ellas (el registro de C3 omite
+los trabajos ya terminados), inserta o elimina sus filas de la matriz y suma o resta sus
+valores de los contadores por clase. Las tablas resultantes son idénticas a las de un análisis
+completo con los archivos de entrada ya actualizados (lista principal de especies, tabla de
+KOs y taxonomía, que se mantienen fuera de este script).
+
+Uso:
+    python incremental.py config.json init
+    python incremental.py config.json update [--add IDS] [--add-kos LINEAS_KO] [--remove IDS]
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from C3_Concatenated_MAST import read_species_ids
+from class_aggregation import DEFAULT_GROUP_BY, summarize_counts, write_aggregation
+from conservation_matrix import WRITERS, conservation_counts, read_presence_npz, write_presence_npz
+from pipeline import read_taxonomy, run_ko_filter, run_mast_stage, run_pipeline, stage_key
+
+# Archivos del estado incremental
+STATE_FILE = 'state.json'
+MATRIX_FILE = 'matrix.npz'
+CLASSES_FILE = 'classes.npz'
+
+# Archivo temporal con las líneas de KOs de las especies añadidas
+ADDED_KOS_FILE = 'added_kos.tmp'
+
+# Función para calcular la clave de los parámetros de los que depende el estado
+def state_key(config):
+    """
+    Calcula una clave con los parámetros que, si cambian, obligan a reconstruir el estado
+    (grupos de KOs, grupos de motivos, umbral de MAST y columnas taxonómicas).
+    """
+    mast_config = config.get('mast') or {}
+    params = {
+        'ko_groups': config.get('ko_groups', {}),
+        'motif_groups': mast_config.get('motif_groups', {}),
+        'max_pvalue': mast_config.get('max_pvalue'),
+        'meme_file': mast_config.get('meme_file'),
+        'group_by': list(config.get('group_by', DEFAULT_GROUP_BY)),
+    }
+    return stage_key('incremental', params, [])
+
+# Función para calcular el orden de salida de las clases
+def class_order(row_codes):
+    """
+    Devuelve los códigos de clase en orden de primera aparición en las filas de la matriz
+    (el mismo orden que usa aggregate_by_group), omitiendo las filas sin clasificar (-1).
+    """
+    classified = row_codes[row_codes >= 0]
+    codes, first = np.unique(classified, return_index=True)
+    return codes[np.argsort(first, kind='stable')]
+
+# Estado persistente del análisis incremental
+class IncrementalState:
+    """
+    Estado de cada etapa del análisis guardado en una carpeta.
+
+    Args:
+        state_dir (str): Carpeta del estado.
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+        self.key = None
+        self.ko_hits = {}
+        self.mast_hits = {}
+        self.group_by = list(DEFAULT_GROUP_BY)
+        self.class_keys = []
+        self.species = np.array([], dtype=str)
+        self.groups = []
+        self.matrix = np.zeros((0, 0), dtype=np.uint8)
+        self.row_codes = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, 0), dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self._class_index = {}
+
+    @classmethod
+    def load(cls, state_dir):
+        """
+        Lee el estado guardado en una carpeta.
+        """
+        state = cls(state_dir)
+        with open(os.path.join(state_dir, STATE_FILE), 'r') as f:
+            data = json.load(f)
+        state.key = data['key']
+        state.ko_hits = {group: set(members) for group, members in data['ko_hits'].items()}
+        state.mast_hits = {group: set(members) for group, members in data['mast_hits'].items()}
+        state.group_by = data['group_by']
+        state.class_keys = [tuple(key) for key in data['class_keys']]
+        state.species, state.groups, state.matrix = read_presence_npz(os.path.join(state_dir, MATRIX_FILE))
+        with np.load(os.path.join(state_dir, CLASSES_FILE)) as classes:
+            state.row_codes = classes['row_codes']
+            state.sums = classes['sums']
+            state.counts = classes['counts']
+        state._class_index = {key: code for code, key in enumerate(state.class_keys)}
+        return state
+
+    def save(self):
+        """
+        Guarda el estado; cada archivo se escribe primero con otro nombre y después se reemplaza.
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        data = {
+            'key': self.key,
+            'ko_hits': {group: sorted(members) for group, members in self.ko_hits.items()},
+            'mast_hits': {group: sorted(members) for group, members in self.mast_hits.items()},
+            'group_by': self.group_by,
+            'class_keys': [list(key) for key in self.class_keys],
+        }
+        state_path = os.path.join(self.state_dir, STATE_FILE)
+        matrix_path = os.path.join(self.state_dir, MATRIX_FILE)
+        classes_path = os.path.join(self.state_dir, CLASSES_FILE)
+        write_presence_npz(matrix_path + '.tmp.npz', self.species, self.groups, self.matrix)
+        np.savez_compressed(classes_path + '.tmp.npz', row_codes=self.row_codes, sums=self.sums, counts=self.counts)
+        with open(state_path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(matrix_path + '.tmp.npz', matrix_path)
+        os.replace(classes_path + '.tmp.npz', classes_path)
+        os.replace(state_path + '.tmp', state_path)
+
+    def species_dict(self):
+        """
+        Devuelve los conjuntos de especies de cada grupo en el orden de columnas de la matriz.
+        """
+        species_dict = dict(self.ko_hits)
+        species_dict.update(self.mast_hits)
+        return species_dict
+
+    def class_code(self, key):
+        """
+        Devuelve el código de una clase, añadiéndola a los contadores si es nueva.
+        """
+        if key not in self._class_index:
+            self._class_index[key] = len(self.class_keys)
+            self.class_keys.append(key)
+            self.sums = np.vstack([self.sums, np.zeros((1, self.sums.shape[1]), dtype=np.int64)])
+            self.counts = np.append(self.counts, 0)
+        return self._class_index[key]
+
+    def set_classes(self, taxonomy):
+        """
+        Calcula la clase de cada fila y los contadores por clase a partir de la matriz.
+        """
+        self.class_keys = []
+        self._class_index = {}
+        self.sums = np.zeros((0, len(self.groups)), dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.row_codes = np.full(len(self.species), -1, dtype=np.int64)
+        for row, name in enumerate(self.species.tolist()):
+            if name in taxonomy:
+                self.row_codes[row] = self.class_code(taxonomy[name])
+        classified = self.row_codes >= 0
+        np.add.at(self.sums, self.row_codes[classified], self.matrix[classified].astype(np.int64))
+        np.add.at(self.counts, self.row_codes[classified], 1)
+
+    def remove_species(self, names):
+        """
+        Retira especies de los grupos, de la matriz y de los contadores por clase.
+
+        Returns:
+            int: Número de filas eliminadas de la matriz.
+        """
+        names = set(names)
+        for members in list(self.ko_hits.values()) + list(self.mast_hits.values()):
+            members -= names
+        if not names or not len(self.species):
+            return 0
+        removed = np.isin(self.species, np.array(sorted(names), dtype=str))
+        rows = removed & (self.row_codes >= 0)
+        # Restar las filas eliminadas de los contadores de su clase
+        np.subtract.at(self.sums, self.row_codes[rows], self.matrix[rows].astype(np.int64))
+        np.subtract.at(self.counts, self.row_codes[rows], 1)
+        keep = ~removed
+        self.species = self.species[keep]
+        self.matrix = self.matrix[keep]
+        self.row_codes = self.row_codes[keep]
+        return int(removed.sum())
+
+    def add_species(self, names, ko_hits, mast_hits, taxonomy):
+        """
+        Añade especies nuevas a los grupos, inserta sus filas en la matriz ordenada y suma
+        sus valores a los contadores por clase.
+
+        Args:
+            names (list): Especies añadidas a la lista principal.
+            ko_hits (dict): Especies nuevas de cada grupo de KOs.
+            mast_hits (dict): Especies nuevas de cada grupo de motivos.
+            taxonomy (dict): Rangos taxonómicos de cada especie.
+        """
+        for group, members in ko_hits.items():
+            self.ko_hits.setdefault(group, set()).update(members)
+        for group, members in mast_hits.items():
+            self.mast_hits.setdefault(group, set()).update(members)
+        new_species = sorted(set(names) - set(self.species.tolist()))
+        if not new_species:
+            return
+        species_dict = self.species_dict()
+        rows = np.array([[name in species_dict[group] for group in self.groups] for name in new_species],
+                        dtype=np.uint8).reshape(len(new_species), len(self.groups))
+        codes = np.array([self.class_code(taxonomy[name]) if name in taxonomy else -1 for name in new_species],
+                         dtype=np.int64)
+
+        # Insertar las filas nuevas en su posición de la lista ordenada
+        new_array = np.array(new_species, dtype=str)
+        positions = np.searchsorted(self.species, new_array)
+        dtype = np.result_type(self.species.dtype, new_array.dtype)
+        self.species = np.insert(self.species.astype(dtype), positions, new_array)
+        self.matrix = np.insert(self.matrix, positions, rows, axis=0)
+        self.row_codes = np.insert(self.row_codes, positions, codes)
+
+        classified = codes >= 0
+        np.add.at(self.sums, codes[classified], rows[classified].astype(np.int64))
+        np.add.at(self.counts, codes[classified], 1)
+
+    def presence_matrix(self):
+        """
+        Devuelve la matriz como build_presence_matrix (el arreglo de especies con el tipo mínimo).
+        """
+        return np.array(self.species.tolist(), dtype=str), list(self.groups), self.matrix
+
+    def aggregation(self):
+        """
+        Devuelve la conservación por clase a partir de los contadores, como aggregate_by_group.
+        """
+        order = class_order(self.row_codes)
+        return summarize_counts(self.group_by, [self.class_keys[code] for code in order.tolist()],
+                                self.groups, self.sums[order], self.counts[order])
+
+# Función para copiar las líneas de KOs de algunas especies
+def extract_ko_lines(species_ko_file, names, output_file):
+    """
+    Copia a 'output_file' las líneas de la tabla de especies y KOs (formato de C1) de las
+    especies indicadas; el nombre de la especie es el último elemento de cada línea.
+
+    Returns:
+        set: Especies con alguna línea en la tabla.
+    """
+    names = set(names)
+    found = set()
+    with open(species_ko_file, 'r') as f, open(output_file, 'w') as out:
+        for line in f:
+            fields = line.split()
+            if fields and fields[-1] in names:
+                out.write(line)
+                found.add(fields[-1])
+    return found
+
+# Función para obtener las especies con alguna línea en un archivo de KOs
+def species_with_ko_lines(kos_file):
+    """
+    Devuelve las especies (último elemento de cada línea) de un archivo en el formato de C1.
+    """
+    with open(kos_file, 'r') as f:
+        return {fields[-1] for fields in map(str.split, f) if fields}
+
+# Función para leer los resultados de MAST solo de algunas especies
+def mast_hits_for(mast_config, species_ids):
+    """
+    Ejecuta MAST para las especies indicadas (omitiendo trabajos terminados) y devuelve las
+    especies de cada grupo de motivos entre ellas. Como en pipeline.py, solo se leen los
+    trabajos terminados correctamente; los fallidos se informan.
+    """
+    table = run_mast_stage(mast_config, species_ids)
+    return table.membership_sets(mast_config.get('motif_groups', {}), mast_config.get('max_pvalue'))
+
+# Función para escribir las tablas finales desde el estado
+def write_outputs(config, state):
+    """
+    Escribe la matriz de C4 y la tabla por clase de C5 configuradas, a partir del estado.
+    """
+    species, groups, matrix = state.presence_matrix()
+    if config.get('matrix_output'):
+        WRITERS[config.get('matrix_format', 'tsv')](config['matrix_output'], species, groups, matrix)
+    for group, count in conservation_counts(groups, matrix).items():
+        print(f"{group}: {count} especies conservadas")
+    if config.get('taxonomy_file') and config.get('class_output'):
+        write_aggregation(state.aggregation(), config['class_output'])
+
+# Función para construir el estado con un análisis completo
+def init_state(config, force=()):
+    """
+    Ejecuta el análisis completo y guarda el estado de cada etapa.
+
+    Args:
+        config (dict): Configuración de pipeline.py, con la clave opcional 'state_dir'.
+        force (iterable): Etapas que se vuelven a ejecutar aunque estén en la caché.
+
+    Returns:
+        IncrementalState: Estado guardado.
+    """
+    results = run_pipeline(config, force)
+    state = IncrementalState(config.get('state_dir', 'incremental_state'))
+    state.key = state_key(config)
+    state.ko_hits = {group: set(members) for group, members in results['ko_filter'].items()}
+    state.mast_hits = {group: set(members) for group, members in results.get('motif_groups', {}).items()}
+    state.group_by = list(config.get('group_by', DEFAULT_GROUP_BY))
+    state.species, state.groups, state.matrix = results['matrix']
+    taxonomy = read_taxonomy(config['taxonomy_file'], tuple(state.group_by)) if config.get('taxonomy_file') else {}
+    state.set_classes(taxonomy)
+    state.save()
+    return state
+
+# Función para aplicar un cambio de especies al estado
+def update_state(config, added=(), added_kos_file=None, removed=()):
+    """
+    Aplica al estado guardado un cambio de especies añadidas y retiradas.
+
+    Args:
+        config (dict): Configuración de pipeline.py, la misma usada en init_state.
+        added (list): IDs de las especies añadidas a la lista principal.
+        added_kos_file (str): Archivo con las líneas de KOs de las especies añadidas (formato de C1);
+            si no se indica, se extraen de 'species_ko_file' de la configuración.
+        removed (list): IDs de las especies retiradas.
+
+    Returns:
+        IncrementalState: Estado actualizado y guardado.
+    """
+    state = IncrementalState.load(config.get('state_dir', 'incremental_state'))
+    if state.key != state_key(config):
+        raise ValueError("Los grupos o parámetros de la configuración cambiaron; ejecute 'init' de nuevo.")
+
+    # Una especie que se vuelve a añadir se trata como retirada y añadida de nuevo
+    added = list(dict.fromkeys(added))
+    state.remove_species(set(removed) | set(added))
+
+    ko_hits = {}
+    if added:
+        source = added_kos_file or config['species_ko_file']
+        if added_kos_file is None:
+            # Tomar de la tabla completa (ya actualizada) solo las líneas de las especies añadidas
+            kos_file = os.path.join(state.state_dir, ADDED_KOS_FILE)
+            with_kos = extract_ko_lines(source, added, kos_file)
+        else:
+            kos_file = added_kos_file
+            with_kos = species_with_ko_lines(kos_file)
+        without_kos = [name for name in added if name not in with_kos]
+        if without_kos:
+            print(f"Advertencia: {len(without_kos)} especies añadidas no tienen línea de KOs en '{source}' "
+                  f"y no se asignan a ningún grupo de KOs (p. ej. {without_kos[0]}).")
+        try:
+            ko_hits = run_ko_filter(kos_file, config.get('ko_groups', {}))
+        finally:
+            if added_kos_file is None:
+                os.remove(kos_file)
+    mast_config = config.get('mast')
+    mast_hits = mast_hits_for(mast_config, added) if mast_config and added else {}
+    taxonomy = read_taxonomy(config['taxonomy_file'], tuple(state.group_by)) if config.get('taxonomy_file') else {}
+    missing = [name for name in added if name not in taxonomy]
+    if config.get('taxonomy_file') and missing:
+        print(f"Advertencia: {len(missing)} especies añadidas no tienen clasificación taxonómica y se omiten.")
+    state.add_species(added, ko_hits, mast_hits, taxonomy)
+    state.save()
+    return state
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('config', help="Archivo de configuración JSON de pipeline.py")
+    parser.add_argument('command', choices=('init', 'update'), help="Construir el estado o aplicar un cambio")
+    parser.add_argument('--add', metavar='IDS', help="Archivo con los IDs de las especies añadidas")
+    parser.add_argument('--add-kos', metavar='ARCHIVO', help="Líneas de KOs de las especies añadidas (formato de C1)")
+    parser.add_argument('--remove', metavar='IDS', help="Archivo con los IDs de las especies retiradas")
+    parser.add_argument('--force', action='append', default=[],
+                        help="Con 'init', volver a ejecutar una etapa aunque esté en la caché (se puede repetir)")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    if args.command == 'init':
+        state = init_state(config, args.force)
+        print(f"Estado inicial guardado en '{state.state_dir}' con {len(state.species)} especies.")
+    else:
+        added = read_species_ids(args.add) if args.add else []
+        removed = read_species_ids(args.remove) if args.remove else []
+        state = update_state(config, added, args.add_kos, removed)
+        print(f"Estado actualizado: {len(added)} especies añadidas, {len(removed)} retiradas, "
+              f"{len(state.species)} especies en total.")
+    write_outputs(config, state)
+
+if __name__ == '__main__':
+    main()
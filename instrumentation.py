@@ -0,0 +1,402 @@
+"""
+Medición de tiempos, registros procesados y memoria de cada etapa del análisis.
+
+Cada script registra sus etapas y subetapas (lectura del FASTA, búsqueda de motivos,
+comprobación de superposiciones, trabajos de MAST, agregación, ...) en un RunReport.
+Con la opción --report el informe se guarda en JSON y con --profile se añade un perfil de
+cProfile o de tracemalloc. Dos informes se comparan con:
+
+    python instrumentation.py informe_anterior.json informe_nuevo.json [--tolerance 0.1]
+"""
+import argparse
+import cProfile
+import heapq
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Perfiladores admitidos por la opción --profile
+PROFILERS = ('cprofile', 'tracemalloc')
+
+# Número de elementos más lentos (especies, secuencias, motivos) que se guardan por etapa
+SLOWEST_ITEMS = 20
+
+# Número de funciones o líneas del perfil que se guardan en el informe
+PROFILE_ENTRIES = 25
+
+# Función para obtener el pico de memoria residente del proceso y de sus hijos
+def peak_rss_mb():
+    """
+    Devuelve el pico de memoria residente (RSS) en MB del proceso actual y, por separado,
+    el mayor pico de sus procesos hijos terminados (p. ej. MAST o los procesos de trabajo de C2).
+
+    Returns:
+        tuple: (pico del proceso, pico de los hijos), o (None, None) si no está disponible.
+    """
+    if resource is None:
+        return None, None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+    return round(own, 1), round(children, 1)
+
+# Función para calcular un rendimiento sin dividir por cero
+def _rate(amount, seconds):
+    return round(amount / seconds, 1) if amount and seconds > 0 else None
+
+# Mediciones de una etapa
+class StageRecord:
+    """
+    Tiempo, registros procesados y memoria de una etapa, con sus subetapas acumuladas
+    y los elementos individuales más lentos.
+
+    Solo se guardan los SLOWEST_ITEMS elementos más lentos, de modo que la memoria no crece con
+    el número de secuencias o especies. Sin 'detailed' no se registran elementos ni se mide la
+    lectura elemento a elemento (timed_iter), para no añadir coste cuando no se pidió un informe.
+
+    Args:
+        name (str): Nombre de la etapa.
+        detailed (bool): Registrar elementos individuales y tiempos de lectura (default: True).
+    """
+
+    def __init__(self, name, detailed=True):
+        self.name = name
+        self.detailed = detailed
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.records = 0
+        self.bytes = 0
+        self.peak_rss_mb = None
+        self.children_peak_rss_mb = None
+        self.steps = {}
+        # Montículo de mínimos con los elementos más lentos: (segundos, orden, clave)
+        self.slowest = []
+        self._item_count = 0
+        self.details = {}
+
+    def add_records(self, count, nbytes=0):
+        """
+        Suma registros (y opcionalmente bytes) procesados por la etapa.
+        """
+        self.records += count
+        self.bytes += nbytes
+
+    def add_step(self, name, seconds, records=0, nbytes=0):
+        """
+        Acumula el tiempo y los registros de una subetapa; se puede llamar muchas veces
+        con el mismo nombre (p. ej. una vez por secuencia).
+        """
+        step = self.steps.setdefault(name, {'wall_time': 0.0, 'calls': 0, 'records': 0, 'bytes': 0})
+        step['wall_time'] += seconds
+        step['calls'] += 1
+        step['records'] += records
+        step['bytes'] += nbytes
+
+    @contextmanager
+    def step(self, name, records=0, nbytes=0):
+        """
+        Mide una subetapa como bloque 'with'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_step(name, time.perf_counter() - start, records, nbytes)
+
+    def timed_iter(self, iterable, name):
+        """
+        Recorre un iterable midiendo como subetapa 'name' el tiempo de obtener cada elemento
+        (p. ej. la lectura de un FASTA como flujo) y contando los elementos. Sin 'detailed'
+        devuelve el iterable sin medirlo.
+        """
+        if not self.detailed:
+            return iter(iterable)
+        return self._timed_iter(iterable, name)
+
+    def _timed_iter(self, iterable, name):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_step(name, time.perf_counter() - start)
+                return
+            self.add_step(name, time.perf_counter() - start, records=1)
+            yield item
+
+    def add_item(self, key, seconds):
+        """
+        Registra el tiempo de un elemento individual (especie, secuencia o motivo); solo se
+        conservan los SLOWEST_ITEMS más lentos.
+        """
+        if not self.detailed:
+            return
+        self._item_count += 1
+        entry = (seconds, self._item_count, key)
+        if len(self.slowest) < SLOWEST_ITEMS:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def merge(self, other):
+        """
+        Suma a esta etapa los registros, subetapas y elementos de otra (p. ej. las mediciones
+        devueltas por un proceso de trabajo).
+        """
+        self.add_records(other.records, other.bytes)
+        for name, step in other.steps.items():
+            own = self.steps.setdefault(name, {'wall_time': 0.0, 'calls': 0, 'records': 0, 'bytes': 0})
+            for field, value in step.items():
+                own[field] += value
+        for seconds, _, key in other.slowest:
+            self.add_item(key, seconds)
+
+    def to_dict(self, max_items=SLOWEST_ITEMS):
+        """
+        Devuelve las mediciones de la etapa como diccionario serializable en JSON.
+        """
+        steps = {}
+        for name, step in self.steps.items():
+            steps[name] = {
+                'wall_time': round(step['wall_time'], 4),
+                'calls': step['calls'],
+                'records': step['records'],
+                'records_per_s': _rate(step['records'], step['wall_time']),
+                'mb_per_s': _rate(step['bytes'] / 1e6, step['wall_time']),
+            }
+        slowest = [(key, seconds) for seconds, _, key in sorted(self.slowest, reverse=True)[:max_items]]
+        return {
+            'name': self.name,
+            'wall_time': round(self.wall_time, 4),
+            'cpu_time': round(self.cpu_time, 4),
+            'records': self.records,
+            'records_per_s': _rate(self.records, self.wall_time),
+            'mb_per_s': _rate(self.bytes / 1e6, self.wall_time),
+            'peak_rss_mb': self.peak_rss_mb,
+            'children_peak_rss_mb': self.children_peak_rss_mb,
+            'steps': steps,
+            'slowest': [{'key': key, 'seconds': round(seconds, 4)} for key, seconds in slowest],
+            'details': self.details,
+        }
+
+# Informe de una ejecución
+class RunReport:
+    """
+    Informe de una ejecución con las mediciones de cada etapa y un perfil opcional.
+
+    Args:
+        name (str): Nombre del script o del análisis.
+        profile (str): Perfilador a usar: 'cprofile', 'tracemalloc' o None (default).
+        detailed (bool): Registrar elementos individuales en las etapas (default: True).
+    """
+
+    def __init__(self, name, profile=None, detailed=True):
+        if profile not in (None,) + PROFILERS:
+            raise ValueError(f"Perfilador no admitido: {profile!r}")
+        self.name = name
+        self.profile = profile
+        self.detailed = detailed
+        self.stages = []
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self._profiler = None
+        if profile == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif profile == 'tracemalloc':
+            tracemalloc.start()
+        self.profile_result = None
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Mide una etapa como bloque 'with' y devuelve su StageRecord para registrar
+        registros, subetapas y elementos.
+        """
+        record = StageRecord(name, self.detailed)
+        self.stages.append(record)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - start
+            record.cpu_time = time.process_time() - cpu_start
+            record.peak_rss_mb, record.children_peak_rss_mb = peak_rss_mb()
+
+    def stop_profile(self, profile_path=None):
+        """
+        Detiene el perfilador y guarda sus entradas más costosas en el informe.
+
+        Args:
+            profile_path (str): Archivo donde guardar las estadísticas completas de cProfile (opcional).
+        """
+        if self.profile == 'cprofile' and self._profiler is not None:
+            self._profiler.disable()
+            if profile_path:
+                self._profiler.dump_stats(profile_path)
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=stream)
+            entries = []
+            for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+                entries.append({'function': f'{os.path.basename(filename)}:{line}({function})',
+                                'calls': calls, 'tottime': round(total, 4), 'cumtime': round(cumulative, 4)})
+            entries.sort(key=lambda entry: entry['cumtime'], reverse=True)
+            self.profile_result = {'profiler': 'cprofile', 'file': profile_path, 'top': entries[:PROFILE_ENTRIES]}
+            self._profiler = None
+        elif self.profile == 'tracemalloc' and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:PROFILE_ENTRIES]
+            tracemalloc.stop()
+            self.profile_result = {
+                'profiler': 'tracemalloc',
+                'peak_traced_mb': round(peak / 1024 / 1024, 2),
+                'top': [{'line': str(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                        for stat in statistics],
+            }
+
+    def to_dict(self):
+        """
+        Devuelve el informe completo como diccionario serializable en JSON.
+        """
+        own, children = peak_rss_mb()
+        return {
+            'run': self.name,
+            'started': self.started,
+            'argv': sys.argv,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'wall_time': round(time.perf_counter() - self._start, 4),
+            'peak_rss_mb': own,
+            'children_peak_rss_mb': children,
+            'stages': [stage.to_dict() for stage in self.stages],
+            'profile': self.profile_result,
+        }
+
+    def write(self, filename):
+        """
+        Guarda el informe en un archivo JSON.
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_summary(self, file=sys.stderr):
+        """
+        Muestra un resumen de las etapas y subetapas (por defecto en la salida de error,
+        para no mezclarlo con los resultados de los scripts).
+        """
+        for stage in self.stages:
+            data = stage.to_dict()
+            rate = f", {data['records_per_s']} registros/s" if data['records_per_s'] else ''
+            print(f"[{self.name}] {stage.name}: {data['wall_time']:.3f} s, {data['records']} registros{rate}, "
+                  f"pico RSS {data['peak_rss_mb']} MB", file=file)
+            for name, step in data['steps'].items():
+                print(f"    {name}: {step['wall_time']:.3f} s ({step['calls']} llamadas, {step['records']} registros)", file=file)
+
+# Función para añadir las opciones de instrumentación a un script
+def add_report_arguments(parser):
+    """
+    Añade las opciones --report y --profile a un analizador de argumentos.
+    """
+    parser.add_argument('--report', metavar='JSON',
+                        help="Guardar un informe JSON con tiempos, registros y memoria de cada etapa")
+    parser.add_argument('--profile', choices=PROFILERS,
+                        help="Perfilar la ejecución con cProfile o tracemalloc (el perfil se añade al informe)")
+
+# Función para crear el informe de una ejecución a partir de las opciones
+def report_from_args(name, args):
+    """
+    Crea el RunReport de un script a partir de las opciones --report y --profile. Sin ninguna
+    de las dos, el informe no registra elementos individuales.
+    """
+    profile = getattr(args, 'profile', None)
+    return RunReport(name, profile, detailed=bool(getattr(args, 'report', None) or profile))
+
+# Función para cerrar y guardar el informe de una ejecución
+def finish_report(report, args):
+    """
+    Detiene el perfilador y, si se pidió con --report o --profile, muestra el resumen y guarda
+    el informe. Las estadísticas completas de cProfile se guardan junto al informe ('.prof').
+    """
+    report_file = getattr(args, 'report', None)
+    if report.profile == 'cprofile':
+        base = os.path.splitext(report_file)[0] if report_file else report.name
+        report.stop_profile(base + '.prof')
+    else:
+        report.stop_profile()
+    if report_file or report.profile:
+        report.print_summary()
+    if report_file:
+        report.write(report_file)
+        print(f"Informe de ejecución guardado en '{report_file}'.", file=sys.stderr)
+
+# Función para comparar dos informes de ejecución
+def compare_reports(old, new, tolerance=0.1):
+    """
+    Compara el tiempo de cada etapa y subetapa entre dos informes.
+
+    Args:
+        old (dict): Informe de referencia.
+        new (dict): Informe nuevo.
+        tolerance (float): Aumento relativo a partir del cual se marca una regresión (default: 10%).
+
+    Returns:
+        list: Tuplas (nombre, tiempo anterior, tiempo nuevo, cociente, es_regresión).
+    """
+    def times(report):
+        result = {}
+        for stage in report['stages']:
+            result[stage['name']] = stage['wall_time']
+            for name, step in stage['steps'].items():
+                result[f"{stage['name']}/{name}"] = step['wall_time']
+        return result
+
+    old_times, new_times = times(old), times(new)
+    rows = []
+    for name, new_time in new_times.items():
+        if name not in old_times:
+            continue
+        old_time = old_times[name]
+        ratio = new_time / old_time if old_time > 0 else None
+        rows.append((name, old_time, new_time, ratio, ratio is not None and ratio > 1 + tolerance))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('old', help="Informe JSON de referencia")
+    parser.add_argument('new', help="Informe JSON nuevo")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Aumento relativo de tiempo considerado regresión (default: 0.1)")
+    args = parser.parse_args()
+
+    with open(args.old, 'r') as f:
+        old = json.load(f)
+    with open(args.new, 'r') as f:
+        new = json.load(f)
+
+    regressions = 0
+    print(f"{'Etapa':<40}\t{'Antes (s)':>10}\t{'Ahora (s)':>10}\t{'Cociente':>8}")
+    for name, old_time, new_time, ratio, regression in compare_reports(old, new, args.tolerance):
+        ratio_text = f'{ratio:.2f}x' if ratio is not None else '-'
+        flag = '  <-- regresión' if regression else ''
+        print(f"{name:<40}\t{old_time:>10.4f}\t{new_time:>10.4f}\t{ratio_text:>8}{flag}")
+        regressions += regression
+    if regressions:
+        sys.exit(f"{regressions} etapas superan la tolerancia de {args.tolerance:.0%}.")
+
+if __name__ == '__main__':
+    main()
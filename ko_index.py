@@ -0,0 +1,205 @@
+import json
+import os
+
+import numpy as np
+
+# Archivos que forman el índice dentro de su carpeta
+KOS_FILE = 'kos.txt'
+BITS_FILE = 'bits.npy'
+LINES_FILE = 'lines.txt'
+OFFSETS_FILE = 'line_offsets.npy'
+META_FILE = 'meta.json'
+
+# Número de filas que se procesan a la vez en las consultas
+QUERY_CHUNK_ROWS = 1 << 20
+
+# Tamaño de los bloques de filas que se escriben a la vez al construir el índice
+BUILD_BLOCK_BYTES = 1 << 24
+
+# Función para contar los bits activos de cada elemento de un arreglo uint64
+def _popcount_rows(words):
+    """
+    Cuenta los bits activos de cada fila de una matriz uint64.
+
+    Args:
+        words (ndarray): Matriz uint64 de forma (filas, palabras).
+
+    Returns:
+        ndarray: Número de bits activos por fila.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    # NumPy < 2.0: contar los bits sobre la vista en bytes
+    as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(len(words), -1)
+    return np.unpackbits(as_bytes, axis=1).sum(axis=1, dtype=np.int64)
+
+# Función para saber si el índice corresponde a la versión actual del archivo de entrada
+def _source_signature(file_name):
+    stat = os.stat(file_name)
+    return {'source': os.path.abspath(file_name), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+# Función para construir el índice de presencia/ausencia de KOs
+def build_ko_index(file_name, index_dir):
+    """
+    Construye un índice binario de presencia/ausencia de KOs a partir del archivo de especies y KOs.
+
+    Cada KO se asigna a una columna y cada línea del archivo se guarda como una fila de bits
+    empaquetada en palabras uint64, en una matriz .npy que se abre como archivo mapeado en
+    memoria. Las líneas originales se guardan aparte para poder reproducir la salida de C1.
+
+    Args:
+        file_name (str): Archivo de entrada con una especie por línea (KOs seguidos del nombre de la especie).
+        index_dir (str): Carpeta donde se guardará el índice.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+
+    # Primera pasada: asignar una columna a cada KO y guardar las líneas originales
+    ko_columns = {}
+    offsets = []
+    with open(file_name, 'r') as file, open(os.path.join(index_dir, LINES_FILE), 'wb') as lines_out:
+        position = 0
+        for line in file:
+            parts = line.split()
+            if not parts:
+                continue  # Ignorar las líneas vacías
+            for ko in parts[:-1]:
+                if ko not in ko_columns:
+                    ko_columns[ko] = len(ko_columns)
+            encoded = (line.strip() + '\n').encode()
+            lines_out.write(encoded)
+            offsets.append(position)
+            position += len(encoded)
+        offsets.append(position)
+
+    # Segunda pasada: rellenar la matriz de bits por bloques de filas
+    n_words = max(1, (len(ko_columns) + 63) // 64)
+    row_bytes = n_words * 8
+    bits = np.lib.format.open_memmap(os.path.join(index_dir, BITS_FILE), mode='w+',
+                                     dtype=np.dtype('<u8'), shape=(len(offsets) - 1, n_words))
+    with open(file_name, 'r') as file:
+        row = 0
+        block = bytearray()
+        for line in file:
+            parts = line.split()
+            if not parts:
+                continue
+            value = 0
+            for ko in parts[:-1]:
+                value |= 1 << ko_columns[ko]
+            block += value.to_bytes(row_bytes, 'little')
+            if len(block) >= BUILD_BLOCK_BYTES:
+                block_rows = len(block) // row_bytes
+                bits[row:row + block_rows] = np.frombuffer(block, dtype='<u8').reshape(block_rows, n_words)
+                row += block_rows
+                block = bytearray()
+        if block:
+            block_rows = len(block) // row_bytes
+            bits[row:row + block_rows] = np.frombuffer(block, dtype='<u8').reshape(block_rows, n_words)
+    bits.flush()
+    del bits
+
+    np.save(os.path.join(index_dir, OFFSETS_FILE), np.array(offsets, dtype=np.uint64))
+    with open(os.path.join(index_dir, KOS_FILE), 'w') as f:
+        for ko in ko_columns:
+            f.write(ko + '\n')
+    with open(os.path.join(index_dir, META_FILE), 'w') as f:
+        json.dump(_source_signature(file_name), f)
+
+# Índice de presencia/ausencia de KOs
+class KOIndex:
+    """
+    Índice de presencia/ausencia de KOs abierto como archivos mapeados en memoria.
+
+    Args:
+        index_dir (str): Carpeta creada con build_ko_index.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, KOS_FILE), 'r') as f:
+            self.ko_columns = {line.rstrip('\n'): column for column, line in enumerate(f)}
+        self.bits = np.load(os.path.join(index_dir, BITS_FILE), mmap_mode='r')
+        self.offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode='r')
+        lines_path = os.path.join(index_dir, LINES_FILE)
+        self.lines = np.memmap(lines_path, dtype=np.uint8, mode='r') if os.path.getsize(lines_path) else b''
+
+    def __len__(self):
+        return len(self.bits)
+
+    @classmethod
+    def open_or_build(cls, file_name, index_dir):
+        """
+        Abre el índice de 'file_name', construyéndolo primero si no existe o si el archivo cambió.
+
+        Args:
+            file_name (str): Archivo de entrada con los datos de especies y KOs.
+            index_dir (str): Carpeta del índice.
+
+        Returns:
+            KOIndex: Índice abierto.
+        """
+        meta_path = os.path.join(index_dir, META_FILE)
+        signature = None
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                signature = json.load(f)
+        if signature != _source_signature(file_name):
+            build_ko_index(file_name, index_dir)
+        return cls(index_dir)
+
+    def _mask(self, kos):
+        """
+        Construye la máscara de bits de un conjunto de KOs; los KOs desconocidos se ignoran.
+        """
+        mask = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for ko in kos:
+            column = self.ko_columns.get(ko)
+            if column is not None:
+                mask[column >> 6] |= np.uint64(1 << (column & 63))
+        return mask
+
+    def matching_rows(self, kos_list, min_kos=3, fixed_ko=None):
+        """
+        Devuelve las filas que contienen al menos 'min_kos' KOs de la lista y el KO fijo opcional.
+
+        Args:
+            kos_list (set): Conjunto de identificadores de KOs de interés.
+            min_kos (int): Número mínimo de KOs de la lista (default: 3).
+            fixed_ko (str): KO fijo que cada especie debe tener.
+
+        Returns:
+            ndarray: Índices de las filas que cumplen los criterios, en el orden del archivo.
+        """
+        if fixed_ko and fixed_ko not in self.ko_columns:
+            return np.array([], dtype=np.int64)
+        mask = self._mask(kos_list)
+        rows = []
+        for start in range(0, len(self.bits), QUERY_CHUNK_ROWS):
+            chunk = self.bits[start:start + QUERY_CHUNK_ROWS]
+            selected = _popcount_rows(chunk & mask) >= min_kos
+            if fixed_ko:
+                column = self.ko_columns[fixed_ko]
+                selected &= (chunk[:, column >> 6] & np.uint64(1 << (column & 63))) != 0
+            rows.append(np.flatnonzero(selected) + start)
+        return np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+
+    def line(self, row):
+        """
+        Devuelve la línea original (sin espacios al final) de una fila.
+        """
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return bytes(self.lines[start:end]).decode().rstrip('\n')
+
+    def find_species(self, kos_list, min_kos=3, fixed_ko=None):
+        """
+        Equivalente indexado de find_species_with_min_kos_and_fixed_ko de C1.
+
+        Args:
+            kos_list (set): Conjunto de identificadores de KOs de interés.
+            min_kos (int): Número mínimo de KOs de la lista (default: 3).
+            fixed_ko (str): KO fijo que cada especie debe tener.
+
+        Returns:
+            list: Líneas completas de las especies que cumplen con los criterios de selección.
+        """
+        return [self.line(row) for row in self.matching_rows(kos_list, min_kos, fixed_ko)]
@@ -0,0 +1,381 @@
+import argparse
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mast_scheduler import finished_species, load_manifest
+
+# Sufijo de las carpetas de resultados de MAST creadas por C3
+MAST_FOLDER_SUFFIX = '_mast_out'
+
+# Expresión regular para los sitios del diagrama de motivos de mast.txt, p. ej. "[+1(3.4e-06)]"
+DIAGRAM_HIT = re.compile(r'\[([+-]?)(\d+)\(([^)]+)\)\]')
+
+# Error de lectura de un resultado de MAST incompleto o con un formato no válido
+class MastParseError(ValueError):
+    """
+    Resultado de MAST que no se puede leer (p. ej. un mast.xml truncado por un trabajo
+    interrumpido). El mensaje incluye la carpeta o el archivo afectado.
+    """
+
+# Función para leer los sitios de un archivo mast.xml
+def parse_mast_xml(filename):
+    """
+    Lee los sitios encontrados por MAST desde un archivo mast.xml.
+
+    Args:
+        filename (str): Ruta del archivo mast.xml.
+
+    Returns:
+        tuple: Lista de motivos (ID, ID alternativo) y lista de tuplas
+               (secuencia, índice del motivo, posición, p-valor). Las posiciones empiezan en 1,
+               como en la salida de MAST.
+    """
+    motifs = []
+    hits = []
+    sequence_name = None
+    for event, element in ET.iterparse(filename, events=('start', 'end')):
+        if event == 'start':
+            if element.tag == 'sequence':
+                sequence_name = element.get('name')
+            continue
+        if element.tag == 'motif' and element.get('id') is not None:
+            motifs.append((element.get('id'), element.get('alt') or element.get('name') or ''))
+        elif element.tag == 'hit':
+            hits.append((sequence_name, int(element.get('idx')), int(element.get('pos')), float(element.get('pvalue'))))
+        elif element.tag == 'sequence':
+            # Liberar la memoria de las secuencias ya procesadas
+            element.clear()
+    return motifs, hits
+
+# Función para leer los sitios de un archivo mast.txt
+def parse_mast_txt(filename):
+    """
+    Lee los sitios encontrados por MAST desde la sección II (diagramas de motivos) de mast.txt.
+
+    Se usa cuando no existe mast.xml. Las posiciones se calculan sumando los espacios del
+    diagrama y la anchura de los motivos indicada en la sección I.
+
+    Args:
+        filename (str): Ruta del archivo mast.txt.
+
+    Returns:
+        tuple: Lista de motivos (ID, ID alternativo) y lista de tuplas
+               (secuencia, índice del motivo, posición, p-valor). Las posiciones empiezan en 1.
+    """
+    with open(filename, 'r') as f:
+        lines = f.read().splitlines()
+
+    # Sección I: tabla de motivos, con la anchura en la penúltima columna
+    motifs = []
+    widths = []
+    index = 0
+    while index < len(lines) and not (lines[index].strip().startswith('MOTIF') and 'WIDTH' in lines[index]):
+        index += 1
+    if index >= len(lines):
+        raise MastParseError(f"'{filename}' no contiene la tabla de motivos (sección I)")
+    index += 2  # Saltar el encabezado y la línea de guiones
+    while index < len(lines) and lines[index].strip():
+        parts = lines[index].split()
+        widths.append(int(parts[-2]))
+        motif_id = parts[1] if len(parts) > 3 else parts[0]
+        motif_alt = parts[2] if len(parts) > 4 else ''
+        motifs.append((motif_id, motif_alt))
+        index += 1
+
+    # Sección II: diagramas de motivos, que pueden continuar en varias líneas
+    while index < len(lines) and not (lines[index].startswith('SEQUENCE NAME') and 'DIAGRAM' in lines[index]):
+        index += 1
+    if index >= len(lines):
+        raise MastParseError(f"'{filename}' no contiene los diagramas de motivos (sección II)")
+    index += 2
+    entries = []
+    while index < len(lines) and lines[index].strip() and not lines[index].startswith('*'):
+        line = lines[index]
+        if line[0].isspace() and entries:
+            entries[-1][1] += line.strip()
+        else:
+            parts = line.split()
+            entries.append([parts[0], ''.join(parts[2:])])
+        index += 1
+    # La sección II termina con una línea vacía o de asteriscos; si el archivo acaba antes, está truncado
+    if index >= len(lines):
+        raise MastParseError(f"'{filename}' termina dentro de los diagramas de motivos (sección II)")
+
+    hits = []
+    for sequence_name, diagram in entries:
+        position = 1
+        for token in diagram.split('_'):
+            match = DIAGRAM_HIT.fullmatch(token)
+            if match:
+                motif_index = int(match.group(2)) - 1
+                hits.append((sequence_name, motif_index, position, float(match.group(3))))
+                position += widths[motif_index]
+            elif token.isdigit():
+                position += int(token)
+    return motifs, hits
+
+# Función para leer el resultado de MAST de una especie
+def parse_mast_folder(folder):
+    """
+    Lee el resultado de MAST de una carpeta, usando mast.xml si existe y mast.txt en caso contrario.
+
+    Args:
+        folder (str): Carpeta de resultados de MAST de una especie.
+
+    Returns:
+        tuple: Lista de motivos y lista de sitios, o (None, None) si la carpeta no tiene resultados.
+
+    Raises:
+        MastParseError: Si el archivo de resultados está incompleto o no tiene el formato esperado.
+    """
+    xml_file = os.path.join(folder, 'mast.xml')
+    txt_file = os.path.join(folder, 'mast.txt')
+    try:
+        if os.path.exists(xml_file):
+            return parse_mast_xml(xml_file)
+        if os.path.exists(txt_file):
+            return parse_mast_txt(txt_file)
+    except (ET.ParseError, ValueError, IndexError, TypeError) as error:
+        raise MastParseError(f"Resultado de MAST incompleto o no válido en '{folder}': {error}") from None
+    return None, None
+
+# Tabla columnar de sitios de MAST
+class MastHitTable:
+    """
+    Tabla columnar con todos los sitios de MAST de un conjunto de especies.
+
+    Las especies, secuencias y motivos se guardan como códigos enteros que indexan sus listas
+    de nombres, y las posiciones y p-valores como arreglos de NumPy.
+
+    Args:
+        species (list): Nombres de las especies.
+        sequences (list): Nombres de las secuencias.
+        motifs (list): Motivos como tuplas (ID, ID alternativo).
+        species_codes, sequence_codes, motif_codes (ndarray): Códigos de cada sitio.
+        positions (ndarray): Posición de inicio de cada sitio (empezando en 1).
+        pvalues (ndarray): P-valor de cada sitio.
+    """
+
+    def __init__(self, species, sequences, motifs, species_codes, sequence_codes, motif_codes, positions, pvalues):
+        self.species = list(species)
+        self.sequences = list(sequences)
+        self.motifs = [tuple(motif) for motif in motifs]
+        self.species_codes = np.asarray(species_codes, dtype=np.int32)
+        self.sequence_codes = np.asarray(sequence_codes, dtype=np.int32)
+        self.motif_codes = np.asarray(motif_codes, dtype=np.int32)
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.pvalues = np.asarray(pvalues, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.pvalues)
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Construye la tabla a partir de los resultados leídos de cada especie.
+
+        Args:
+            results (iterable): Tuplas (especie, motivos, sitios) como las de parse_mast_folder.
+
+        Returns:
+            MastHitTable: Tabla con los sitios de todas las especies.
+        """
+        species, sequences, motifs = [], [], []
+        sequence_index, motif_index = {}, {}
+        columns = ([], [], [], [], [])
+        for species_id, species_motifs, hits in results:
+            species_code = len(species)
+            species.append(species_id)
+            # Traducir los índices de motivo locales de la especie a códigos globales
+            local_codes = []
+            for motif in species_motifs:
+                if motif not in motif_index:
+                    motif_index[motif] = len(motifs)
+                    motifs.append(motif)
+                local_codes.append(motif_index[motif])
+            for sequence_name, local_motif, position, pvalue in hits:
+                if sequence_name not in sequence_index:
+                    sequence_index[sequence_name] = len(sequences)
+                    sequences.append(sequence_name)
+                columns[0].append(species_code)
+                columns[1].append(sequence_index[sequence_name])
+                columns[2].append(local_codes[local_motif])
+                columns[3].append(position)
+                columns[4].append(pvalue)
+        return cls(species, sequences, motifs, *columns)
+
+    def save(self, filename):
+        """
+        Guarda la tabla en un archivo .npz para no volver a leer los resultados de MAST.
+
+        Args:
+            filename (str): Ruta del archivo .npz de salida.
+        """
+        np.savez_compressed(
+            filename,
+            species=np.array(self.species, dtype=str),
+            sequences=np.array(self.sequences, dtype=str),
+            motifs=np.array(self.motifs, dtype=str).reshape(-1, 2),
+            species_codes=self.species_codes,
+            sequence_codes=self.sequence_codes,
+            motif_codes=self.motif_codes,
+            positions=self.positions,
+            pvalues=self.pvalues,
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Carga una tabla guardada con save().
+
+        Args:
+            filename (str): Ruta del archivo .npz.
+
+        Returns:
+            MastHitTable: Tabla de sitios.
+        """
+        with np.load(filename) as data:
+            return cls(data['species'].tolist(), data['sequences'].tolist(), data['motifs'].tolist(),
+                       data['species_codes'], data['sequence_codes'], data['motif_codes'],
+                       data['positions'], data['pvalues'])
+
+    def motif_codes_for(self, motif_names):
+        """
+        Devuelve los códigos de los motivos cuyo ID o ID alternativo está en 'motif_names'.
+
+        Args:
+            motif_names (iterable): IDs o IDs alternativos de motivos.
+
+        Returns:
+            ndarray: Códigos de los motivos seleccionados.
+        """
+        names = set(motif_names)
+        return np.array([code for code, (motif_id, motif_alt) in enumerate(self.motifs)
+                         if motif_id in names or motif_alt in names], dtype=np.int32)
+
+    def species_with_motifs(self, motif_names=None, max_pvalue=None):
+        """
+        Devuelve las especies con al menos un sitio de alguno de los motivos indicados.
+
+        Args:
+            motif_names (iterable): IDs o IDs alternativos de motivos (default: todos los motivos).
+            max_pvalue (float): P-valor máximo para considerar un sitio (default: sin umbral).
+
+        Returns:
+            set: Nombres de las especies con algún sitio que cumple los criterios.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if motif_names is not None:
+            mask &= np.isin(self.motif_codes, self.motif_codes_for(motif_names))
+        if max_pvalue is not None:
+            mask &= self.pvalues <= max_pvalue
+        return {self.species[code] for code in np.unique(self.species_codes[mask])}
+
+    def membership_sets(self, groups, max_pvalue=None):
+        """
+        Construye los conjuntos de especies de cada grupo de motivos, p. ej. 'SigE_motivo'.
+
+        Args:
+            groups (dict): Nombre de cada grupo y lista de IDs de los motivos que lo forman.
+            max_pvalue (float): P-valor máximo para considerar un sitio (default: sin umbral).
+
+        Returns:
+            dict: Nombre de cada grupo y conjunto de especies con algún sitio de sus motivos.
+        """
+        return {group: self.species_with_motifs(motif_names, max_pvalue) for group, motif_names in groups.items()}
+
+# Función auxiliar para leer una carpeta en un proceso de trabajo
+def _parse_species(item):
+    species_id, folder = item
+    motifs, hits = parse_mast_folder(folder)
+    return species_id, motifs, hits
+
+# Función para leer en paralelo todos los resultados de MAST de la carpeta base
+def load_mast_results(output_base_folder, workers=None, species_ids=None):
+    """
+    Lee en paralelo las carpetas '<especie>_mast_out' de la carpeta base de MAST.
+
+    Args:
+        output_base_folder (str): Carpeta base con los resultados de MAST creados por C3.
+        workers (int): Número de procesos de lectura (default: número de CPUs).
+        species_ids (iterable): Especies que se leen, p. ej. las terminadas según el registro
+            de C3 (default: todas las carpetas de la carpeta base).
+
+    Returns:
+        MastHitTable: Tabla con los sitios de las especies con resultados.
+
+    Raises:
+        MastParseError: Si el resultado de alguna especie está incompleto; el mensaje indica su carpeta.
+    """
+    if species_ids is None:
+        species_ids = [name[:-len(MAST_FOLDER_SUFFIX)] for name in os.listdir(output_base_folder)
+                       if name.endswith(MAST_FOLDER_SUFFIX)]
+    items = sorted(
+        (species_id, os.path.join(output_base_folder, species_id + MAST_FOLDER_SUFFIX))
+        for species_id in set(species_ids)
+        if os.path.isdir(os.path.join(output_base_folder, species_id + MAST_FOLDER_SUFFIX))
+    )
+    if workers == 1:
+        results = map(_parse_species, items)
+        return MastHitTable.from_results(result for result in results if result[1] is not None)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_parse_species, items, chunksize=16)
+        return MastHitTable.from_results(result for result in results if result[1] is not None)
+
+# Función para guardar una lista de especies en el formato que lee C4
+def write_species_list(species, filename):
+    """
+    Escribe una lista de especies ordenada, una por línea.
+
+    Args:
+        species (iterable): Nombres de especies.
+        filename (str): Ruta del archivo de salida.
+    """
+    with open(filename, 'w') as f:
+        for name in sorted(species):
+            f.write(name + '\n')
+
+def main():
+    # Opciones de línea de comandos
+    parser = argparse.ArgumentParser(
+        description="Lee los resultados de MAST y genera las listas de especies de cada grupo de motivos para C4.")
+    parser.add_argument('mast_folder', help="Carpeta base con los resultados de MAST creados por C3")
+    parser.add_argument('--group', action='append', default=[], metavar='NOMBRE=MOTIVO1,MOTIVO2',
+                        help="Grupo de motivos, p. ej. SigE_motivo=MEME-1 (se puede repetir)")
+    parser.add_argument('--max-pvalue', type=float, default=None, help="P-valor máximo de los sitios")
+    parser.add_argument('--table', help="Archivo .npz con la tabla de sitios; se crea si no existe")
+    parser.add_argument('--out-dir', default='.', help="Carpeta donde se escriben las listas de especies")
+    parser.add_argument('--workers', type=int, default=None, help="Número de procesos de lectura")
+    parser.add_argument('--all-folders', action='store_true',
+                        help="Leer todas las carpetas, no solo las de los trabajos terminados según el registro de C3")
+    args = parser.parse_args()
+
+    # Reutilizar la tabla guardada para no volver a leer todos los archivos de MAST
+    if args.table and os.path.exists(args.table):
+        table = MastHitTable.load(args.table)
+    else:
+        # Con registro de C3, leer solo las especies cuyo trabajo terminó correctamente
+        manifest = load_manifest(args.mast_folder)
+        species_ids = None if args.all_folders or not manifest else finished_species(manifest)
+        table = load_mast_results(args.mast_folder, workers=args.workers, species_ids=species_ids)
+        if args.table:
+            table.save(args.table)
+    print(f"Sitios de MAST leídos: {len(table)} en {len(table.species)} especies.")
+
+    groups = {}
+    for spec in args.group:
+        name, _, motif_names = spec.partition('=')
+        groups[name] = [motif.strip() for motif in motif_names.split(',') if motif.strip()]
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for group, species in table.membership_sets(groups, args.max_pvalue).items():
+        output_file = os.path.join(args.out_dir, f'{group}.txt')
+        write_species_list(species, output_file)
+        print(f"{group}: {len(species)} especies guardadas en '{output_file}'")
+
+if __name__ == '__main__':
+    main()
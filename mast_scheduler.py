@@ -0,0 +1,196 @@
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Nombre del archivo de registro de trabajos dentro de la carpeta base de resultados
+MANIFEST_NAME = 'mast_manifest.json'
+
+# Archivos que MAST escribe al terminar correctamente
+MAST_RESULT_FILES = ('mast.xml', 'mast.txt')
+
+# Función para leer el registro de trabajos de una ejecución anterior
+def load_manifest(output_base_folder):
+    """
+    Lee el registro de trabajos de MAST guardado en la carpeta base de resultados.
+
+    Args:
+        output_base_folder (str): Carpeta base donde se encuentran las subcarpetas de MAST.
+
+    Returns:
+        dict: Diccionario con el ID de cada especie como clave y los datos de su trabajo
+              (estado, código de salida, duración y errores) como valor.
+    """
+    manifest_path = os.path.join(output_base_folder, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+# Función para guardar el registro de trabajos de forma atómica
+def save_manifest(manifest, output_base_folder):
+    """
+    Guarda el registro de trabajos, reemplazando el archivo anterior de forma atómica.
+
+    Args:
+        manifest (dict): Registro de trabajos por especie.
+        output_base_folder (str): Carpeta base donde se guardará el registro.
+    """
+    manifest_path = os.path.join(output_base_folder, MANIFEST_NAME)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+# Función para obtener las especies cuyo trabajo de MAST terminó correctamente
+def finished_species(manifest, species_ids=None):
+    """
+    Devuelve las especies del registro cuyo trabajo de MAST terminó con código de salida 0.
+
+    Args:
+        manifest (dict): Registro de trabajos por especie.
+        species_ids (iterable): Especies a considerar (default: todas las del registro).
+
+    Returns:
+        list: IDs de las especies terminadas, en el orden de 'species_ids' o del registro.
+    """
+    candidates = manifest if species_ids is None else species_ids
+    return [species_id for species_id in candidates if manifest.get(species_id, {}).get('status') == 'ok']
+
+# Función para obtener las especies cuyo último trabajo de MAST falló o se interrumpió
+def failed_species(manifest, species_ids=None):
+    """
+    Devuelve las especies del registro cuyo trabajo de MAST falló o quedó como 'running'.
+    """
+    candidates = manifest if species_ids is None else species_ids
+    return [species_id for species_id in candidates
+            if species_id in manifest and manifest[species_id].get('status') != 'ok']
+
+# Función para comprobar si una especie ya tiene un resultado de MAST terminado
+def is_finished(species_id, output_species_folder, manifest):
+    """
+    Comprueba si la carpeta de salida de una especie contiene un resultado de MAST terminado.
+
+    Si la especie figura en el registro, solo se considera terminada cuando MAST acabó con
+    código de salida 0; un trabajo registrado como 'running' se interrumpió y sus archivos
+    pueden estar incompletos. Las carpetas de ejecuciones anteriores al registro se consideran
+    terminadas si contienen alguno de los archivos de resultado de MAST.
+
+    Args:
+        species_id (str): ID de la especie.
+        output_species_folder (str): Carpeta de salida de MAST para la especie.
+        manifest (dict): Registro de trabajos por especie.
+
+    Returns:
+        bool: True si no es necesario volver a ejecutar MAST para la especie.
+    """
+    has_result = any(os.path.exists(os.path.join(output_species_folder, name)) for name in MAST_RESULT_FILES)
+    entry = manifest.get(species_id)
+    if entry is not None:
+        return has_result and entry.get('returncode') == 0
+    return has_result
+
+# Función para ejecutar MAST para una especie y registrar el resultado
+def run_mast_job(meme_file, species_ur_file, output_species_folder, mast_command='mast'):
+    """
+    Ejecuta MAST para una especie y devuelve los datos del trabajo.
+
+    Args:
+        meme_file (str): Ruta del archivo de motivos en formato MEME.
+        species_ur_file (str): Ruta del archivo .ur de la especie.
+        output_species_folder (str): Carpeta de salida de MAST para la especie.
+        mast_command (str): Ejecutable de MAST (default: 'mast').
+
+    Returns:
+        dict: Estado, código de salida, duración en segundos y salida de errores del trabajo.
+    """
+    # Crear el directorio de salida para la especie si no existe
+    os.makedirs(output_species_folder, exist_ok=True)
+
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [mast_command, meme_file, species_ur_file, '-oc', output_species_folder],
+            stdout=subprocess.PIPE,  # Captura la salida estándar
+            stderr=subprocess.PIPE,  # Captura los errores
+            text=True
+        )
+        returncode, stderr = result.returncode, result.stderr
+    except OSError as error:
+        # El ejecutable no existe o no se puede ejecutar
+        returncode, stderr = None, str(error)
+    runtime = time.perf_counter() - start
+
+    return {
+        'status': 'ok' if returncode == 0 else 'failed',
+        'returncode': returncode,
+        'runtime': round(runtime, 3),
+        'stderr': stderr,
+    }
+
+# Función para ejecutar MAST en paralelo para una lista de especies
+def schedule_mast_jobs(meme_file, species_ids, species_folder, output_base_folder, jobs=1, mast_command='mast',
+                       stage=None):
+    """
+    Ejecuta hasta 'jobs' procesos de MAST a la vez y registra cada trabajo en el registro.
+
+    Las especies con un resultado terminado se omiten, por lo que una ejecución interrumpida
+    puede reanudarse sin repetir trabajo. Antes de lanzar los trabajos se registran como
+    'running' y el registro se vuelve a guardar después de cada trabajo, de modo que los
+    resultados parciales de una ejecución interrumpida no se toman como terminados.
+
+    Args:
+        meme_file (str): Ruta del archivo de motivos en formato MEME.
+        species_ids (list): Lista de IDs de especies.
+        species_folder (str): Carpeta que contiene los archivos .ur de cada especie.
+        output_base_folder (str): Carpeta base donde se crearán subcarpetas con los resultados de MAST.
+        jobs (int): Número máximo de procesos de MAST simultáneos (default: 1).
+        mast_command (str): Ejecutable de MAST (default: 'mast').
+        stage (StageRecord): Mediciones donde se registra cada trabajo ejecutado en esta llamada
+            (subetapa 'mast_job' y tiempo por especie); los trabajos omitidos no se registran.
+
+    Returns:
+        tuple: Registro de trabajos por especie y lista de las especies cuyo trabajo se ejecutó
+               en esta llamada (en el orden de 'species_ids'), sin las omitidas.
+    """
+    os.makedirs(output_base_folder, exist_ok=True)
+    manifest = load_manifest(output_base_folder)
+
+    pending = []
+    for species_id in species_ids:
+        species_ur_file = os.path.join(species_folder, f'{species_id}.ur')
+        output_species_folder = os.path.join(output_base_folder, f'{species_id}_mast_out')
+
+        if not os.path.exists(species_ur_file):
+            print(f"Advertencia: El archivo {species_ur_file} no existe. Saltando...")
+            continue
+        if is_finished(species_id, output_species_folder, manifest):
+            print(f"MAST ya completado para {species_id}. Saltando...")
+            continue
+        pending.append((species_id, species_ur_file, output_species_folder))
+
+    for species_id, _, _ in pending:
+        manifest[species_id] = {'status': 'running', 'returncode': None, 'runtime': None, 'stderr': ''}
+    if pending:
+        save_manifest(manifest, output_base_folder)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {}
+        for species_id, species_ur_file, output_species_folder in pending:
+            print(f"Ejecutando MAST para {species_id}...")
+            future = executor.submit(run_mast_job, meme_file, species_ur_file, output_species_folder, mast_command)
+            futures[future] = species_id
+
+        for future in as_completed(futures):
+            species_id = futures[future]
+            entry = future.result()
+            manifest[species_id] = entry
+            save_manifest(manifest, output_base_folder)
+            if stage is not None:
+                stage.add_step('mast_job', entry['runtime'], records=1)
+                stage.add_item(species_id, entry['runtime'])
+            if entry['status'] != 'ok':
+                print(f"Error: MAST falló para {species_id} (código {entry['returncode']}).")
+
+    return manifest, [species_id for species_id, _, _ in pending]
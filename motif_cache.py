@@ -0,0 +1,193 @@
+import hashlib
+import sqlite3
+import time
+from array import array
+from collections import OrderedDict
+
+from motif_scanner import MotifScanner
+
+# Tamaño máximo por defecto de la caché en disco (bytes)
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Número máximo de autómatas guardados por CachedMotifScanner (uno por conjunto de motivos ausentes)
+MAX_SCANNERS = 32
+
+# Función para calcular el identificador de contenido de una secuencia
+def sequence_hash(sequence):
+    """
+    Calcula el hash del contenido de una secuencia, usado como clave de la caché.
+
+    Args:
+        sequence (str): Secuencia.
+
+    Returns:
+        str: Hash BLAKE2b de 128 bits en hexadecimal.
+    """
+    return hashlib.blake2b(sequence.encode(), digest_size=16).hexdigest()
+
+# Caché persistente de posiciones de motivos
+class MotifCache:
+    """
+    Caché en SQLite de las posiciones de cada motivo en cada secuencia, indexada por
+    (hash de la secuencia, motivo) y con expulsión LRU cuando supera el tamaño máximo.
+
+    También se guardan los resultados vacíos, de modo que un motivo ausente no se vuelve a buscar.
+    El tamaño total se lleva en la tabla 'meta', actualizada por disparadores en cada inserción
+    y borrado, para comprobar el límite tras cada escritura sin recorrer la tabla de posiciones.
+
+    Args:
+        path (str): Ruta del archivo SQLite.
+        max_bytes (int): Tamaño máximo aproximado de las posiciones guardadas (default: 1 GiB).
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(path, timeout=60)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        # Con INSERT OR REPLACE, la fila sustituida solo dispara el borrado con disparadores recursivos
+        self._connection.execute('PRAGMA recursive_triggers=ON')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS positions ('
+            'seq_hash TEXT NOT NULL, motif TEXT NOT NULL, starts BLOB NOT NULL, '
+            'size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (seq_hash, motif))')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS positions_last_used ON positions (last_used)')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        # Las cachés creadas sin la tabla 'meta' se suman una sola vez
+        self._connection.execute(
+            "INSERT OR IGNORE INTO meta (key, value) SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM positions")
+        self._connection.execute(
+            'CREATE TRIGGER IF NOT EXISTS positions_insert AFTER INSERT ON positions BEGIN '
+            "UPDATE meta SET value = value + NEW.size WHERE key = 'total_bytes'; END")
+        self._connection.execute(
+            'CREATE TRIGGER IF NOT EXISTS positions_delete AFTER DELETE ON positions BEGIN '
+            "UPDATE meta SET value = value - OLD.size WHERE key = 'total_bytes'; END")
+        self._connection.commit()
+
+    def total_bytes(self):
+        """
+        Devuelve el tamaño total de las entradas guardadas, según la tabla 'meta'.
+        """
+        return self._connection.execute("SELECT value FROM meta WHERE key = 'total_bytes'").fetchone()[0]
+
+    def lookup(self, seq_hash, motifs):
+        """
+        Busca en la caché las posiciones de varios motivos en una secuencia.
+
+        Args:
+            seq_hash (str): Hash de la secuencia.
+            motifs (list): Motivos a buscar.
+
+        Returns:
+            dict: Motivos encontrados en la caché y sus listas de posiciones (inicio, fin).
+        """
+        wanted = set(motifs)
+        found = {}
+        # Una sola consulta por secuencia; la clave primaria empieza por el hash
+        for motif, starts in self._connection.execute(
+                'SELECT motif, starts FROM positions WHERE seq_hash = ?', (seq_hash,)):
+            if motif in wanted:
+                length = len(motif)
+                found[motif] = [(start, start + length) for start in array('q', starts)]
+        self.hits += len(found)
+        self.misses += len(motifs) - len(found)
+        if found:
+            # Marcar las entradas como usadas recientemente
+            now = time.time()
+            self._connection.executemany(
+                'UPDATE positions SET last_used = ? WHERE seq_hash = ? AND motif = ?',
+                [(now, seq_hash, motif) for motif in found])
+            self._connection.commit()
+        return found
+
+    def store(self, seq_hash, positions):
+        """
+        Guarda las posiciones de varios motivos en una secuencia.
+
+        Args:
+            seq_hash (str): Hash de la secuencia.
+            positions (dict): Motivos y sus listas de posiciones (inicio, fin); pueden estar vacías.
+        """
+        now = time.time()
+        rows = []
+        for motif, hits in positions.items():
+            starts = array('q', (start for start, _ in hits)).tobytes()
+            rows.append((seq_hash, motif, starts, len(starts) + len(motif) + len(seq_hash), now))
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO positions (seq_hash, motif, starts, size, last_used) VALUES (?, ?, ?, ?, ?)', rows)
+        self._connection.commit()
+        if self.total_bytes() > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Elimina las entradas usadas hace más tiempo hasta que la caché no supera el tamaño máximo.
+        """
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for rowid, size in self._connection.execute('SELECT rowid, size FROM positions ORDER BY last_used'):
+            victims.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._connection.executemany('DELETE FROM positions WHERE rowid = ?', victims)
+        self._connection.commit()
+
+    def close(self):
+        """
+        Aplica la expulsión pendiente y cierra la conexión.
+        """
+        self.evict()
+        self._connection.close()
+
+# Buscador de motivos que consulta la caché antes de recorrer la secuencia
+class CachedMotifScanner:
+    """
+    Envoltorio de MotifScanner con la misma interfaz scan() que solo busca en la secuencia
+    los motivos que no están en la caché. Se guardan como máximo MAX_SCANNERS autómatas,
+    descartando el usado hace más tiempo.
+
+    Args:
+        motifs (list): Motivos literales a buscar.
+        cache (MotifCache): Caché de posiciones.
+    """
+
+    def __init__(self, motifs, cache):
+        self.motifs = list(dict.fromkeys(motifs))
+        self.cache = cache
+        self._scanners = OrderedDict()  # Autómatas ya construidos para cada conjunto de motivos ausentes
+
+    def _scanner_for(self, motifs):
+        key = tuple(motifs)
+        scanner = self._scanners.get(key)
+        if scanner is None:
+            scanner = self._scanners[key] = MotifScanner(motifs)
+            if len(self._scanners) > MAX_SCANNERS:
+                self._scanners.popitem(last=False)
+        else:
+            self._scanners.move_to_end(key)
+        return scanner
+
+    def scan(self, sequence):
+        """
+        Encuentra las posiciones de todos los motivos en una secuencia, usando la caché.
+
+        Args:
+            sequence (str): Secuencia en la que buscar los motivos.
+
+        Returns:
+            dict: Igual que MotifScanner.scan.
+        """
+        seq_hash = sequence_hash(sequence)
+        positions = self.cache.lookup(seq_hash, self.motifs)
+        missing = [motif for motif in self.motifs if motif not in positions]
+        if missing:
+            found = self._scanner_for(missing).scan(sequence)
+            new_positions = {motif: found.get(motif, []) for motif in missing}
+            self.cache.store(seq_hash, new_positions)
+            positions.update(new_positions)
+        return {motif: positions[motif] for motif in self.motifs if positions[motif]}
@@ -0,0 +1,330 @@
+import os
+
+import numpy as np
+
+# Orden de las bases en las matrices de los modelos; la columna 4 corresponde a bases ambiguas de la secuencia
+BASES = 'acgt'
+
+# Códigos IUPAC y las bases que representa cada uno
+IUPAC_CODES = {
+    'a': 'a', 'c': 'c', 'g': 'g', 't': 't',
+    'r': 'ag', 'y': 'ct', 's': 'cg', 'w': 'at', 'k': 'gt', 'm': 'ac',
+    'b': 'cgt', 'd': 'agt', 'h': 'act', 'v': 'acg', 'n': 'acgt',
+}
+
+# Umbral de p-valor por defecto para las matrices de peso por posición
+DEFAULT_PVALUE = 1e-4
+
+# Pseudoconteo añadido a las probabilidades de las matrices antes de calcular el log-odds
+PSEUDOCOUNT = 0.01
+
+# Número de intervalos usados para discretizar las puntuaciones al calcular los p-valores
+SCORE_BINS = 10000
+
+# Tabla de traducción de bytes a códigos de base (4 = base ambigua o desconocida)
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate(BASES):
+    _BASE_CODES[ord(_base)] = _code
+    _BASE_CODES[ord(_base.upper())] = _code
+
+# Permutación de columnas que corresponde a la hebra complementaria (a<->t, c<->g)
+_COMPLEMENT = [3, 2, 1, 0, 4]
+
+# Función para convertir una secuencia en códigos de base
+def encode_bases(sequence):
+    """
+    Convierte una secuencia en códigos de base (a=0, c=1, g=2, t=3, otros=4).
+
+    Args:
+        sequence (str): Secuencia de nucleótidos.
+
+    Returns:
+        ndarray: Códigos uint8 de la secuencia.
+    """
+    return _BASE_CODES[np.frombuffer(sequence.encode('latin-1', 'replace'), dtype=np.uint8)]
+
+# Función para decidir si un motivo es degenerado (contiene códigos IUPAC distintos de a, c, g y t)
+def is_degenerate(motif):
+    """
+    Indica si un motivo contiene códigos IUPAC ambiguos y todos sus caracteres son IUPAC válidos.
+
+    Args:
+        motif (str): Motivo en minúsculas.
+
+    Returns:
+        bool: True si el motivo debe buscarse como motivo degenerado.
+    """
+    return bool(motif) and all(char in IUPAC_CODES for char in motif) and any(char not in BASES for char in motif)
+
+# Modelo de motivo puntuado con ventanas deslizantes sobre ambas hebras
+class MotifModel:
+    """
+    Motivo representado como una matriz de puntuaciones (posiciones x 5 columnas: a, c, g, t
+    y bases ambiguas). Una ventana de la secuencia es un sitio si su puntuación total, en la
+    hebra directa o en la complementaria, alcanza el umbral.
+
+    Args:
+        name (str): Nombre del motivo, usado en los archivos de salida.
+        scores (ndarray): Matriz de puntuaciones de forma (ancho, 5).
+        threshold (float): Puntuación mínima de un sitio.
+    """
+
+    def __init__(self, name, scores, threshold):
+        self.name = name
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.threshold = threshold
+        # Matriz de la hebra complementaria: orden inverso de posiciones y bases complementarias
+        self.reverse_scores = self.scores[::-1][:, _COMPLEMENT]
+
+    @property
+    def width(self):
+        return len(self.scores)
+
+    def window_scores(self, codes, scores=None):
+        """
+        Calcula la puntuación de todas las ventanas de la secuencia.
+
+        Equivale al producto de la codificación one-hot de la secuencia por la matriz del modelo,
+        pero se calcula seleccionando directamente la fila de cada base, posición a posición del
+        motivo, sin crear la matriz one-hot.
+
+        Args:
+            codes (ndarray): Códigos de base de la secuencia (ver encode_bases).
+            scores (ndarray): Matriz a usar (default: la de la hebra directa).
+
+        Returns:
+            ndarray: Puntuación de cada ventana, indexada por su posición de inicio.
+        """
+        scores = self.scores if scores is None else scores
+        n_windows = len(codes) - self.width + 1
+        total = np.zeros(max(n_windows, 0), dtype=np.float64)
+        if n_windows <= 0:
+            return total
+        for k in range(self.width):
+            total += scores[k][codes[k:k + n_windows]]
+        return total
+
+    def find(self, codes):
+        """
+        Busca los sitios del motivo en ambas hebras.
+
+        Args:
+            codes (ndarray): Códigos de base de la secuencia (ver encode_bases).
+
+        Returns:
+            list: Lista de tuplas (inicio, fin) en coordenadas de la hebra directa; un sitio
+                  encontrado en ambas hebras en la misma ventana aparece una sola vez.
+        """
+        if not self.width or len(codes) < self.width:
+            return []
+        forward = self.window_scores(codes) >= self.threshold
+        reverse = self.window_scores(codes, self.reverse_scores) >= self.threshold
+        return [(start, start + self.width) for start in np.flatnonzero(forward | reverse).tolist()]
+
+# Función para construir el modelo de un motivo de consenso IUPAC
+def iupac_model(motif):
+    """
+    Construye el modelo de un motivo de consenso IUPAC: cada posición puntúa 0 si la base
+    está permitida y -inf si no, de modo que solo coinciden las ventanas compatibles con el
+    consenso. Una base ambigua de la secuencia solo coincide con una posición 'n' del motivo.
+
+    Args:
+        motif (str): Motivo IUPAC en minúsculas.
+
+    Returns:
+        MotifModel: Modelo con umbral 0.
+    """
+    scores = np.full((len(motif), 5), -np.inf)
+    for k, char in enumerate(motif):
+        for base in IUPAC_CODES[char]:
+            scores[k, BASES.index(base)] = 0.0
+        if char == 'n':
+            scores[k, 4] = 0.0
+    return MotifModel(motif, scores, 0.0)
+
+# Función para calcular el umbral de puntuación correspondiente a un p-valor
+def score_threshold(log_odds, background, pvalue):
+    """
+    Calcula la puntuación mínima cuyo p-valor, bajo el modelo de fondo, no supera 'pvalue'.
+
+    La distribución de puntuaciones se obtiene de forma exacta sobre puntuaciones
+    discretizadas, sumando posición a posición las distribuciones de cada columna.
+
+    Args:
+        log_odds (ndarray): Matriz log-odds de forma (ancho, 4).
+        background (ndarray): Frecuencias de fondo de a, c, g y t.
+        pvalue (float): P-valor máximo de un sitio.
+
+    Returns:
+        float: Umbral de puntuación.
+    """
+    minimums = log_odds.min(axis=1)
+    score_range = float((log_odds.max(axis=1) - minimums).sum())
+    if score_range == 0:
+        return float(minimums.sum())
+    scale = SCORE_BINS / score_range
+    discrete = np.round((log_odds - minimums[:, None]) * scale).astype(np.int64)
+
+    # Distribución de probabilidad de la puntuación discretizada
+    distribution = np.ones(1)
+    for row in discrete:
+        new = np.zeros(len(distribution) + int(row.max()))
+        for base in range(4):
+            new[row[base]:row[base] + len(distribution)] += distribution * background[base]
+        distribution = new
+
+    # Probabilidad de alcanzar cada puntuación y menor puntuación con p-valor suficiente
+    tail = np.cumsum(distribution[::-1])[::-1]
+    passing = np.flatnonzero(tail <= pvalue)
+    cutoff = int(passing[0]) if passing.size else len(distribution)
+    # Margen de media unidad para compensar el redondeo de la discretización
+    return (cutoff - 0.5) / scale + float(minimums.sum())
+
+# Función para construir el modelo de una matriz de probabilidades por posición
+def pwm_model(name, probabilities, background, pvalue=DEFAULT_PVALUE, pseudocount=PSEUDOCOUNT):
+    """
+    Construye el modelo log-odds de una matriz de probabilidades por posición.
+
+    Args:
+        name (str): Nombre del motivo.
+        probabilities (ndarray): Probabilidades de a, c, g y t en cada posición, forma (ancho, 4).
+        background (ndarray): Frecuencias de fondo de a, c, g y t.
+        pvalue (float): P-valor máximo de un sitio (default: 1e-4).
+        pseudocount (float): Pseudoconteo añadido a las probabilidades (default: 0.01).
+
+    Returns:
+        MotifModel: Modelo con el umbral correspondiente al p-valor; las ventanas con bases
+                    ambiguas no se consideran sitios.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    background = np.asarray(background, dtype=np.float64)
+    probabilities = (probabilities + pseudocount * background) / (1 + pseudocount)
+    log_odds = np.log2(probabilities / background)
+    scores = np.column_stack([log_odds, np.full(len(log_odds), -np.inf)])
+    return MotifModel(name, scores, score_threshold(log_odds, background, pvalue))
+
+# Función para leer las matrices de un archivo en formato MEME
+def read_meme_file(filename):
+    """
+    Lee las matrices de probabilidades ('letter-probability matrix') de un archivo en formato
+    MEME, ya sea el formato mínimo o el archivo meme.txt completo que se pasa a MAST.
+
+    Args:
+        filename (str): Archivo en formato MEME.
+
+    Returns:
+        tuple: Frecuencias de fondo (ndarray de a, c, g y t) y lista de tuplas
+               (ID del motivo, ID alternativo, matriz de probabilidades).
+    """
+    with open(filename, 'r') as f:
+        lines = f.read().splitlines()
+
+    background = np.full(4, 0.25)
+    motifs = []
+    motif_id, motif_alt = None, ''
+    index = 0
+    while index < len(lines):
+        line = lines[index].strip()
+        if line.startswith('Background letter frequencies'):
+            # Las frecuencias están en la línea siguiente: "A 0.25 C 0.25 G 0.25 T 0.25"
+            fields = lines[index + 1].split() if index + 1 < len(lines) else []
+            frequencies = dict(zip(fields[::2], fields[1::2]))
+            if all(base.upper() in frequencies for base in BASES):
+                background = np.array([float(frequencies[base.upper()]) for base in BASES])
+        elif line.startswith('MOTIF'):
+            parts = line.split()
+            motif_id = parts[1] if len(parts) > 1 else str(len(motifs) + 1)
+            motif_alt = parts[2] if len(parts) > 2 and parts[2] != 'width' else ''
+        elif line.startswith('letter-probability matrix') and motif_id is not None:
+            fields = line.split('w=')[1].split() if 'w=' in line else []
+            width = int(fields[0]) if fields else None
+            rows = []
+            index += 1
+            while index < len(lines) and (width is None or len(rows) < width):
+                values = lines[index].split()
+                if not values:
+                    if rows:
+                        break
+                    index += 1
+                    continue
+                try:
+                    rows.append([float(value) for value in values[:4]])
+                except ValueError:
+                    break
+                index += 1
+            motifs.append((motif_id, motif_alt, np.array(rows)))
+            motif_id = None
+            continue
+        index += 1
+    return background / background.sum(), motifs
+
+# Función para cargar motivos desde un archivo de texto o en formato MEME
+def load_motif_models(filename, pvalue=DEFAULT_PVALUE, namespace=None):
+    """
+    Carga un conjunto de motivos. Un archivo que empieza por 'MEME version' se lee como
+    matrices de peso por posición; en otro caso cada línea es un motivo, literal si solo
+    contiene a, c, g y t, o degenerado si contiene otros códigos IUPAC.
+
+    Los IDs de las matrices no son únicos entre archivos (los archivos MEME mínimos suelen
+    numerarlas 'MOTIF 1', 'MOTIF 2', ...), por lo que su nombre lleva delante el espacio de
+    nombres del archivo: 'archivo.meme:1'. Así las matrices de dos conjuntos no comparten
+    nombre entre sí ni con un motivo literal.
+
+    Args:
+        filename (str): Archivo de motivos (una línea por motivo) o archivo en formato MEME.
+        pvalue (float): P-valor máximo de un sitio para las matrices (default: 1e-4).
+        namespace (str): Prefijo de los nombres de las matrices (default: nombre del archivo).
+
+    Returns:
+        tuple: Lista de nombres de los motivos (en minúsculas para los motivos de texto) y
+               lista de modelos (MotifModel) de los motivos que no son literales.
+    """
+    with open(filename, 'r') as f:
+        is_meme = f.readline().startswith('MEME version')
+    if is_meme:
+        if namespace is None:
+            namespace = os.path.basename(filename)
+        background, matrices = read_meme_file(filename)
+        models = [pwm_model(f'{namespace}:{motif_id}', probabilities, background, pvalue)
+                  for motif_id, _, probabilities in matrices]
+        return [model.name for model in models], models
+
+    with open(filename, 'r') as f:
+        motifs = [line.strip().lower() for line in f.readlines()]
+    models = [iupac_model(motif) for motif in dict.fromkeys(motifs) if is_degenerate(motif)]
+    return motifs, models
+
+# Buscador que combina motivos literales y modelos
+class ModelMotifScanner:
+    """
+    Buscador con la misma interfaz scan() que MotifScanner: los motivos literales se buscan
+    con el buscador indicado (Aho-Corasick, con o sin caché) y los modelos degenerados o
+    de matrices de peso, con ventanas deslizantes sobre ambas hebras.
+
+    Args:
+        literal_scanner: Buscador de los motivos literales (MotifScanner o CachedMotifScanner).
+        models (list): Modelos (MotifModel) a buscar además de los motivos literales.
+    """
+
+    def __init__(self, literal_scanner, models):
+        self.literal_scanner = literal_scanner
+        # Un mismo modelo puede estar en ambos conjuntos (el mismo archivo o el mismo consenso)
+        self.models = list({model.name: model for model in models}.values())
+
+    def scan(self, sequence):
+        """
+        Encuentra las posiciones de todos los motivos literales y modelos en una secuencia.
+
+        Args:
+            sequence (str): Secuencia en la que buscar los motivos.
+
+        Returns:
+            dict: Nombres de los motivos encontrados y sus listas de posiciones (inicio, fin).
+        """
+        hits = self.literal_scanner.scan(sequence)
+        codes = encode_bases(sequence)
+        for model in self.models:
+            positions = model.find(codes)
+            if positions:
+                hits[model.name] = positions
+        return hits
@@ -0,0 +1,100 @@
+from collections import deque
+
+# Motor de búsqueda de múltiples motivos (autómata de Aho-Corasick)
+class MotifScanner:
+    """
+    Autómata de Aho-Corasick construido a partir de un conjunto de motivos literales.
+
+    Permite encontrar todas las apariciones (incluidas las solapadas) de todos los motivos
+    en una sola pasada por la secuencia, en lugar de una búsqueda con expresión regular
+    por cada motivo.
+
+    Args:
+        motifs (iterable): Motivos literales a buscar. Los duplicados se ignoran.
+    """
+
+    def __init__(self, motifs):
+        # Conservar el orden de aparición y eliminar duplicados
+        self.motifs = list(dict.fromkeys(motifs))
+        self._has_empty = '' in self.motifs
+        self._lengths = [len(motif) for motif in self.motifs]
+        self._build()
+
+    def _build(self):
+        """
+        Construye el trie de motivos, los enlaces de fallo y la tabla de transiciones completa.
+        """
+        transitions = [{}]  # Transiciones de cada estado del trie
+        outputs = [[]]  # Índices de los motivos que terminan en cada estado
+
+        # Insertar cada motivo en el trie
+        for index, motif in enumerate(self.motifs):
+            if not motif:
+                continue
+            state = 0
+            for char in motif:
+                next_state = transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(transitions)
+                    transitions[state][char] = next_state
+                    transitions.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(index)
+
+        alphabet = set()
+        for motif in self.motifs:
+            alphabet.update(motif)
+
+        # Recorrido en anchura para calcular los enlaces de fallo y completar las transiciones
+        fail = [0] * len(transitions)
+        queue = deque()
+        for char in alphabet:
+            next_state = transitions[0].get(char)
+            if next_state is None:
+                transitions[0][char] = 0
+            else:
+                queue.append(next_state)
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            for char in alphabet:
+                next_state = transitions[state].get(char)
+                if next_state is None:
+                    transitions[state][char] = transitions[fail[state]][char]
+                else:
+                    fail[next_state] = transitions[fail[state]][char]
+                    queue.append(next_state)
+
+        self._transitions = transitions
+        # Guardar solo los estados con salida para acelerar la búsqueda
+        self._outputs = [tuple(output) if output else None for output in outputs]
+
+    def scan(self, sequence):
+        """
+        Encuentra las posiciones de todos los motivos en una secuencia.
+
+        Args:
+            sequence (str): Secuencia en la que buscar los motivos.
+
+        Returns:
+            dict: Diccionario con cada motivo encontrado como clave y una lista de tuplas
+                  (inicio, fin) ordenadas por posición de inicio como valor.
+        """
+        positions = [[] for _ in self.motifs]
+        transitions = self._transitions
+        outputs = self._outputs
+        lengths = self._lengths
+        state = 0
+        for end, char in enumerate(sequence, 1):
+            state = transitions[state].get(char, 0)
+            output = outputs[state]
+            if output:
+                for index in output:
+                    positions[index].append((end - lengths[index], end))
+
+        # Un motivo vacío coincide en todas las posiciones, igual que con la expresión regular
+        if self._has_empty:
+            positions[self.motifs.index('')] = [(i, i) for i in range(len(sequence) + 1)]
+
+        return {motif: hits for motif, hits in zip(self.motifs, positions) if hits}
@@ -0,0 +1,223 @@
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import StageRecord
+from motif_cache import DEFAULT_MAX_BYTES, CachedMotifScanner, MotifCache
+from motif_models import ModelMotifScanner
+from motif_scanner import MotifScanner
+from overlap_engine import find_overlaps
+from sequence_store import SequenceStore
+
+# Número aproximado de bases que se envían juntas a cada proceso de trabajo
+BATCH_BASES = 1_000_000
+
+# Estado de cada proceso de trabajo, inicializado una sola vez por proceso
+_worker_state = {}
+
+# Función para analizar las superposiciones de motivos en una secuencia
+def analyze_sequence(seq_id, seq, scanner, motifs1, motifs2, stage=None):
+    """
+    Busca los motivos de ambos conjuntos en una secuencia y genera el texto de salida.
+
+    Args:
+        seq_id (str): Identificador de la secuencia.
+        seq (str): Secuencia en minúsculas.
+        scanner (MotifScanner): Buscador construido con los motivos de ambos conjuntos (o CachedMotifScanner).
+        motifs1 (list): Motivos del primer conjunto.
+        motifs2 (list): Motivos del segundo conjunto.
+        stage (StageRecord): Mediciones donde acumular los tiempos de búsqueda y de
+            comprobación de superposiciones (opcional).
+
+    Returns:
+        tuple: Texto para el archivo de secuencias con superposiciones y texto para el
+               archivo de secuencias sin superposiciones.
+    """
+    found_overlap = False  # Bandera para verificar si se encontró alguna superposición
+    output_with = [f"Secuencia '{seq_id}':\n"]
+    output_without = [f"Secuencia '{seq_id}':\n"]
+
+    # Buscar las posiciones de todos los motivos en una sola pasada por la secuencia
+    scan_start = time.perf_counter()
+    motif_hits = scanner.scan(seq)
+    scan_end = time.perf_counter()
+
+    # Separar las posiciones de los motivos del primer y del segundo archivo
+    motif_positions1 = {motif1: motif_hits[motif1] for motif1 in motifs1 if motif1 in motif_hits}
+    motif_positions2 = {motif2: motif_hits[motif2] for motif2 in motifs2 if motif2 in motif_hits}
+
+    # Verificar superposiciones entre todos los motivos de ambos archivos encontrados
+    for motif1, pos1, motif2, pos2 in find_overlaps(motif_positions1, motif_positions2):
+        output_with.append(f"  Superposición encontrada:\n"
+                           f"  Motivo 1 '{motif1}' en {pos1} y Motivo 2 '{motif2}' en {pos2}\n"
+                           f"  Secuencia solapada: {seq[min(pos1[0], pos2[0]):max(pos1[1], pos2[1])]}\n")
+        found_overlap = True
+
+    # Escribir en el texto correspondiente según si hay superposición o no
+    if not found_overlap:
+        output_without.append(f"  No se encontraron superposiciones en la secuencia '{seq_id}'.\n")
+    else:
+        # Si se encontró alguna superposición, incluir también la secuencia completa
+        output_with.append(f"Secuencia completa: {seq}\n\n")
+
+    if stage is not None:
+        end = time.perf_counter()
+        stage.add_step('motif_scan', scan_end - scan_start, records=1, nbytes=len(seq))
+        stage.add_step('overlap_check', end - scan_end, records=1)
+        stage.add_item(seq_id, end - scan_start)
+
+    return ''.join(output_with), ''.join(output_without)
+
+# Función para crear el buscador de motivos, con caché en disco opcional para los motivos literales
+def _make_scanner(motifs, cache_path, cache_max_bytes, models=()):
+    model_names = {model.name for model in models}
+    literals = [motif for motif in motifs if motif not in model_names]
+    if cache_path is None:
+        scanner, cache = MotifScanner(literals), None
+    else:
+        cache = MotifCache(cache_path, cache_max_bytes)
+        scanner = CachedMotifScanner(literals, cache)
+    if models:
+        scanner = ModelMotifScanner(scanner, models)
+    return scanner, cache
+
+# Funciones ejecutadas en los procesos de trabajo
+def _init_worker(motifs1, motifs2, cache_path, cache_max_bytes, store_path, models, detailed):
+    scanner, cache = _make_scanner(motifs1 + motifs2, cache_path, cache_max_bytes, models)
+    _worker_state['args'] = (scanner, motifs1, motifs2)
+    _worker_state['cache'] = cache
+    _worker_state['detailed'] = detailed
+    # Cada proceso abre el almacén mapeado en memoria; las páginas se comparten sin copias
+    _worker_state['store'] = SequenceStore(store_path) if store_path else None
+
+def _analyze_batch(batch):
+    cache = _worker_state['cache']
+    store = _worker_state['store']
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+    # Mediciones del lote, que se suman a las de la etapa en el proceso principal
+    record = StageRecord('batch', _worker_state['detailed'])
+    outputs = []
+    for seq_id, seq in batch:
+        if seq is None:
+            # Lote del almacén: 'seq_id' es el número de registro
+            with record.step('store_read', records=1):
+                seq_id, seq = store.seq_id(seq_id), store.get(seq_id)
+        record.add_records(1, len(seq))
+        outputs.append(analyze_sequence(seq_id, seq, *_worker_state['args'], stage=record))
+    if cache:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    return outputs, hits, misses, record
+
+# Función para agrupar las secuencias en lotes de tamaño acotado
+def _iter_batches(sequences, batch_bases, length=len):
+    batch = []
+    bases = 0
+    for seq_id, seq in sequences:
+        batch.append((seq_id, seq))
+        bases += length(seq_id) if seq is None else length(seq)
+        if bases >= batch_bases:
+            yield batch
+            batch = []
+            bases = 0
+    if batch:
+        yield batch
+
+# Función para ejecutar el análisis de superposiciones sobre todas las secuencias
+def run_overlap_analysis(sequences, motifs1, motifs2, output_file_with, output_file_without,
+                         workers=1, batch_bases=BATCH_BASES, cache_path=None, cache_max_bytes=DEFAULT_MAX_BYTES,
+                         store_path=None, models=(), stage=None):
+    """
+    Analiza las superposiciones de motivos en todas las secuencias y escribe los resultados.
+
+    Con más de un proceso de trabajo, las secuencias se reparten en lotes entre los procesos
+    y los resultados se escriben en el orden de entrada, por lo que los archivos de salida
+    son idénticos a los de la ejecución en serie. El número de lotes pendientes está acotado,
+    de modo que las secuencias se siguen leyendo como flujo.
+
+    Con 'cache_path', las posiciones de cada (secuencia, motivo) se leen de una caché SQLite
+    y solo se buscan en la secuencia los pares que no están guardados.
+
+    Con 'store_path', las secuencias se leen de un almacén empaquetado (ver sequence_store) y a
+    los procesos de trabajo solo se envían los números de registro; cada proceso lee las secuencias
+    del mismo archivo mapeado en memoria.
+
+    Los motivos con un modelo en 'models' (consensos IUPAC o matrices de peso, ver motif_models)
+    se buscan en ambas hebras con ventanas deslizantes; sus sitios se comparan igual que las
+    posiciones de los motivos literales. La caché solo guarda las posiciones de los literales.
+
+    Args:
+        sequences (iterable): Pares (identificador, secuencia) con las secuencias en minúsculas;
+            se ignora si se indica 'store_path'.
+        motifs1 (list): Motivos del primer conjunto.
+        motifs2 (list): Motivos del segundo conjunto.
+        output_file_with (file): Archivo abierto para las secuencias con superposiciones.
+        output_file_without (file): Archivo abierto para las secuencias sin superposiciones.
+        workers (int): Número de procesos de trabajo (default: 1, ejecución en serie).
+        batch_bases (int): Número aproximado de bases por lote enviado a cada proceso.
+        cache_path (str): Archivo SQLite de la caché de posiciones (default: sin caché).
+        cache_max_bytes (int): Tamaño máximo de la caché antes de expulsar las entradas más antiguas.
+        store_path (str): Archivo de datos de un almacén de secuencias empaquetado (default: no se usa).
+        models (list): Modelos (MotifModel) de los motivos de ambos conjuntos que no son literales.
+        stage (StageRecord): Mediciones de la etapa (lectura, búsqueda, superposiciones y
+            tiempo por secuencia), opcional.
+
+    Returns:
+        dict: Aciertos ('hits') y fallos ('misses') de la caché, o None si no se usa caché.
+    """
+    stats = {'hits': 0, 'misses': 0}
+    store = SequenceStore(store_path) if store_path else None
+
+    if workers <= 1:
+        if store is not None:
+            sequences = iter(store)
+        if stage is not None:
+            sequences = stage.timed_iter(sequences, 'store_read' if store is not None else 'fasta_load')
+        # Construir un único buscador con los motivos de ambos archivos
+        scanner, cache = _make_scanner(motifs1 + motifs2, cache_path, cache_max_bytes, models)
+        for seq_id, seq in sequences:
+            if stage is not None:
+                stage.add_records(1, len(seq))
+            text_with, text_without = analyze_sequence(seq_id, seq, scanner, motifs1, motifs2, stage)
+            output_file_with.write(text_with)
+            output_file_without.write(text_without)
+        if cache is None:
+            return None
+        stats['hits'], stats['misses'] = cache.hits, cache.misses
+        cache.close()
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(motifs1, motifs2, cache_path, cache_max_bytes, store_path, list(models),
+                                       stage is None or stage.detailed)) as executor:
+        pending = deque()
+
+        def write_next():
+            outputs, hits, misses, record = pending.popleft().result()
+            if stage is not None:
+                stage.merge(record)
+            for text_with, text_without in outputs:
+                output_file_with.write(text_with)
+                output_file_without.write(text_without)
+            stats['hits'] += hits
+            stats['misses'] += misses
+
+        if store is not None:
+            # Enviar solo los números de registro; cada proceso lee sus secuencias del almacén
+            batches = _iter_batches(((record, None) for record in range(len(store))), batch_bases, store.length)
+        else:
+            if stage is not None:
+                sequences = stage.timed_iter(sequences, 'fasta_load')
+            batches = _iter_batches(sequences, batch_bases)
+        for batch in batches:
+            pending.append(executor.submit(_analyze_batch, batch))
+            # Limitar los lotes en curso para no cargar todo el archivo en memoria
+            if len(pending) >= 2 * workers:
+                write_next()
+        while pending:
+            write_next()
+
+    if cache_path is None:
+        return None
+    # Aplicar la expulsión pendiente una vez terminados todos los procesos
+    MotifCache(cache_path, cache_max_bytes).close()
+    return stats
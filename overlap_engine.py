@@ -0,0 +1,49 @@
+import heapq
+
+# Función para encontrar superposiciones entre dos conjuntos de motivos con un barrido de intervalos
+def find_overlaps(motif_positions1, motif_positions2):
+    """
+    Encuentra todos los pares de posiciones solapadas entre dos conjuntos de motivos.
+
+    Ordena las posiciones de ambos conjuntos por inicio y las recorre con una línea de barrido,
+    manteniendo para cada conjunto los intervalos todavía abiertos. Solo se comparan los pares
+    que realmente se solapan, por lo que el coste es O((n+m) log(n+m) + k) en lugar de O(n*m).
+
+    Args:
+        motif_positions1 (dict): Motivos del primer conjunto y sus listas de posiciones (inicio, fin).
+        motif_positions2 (dict): Motivos del segundo conjunto y sus listas de posiciones (inicio, fin).
+
+    Returns:
+        list: Tuplas (motivo1, pos1, motivo2, pos2) en el mismo orden que el recorrido anidado
+              motivo1 -> motivo2 -> pos1 -> pos2.
+    """
+    # Eventos (inicio, fin, conjunto, índice del motivo); ordenados por inicio
+    events = []
+    motifs1 = list(motif_positions1)
+    motifs2 = list(motif_positions2)
+    for index, motif in enumerate(motifs1):
+        events.extend((start, end, 0, index) for start, end in motif_positions1[motif])
+    for index, motif in enumerate(motifs2):
+        events.extend((start, end, 1, index) for start, end in motif_positions2[motif])
+    events.sort()
+
+    # Intervalos abiertos de cada conjunto, en un montículo ordenado por fin
+    active = ([], [])
+    overlaps = []
+    for start, end, group, index in events:
+        other = active[1 - group]
+        # Descartar los intervalos del otro conjunto que terminan antes del inicio actual
+        while other and other[0][0] <= start:
+            heapq.heappop(other)
+        for other_end, other_start, other_index in other:
+            # Comprobación explícita para los intervalos de longitud cero
+            if start < other_end and end > other_start:
+                if group == 0:
+                    overlaps.append((index, other_index, (start, end), (other_start, other_end)))
+                else:
+                    overlaps.append((other_index, index, (other_start, other_end), (start, end)))
+        heapq.heappush(active[group], (end, start, index))
+
+    # Restaurar el orden del recorrido anidado original
+    overlaps.sort()
+    return [(motifs1[index1], pos1, motifs2[index2], pos2) for index1, index2, pos1, pos2 in overlaps]
@@ -0,0 +1,368 @@
+"""
+Ejecución no interactiva del análisis completo: C1 -> C3 -> C4 -> C5.
+
+Las etapas se configuran con un archivo JSON y se comunican con estructuras en memoria.
+El resultado de cada etapa se guarda en la carpeta de caché con una clave calculada a
+partir de sus parámetros, de la firma de sus archivos de entrada y de las claves de las
+etapas de las que depende; al cambiar un parámetro solo se repiten las etapas afectadas.
+MAST se separa en dos etapas: 'mast' ejecuta MAST y guarda la tabla de sitios (.npz), y
+'motif_groups' aplica el umbral de p-valor y los grupos de motivos, de modo que cambiar
+'max_pvalue', 'motif_groups' o 'jobs' no vuelve a leer las carpetas de resultados.
+
+Ejemplo de configuración:
+
+    {
+        "cache_dir": "pipeline_cache",
+        "species_ko_file": "especies_kos.txt",
+        "main_species_file": "especies.txt",
+        "ko_groups": {
+            "SigE_KO": {"kos_file": "sigE_kos.txt", "min_kos": 1, "fixed_ko": null},
+            "SpoIIIAA_KO": {"kos_file": "spoIIIA_kos.txt", "min_kos": 3, "fixed_ko": "K06390"}
+        },
+        "mast": {
+            "meme_file": "meme.txt",
+            "species_folder": "ur",
+            "output_folder": "mast_out",
+            "jobs": 8,
+            "max_pvalue": 0.0001,
+            "motif_groups": {"SigE_motivo": ["MEME-1"], "SpoIIID_motivo": ["MEME-2"]}
+        },
+        "taxonomy_file": "taxonomia.tsv",
+        "group_by": ["KEGG Class"],
+        "matrix_output": "conservacion.tsv",
+        "class_output": "conservacion_por_clase.txt",
+        "heatmap_output": "Conservacion.png"
+    }
+
+Uso:
+    python pipeline.py config.json [--force ETAPA] [--report informe.json] [--profile cprofile]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+from C1_KO_Filter import find_species_for_queries, load_kos_from_file
+from C3_Concatenated_MAST import read_species_ids, run_mast_for_species
+from C4_Conservation_analysis import read_species
+from class_aggregation import DEFAULT_GROUP_BY, aggregate_by_group, column_label, write_aggregation
+from instrumentation import RunReport, add_report_arguments, finish_report, report_from_args
+from conservation_matrix import WRITERS, build_presence_matrix, conservation_counts
+from mast_parser import MastHitTable, load_mast_results
+from mast_scheduler import failed_species, finished_species
+
+# Etapas en orden de ejecución
+STAGES = ('ko_filter', 'mast', 'motif_groups', 'matrix', 'classes')
+
+# Parámetros de la sección 'mast' que cambian los resultados de MAST (no 'jobs' ni los de los grupos)
+MAST_RUN_PARAMS = ('meme_file', 'species_file', 'species_folder', 'output_folder')
+
+# Función para guardar un resultado con pickle
+def _save_pickle(result, path):
+    with open(path, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+# Función para cargar un resultado guardado con pickle
+def _load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+# Función para obtener la firma de un archivo o carpeta de entrada
+def file_signature(path):
+    """
+    Devuelve la firma de un archivo (ruta, tamaño y fecha de modificación) o, para una
+    carpeta, la firma de todos sus archivos.
+
+    Args:
+        path (str): Ruta del archivo o carpeta.
+
+    Returns:
+        list: Firma que cambia cuando cambia el contenido.
+    """
+    if path is None:
+        return None
+    if os.path.isdir(path):
+        return [file_signature(os.path.join(path, name)) for name in sorted(os.listdir(path))]
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+# Función para calcular la clave de caché de una etapa
+def stage_key(stage, params, inputs, upstream=()):
+    """
+    Calcula la clave de caché de una etapa.
+
+    Args:
+        stage (str): Nombre de la etapa.
+        params (dict): Parámetros de la etapa.
+        inputs (list): Rutas de los archivos o carpetas de entrada.
+        upstream (tuple): Claves de las etapas de las que depende.
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    description = {
+        'stage': stage,
+        'params': params,
+        'inputs': [file_signature(path) for path in inputs],
+        'upstream': list(upstream),
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+# Caché en disco de los resultados de cada etapa
+class StageCache:
+    """
+    Guarda el resultado de cada etapa en un archivo con su clave en el nombre (pickle por
+    defecto, u otro formato con las funciones 'save' y 'load' de run()).
+
+    Args:
+        cache_dir (str): Carpeta de la caché.
+        force (set): Etapas que se vuelven a ejecutar aunque estén en la caché.
+    """
+
+    def __init__(self, cache_dir, force=()):
+        self.cache_dir = cache_dir
+        self.force = set(force)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def run(self, stage, key, function, record=None, suffix='.pkl', save=_save_pickle, load=_load_pickle, keep=None):
+        """
+        Devuelve el resultado guardado de la etapa o la ejecuta y guarda su resultado.
+
+        Args:
+            stage (str): Nombre de la etapa.
+            key (str): Clave de caché de la etapa.
+            function (callable): Función sin argumentos que ejecuta la etapa.
+            record (StageRecord): Mediciones de la etapa, donde se anota si el resultado venía de la caché.
+            suffix (str): Extensión del archivo de la caché (default: '.pkl').
+            save (callable): Función (resultado, ruta) que guarda el resultado (default: pickle).
+            load (callable): Función (ruta) que carga el resultado guardado (default: pickle).
+            keep (callable): Función (resultado) que indica si el resultado se guarda (default: siempre).
+
+        Returns:
+            object: Resultado de la etapa.
+        """
+        path = os.path.join(self.cache_dir, f'{stage}-{key[:16]}{suffix}')
+        cached = stage not in self.force and os.path.exists(path)
+        if record is not None:
+            record.details['cached'] = cached
+        if cached:
+            print(f"[{stage}] Resultado en caché, se omite la ejecución.")
+            return load(path)
+        print(f"[{stage}] Ejecutando...")
+        result = function()
+        if keep is not None and not keep(result):
+            print(f"[{stage}] El resultado está incompleto y no se guarda en la caché.")
+            return result
+        # El archivo temporal conserva la extensión (np.savez la añade si falta)
+        temp_path = path[:-len(suffix)] + '.tmp' + suffix
+        save(result, temp_path)
+        os.replace(temp_path, path)
+        return result
+
+# Etapa C1: especies de cada grupo de KOs
+def run_ko_filter(species_ko_file, ko_groups, record=None):
+    """
+    Resuelve todos los grupos de KOs con una sola lectura del archivo de especies y KOs.
+
+    Args:
+        species_ko_file (str): Archivo de especies y KOs en el formato de C1.
+        ko_groups (dict): Nombre de cada grupo y sus parámetros ('kos_file', 'min_kos', 'fixed_ko').
+        record (StageRecord): Mediciones de la etapa, donde se suman las líneas leídas (opcional).
+
+    Returns:
+        dict: Nombre de cada grupo y conjunto de especies que cumplen sus criterios.
+    """
+    queries = [{
+        'kos_list': load_kos_from_file(spec['kos_file']),
+        'min_kos': int(spec.get('min_kos', 3)),
+        'fixed_ko': spec.get('fixed_ko') or None,
+    } for spec in ko_groups.values()]
+    results = find_species_for_queries(species_ko_file, queries, record)
+    # El nombre de la especie es el último elemento de cada línea
+    return {group: {line.split()[-1] for line in lines} for group, lines in zip(ko_groups, results)}
+
+# Etapa C3: ejecución de MAST y lectura de todos sus sitios
+def run_mast_stage(mast_config, species_ids, record=None):
+    """
+    Ejecuta MAST para las especies (reanudando trabajos ya terminados) y lee sus resultados.
+
+    Solo se leen las especies de 'species_ids' cuyo trabajo terminó correctamente según el
+    registro de C3; las carpetas de trabajos fallidos (con resultados parciales) y las de
+    especies que no están en la lista no se leen. Los trabajos fallidos se informan y se
+    anotan en record.details['failed'].
+
+    Args:
+        mast_config (dict): Sección 'mast' de la configuración.
+        species_ids (list): IDs de las especies.
+        record (StageRecord): Mediciones de la etapa, donde se anota el tiempo de MAST por especie (opcional).
+
+    Returns:
+        MastHitTable: Tabla con los sitios de las especies terminadas, sin umbral de p-valor.
+    """
+    manifest, _ = run_mast_for_species(mast_config['meme_file'], species_ids, mast_config['species_folder'],
+                                       mast_config['output_folder'], jobs=int(mast_config.get('jobs', 1)), stage=record)
+    failed = failed_species(manifest, species_ids)
+    if failed:
+        print(f"Advertencia: MAST falló para {len(failed)} especies, que no se incluyen en los resultados "
+              f"({', '.join(failed[:5])}{', ...' if len(failed) > 5 else ''}).")
+    if record is not None:
+        record.details['failed'] = failed
+    return load_mast_results(mast_config['output_folder'], workers=mast_config.get('jobs'),
+                             species_ids=finished_species(manifest, species_ids))
+
+# Función para leer la clasificación taxonómica de cada especie
+def read_taxonomy(filename, group_by):
+    """
+    Lee un archivo tabulado con la columna 'ID' y las columnas taxonómicas indicadas.
+
+    Args:
+        filename (str): Archivo de taxonomía.
+        group_by (tuple): Columnas taxonómicas que se conservan.
+
+    Returns:
+        dict: ID de cada especie y tupla con sus rangos taxonómicos.
+    """
+    with open(filename, 'r', newline='') as f:
+        return {row['ID']: tuple(row[rank] for rank in group_by) for row in csv.DictReader(f, delimiter='\t')}
+
+# Etapa C5: conservación por grupo taxonómico a partir de la matriz en memoria
+def run_class_stage(matrix_result, taxonomy, group_by):
+    """
+    Agrega la matriz de conservación por grupo taxonómico.
+
+    Args:
+        matrix_result (tuple): Especies, grupos y matriz devueltos por build_presence_matrix.
+        taxonomy (dict): Rangos taxonómicos de cada especie.
+        group_by (tuple): Columnas taxonómicas usadas para agrupar.
+
+    Returns:
+        dict: Resultado de aggregate_by_group.
+    """
+    species, groups, matrix = matrix_result
+    classified = np.array([name in taxonomy for name in species.tolist()], dtype=bool)
+    missing = int((~classified).sum())
+    if missing:
+        print(f"Advertencia: {missing} especies no tienen clasificación taxonómica y se omiten.")
+    table = {
+        'group_by': list(group_by),
+        'keys': [taxonomy[name] for name in species[classified].tolist()],
+        'value_columns': list(groups),
+        'values': matrix[classified].astype(np.int64),
+    }
+    return aggregate_by_group(table)
+
+# Función para ejecutar todas las etapas a partir de una configuración
+def run_pipeline(config, force=(), report=None):
+    """
+    Ejecuta las etapas C1 -> C3 -> C4 -> C5 usando la caché de resultados.
+
+    Args:
+        config (dict): Configuración del análisis (ver la documentación del módulo).
+        force (iterable): Etapas que se vuelven a ejecutar aunque estén en la caché.
+        report (RunReport): Informe donde se miden las etapas (default: uno nuevo, no se guarda).
+
+    Returns:
+        dict: Resultado de cada etapa ejecutada.
+    """
+    report = report or RunReport('pipeline')
+    cache = StageCache(config.get('cache_dir', 'pipeline_cache'), force)
+    group_by = tuple(config.get('group_by', DEFAULT_GROUP_BY))
+    results = {}
+
+    # C1: filtro de KOs
+    ko_groups = config.get('ko_groups', {})
+    ko_key = stage_key('ko_filter', ko_groups, [config['species_ko_file']] + [spec['kos_file'] for spec in ko_groups.values()])
+    with report.stage('ko_filter') as record:
+        # Las líneas leídas se registran durante la lectura (ninguna si el resultado viene de la caché)
+        results['ko_filter'] = cache.run('ko_filter', ko_key,
+                                         lambda: run_ko_filter(config['species_ko_file'], ko_groups, record), record)
+        record.details['groups'] = len(ko_groups)
+
+    main_species = sorted(read_species(config['main_species_file']))
+
+    # C3: MAST y grupos de motivos
+    mast_config = config.get('mast')
+    upstream = [ko_key]
+    if mast_config:
+        species_file = mast_config.get('species_file')
+        species_ids = read_species_ids(species_file) if species_file else main_species
+        mast_inputs = [mast_config['meme_file'], species_file or config['main_species_file'], mast_config['species_folder']]
+        mast_params = {name: mast_config.get(name) for name in MAST_RUN_PARAMS}
+        mast_key = stage_key('mast', mast_params, mast_inputs)
+        with report.stage('mast') as record:
+            # Con trabajos fallidos la tabla no se guarda, para reintentarlos en la siguiente ejecución
+            results['mast'] = cache.run('mast', mast_key, lambda: run_mast_stage(mast_config, species_ids, record), record,
+                                        suffix='.npz', save=MastHitTable.save, load=MastHitTable.load,
+                                        keep=lambda table: not record.details.get('failed'))
+            record.add_records(len(species_ids))
+            mast_failed = record.details.get('failed', [])
+
+        # Especies de cada grupo de motivos con el umbral de p-valor, a partir de la tabla guardada;
+        # las especies fallidas entran en la clave para no reutilizar resultados incompletos
+        motif_groups = mast_config.get('motif_groups', {})
+        max_pvalue = mast_config.get('max_pvalue')
+        groups_key = stage_key('motif_groups', {'motif_groups': motif_groups, 'max_pvalue': max_pvalue,
+                                                'failed': mast_failed}, [], [mast_key])
+        with report.stage('motif_groups') as record:
+            results['motif_groups'] = cache.run('motif_groups', groups_key,
+                                                lambda: results['mast'].membership_sets(motif_groups, max_pvalue), record)
+            record.add_records(len(results['mast']))
+        upstream.append(groups_key)
+
+    # C4: matriz de presencia/ausencia
+    species_dict = dict(results['ko_filter'])
+    species_dict.update(results.get('motif_groups', {}))
+    matrix_key = stage_key('matrix', {}, [config['main_species_file']], upstream)
+    with report.stage('matrix') as record:
+        results['matrix'] = cache.run('matrix', matrix_key, lambda: build_presence_matrix(main_species, species_dict), record)
+        species, groups, matrix = results['matrix']
+        if config.get('matrix_output'):
+            output_format = config.get('matrix_format', 'tsv')
+            with record.step('write_matrix'):
+                WRITERS[output_format](config['matrix_output'], species, groups, matrix)
+        record.add_records(len(species))
+    for group, count in conservation_counts(groups, matrix).items():
+        print(f"{group}: {count} especies conservadas")
+
+    # C5: conservación por grupo taxonómico
+    if config.get('taxonomy_file'):
+        class_key = stage_key('classes', list(group_by), [config['taxonomy_file']], [matrix_key])
+        with report.stage('classes') as record:
+            with record.step('read_taxonomy'):
+                taxonomy = read_taxonomy(config['taxonomy_file'], group_by)
+            results['classes'] = cache.run('classes', class_key, lambda: run_class_stage(results['matrix'], taxonomy, group_by), record)
+            if config.get('class_output'):
+                with record.step('write_classes'):
+                    write_aggregation(results['classes'], config['class_output'])
+            record.add_records(results['classes']['total_species'])
+            if config.get('heatmap_output'):
+                # Importación diferida: matplotlib solo es necesario si se pide el mapa de calor
+                from C6_Heatmap import render_heatmap
+                classes = results['classes']
+                with record.step('heatmap'):
+                    render_heatmap(classes['sums'], [' / '.join(key) for key in classes['groups']],
+                                   [column_label(name) for name in classes['value_columns']], config['heatmap_output'])
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('config', help="Archivo de configuración JSON")
+    parser.add_argument('--force', action='append', default=[], choices=STAGES,
+                        help="Volver a ejecutar una etapa aunque esté en la caché (se puede repetir)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report = report_from_args('pipeline', args)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    run_pipeline(config, args.force, report)
+    print("Análisis completado.")
+    finish_report(report, args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import gzip
+
+# Firma de los archivos comprimidos con gzip
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Función para abrir un archivo de texto, comprimido o no
+def open_text(filename):
+    """
+    Abre un archivo de texto para lectura, descomprimiéndolo si está en formato gzip.
+
+    Args:
+        filename (str): Ruta del archivo, comprimido con gzip o sin comprimir.
+
+    Returns:
+        file: Objeto de archivo en modo texto.
+    """
+    with open(filename, 'rb') as file:
+        is_gzip = file.read(2) == GZIP_MAGIC
+    if is_gzip:
+        return gzip.open(filename, 'rt')
+    return open(filename, 'r')
+
+# Función para leer secuencias en formato FASTA de una en una
+def iter_fasta(filename, lowercase=False):
+    """
+    Lee un archivo FASTA como flujo, devolviendo una secuencia cada vez.
+
+    Solo se mantiene en memoria la secuencia que se está leyendo, por lo que el uso de
+    memoria depende del registro más largo y no del tamaño total del archivo.
+
+    Args:
+        filename (str): Nombre del archivo FASTA (puede estar comprimido con gzip).
+        lowercase (bool): Si es True, las secuencias se convierten a minúsculas durante la lectura.
+
+    Yields:
+        tuple: Identificador de la secuencia (sin el ">") y secuencia.
+    """
+    with open_text(filename) as file:
+        current_seq_id = None
+        current_seq = []
+        for line in file:
+            line = line.strip()
+            if line.startswith(">"):
+                if current_seq_id:
+                    yield current_seq_id, ''.join(current_seq)
+                current_seq_id = line[1:]  # Guardar el identificador sin el ">"
+                current_seq = []
+            else:
+                current_seq.append(line.lower() if lowercase else line)
+        # Devolver la última secuencia
+        if current_seq_id:
+            yield current_seq_id, ''.join(current_seq)
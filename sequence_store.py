@@ -0,0 +1,236 @@
+"""
+Almacén de secuencias empaquetadas con 2 o 4 bits por base, mapeado en memoria.
+
+El almacén solo reduce el tamaño de la entrada (una cuarta o media parte del FASTA) y
+permite que los procesos de overlap_analysis compartan las páginas del archivo en lugar de
+recibir copias de las secuencias. La búsqueda de motivos no se hace sobre los bytes
+empaquetados: cada registro se desempaqueta y se decodifica a texto antes de recorrerlo.
+
+    python sequence_store.py secuencias.ur secuencias.store
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from sequence_io import iter_fasta
+
+# Alfabeto del almacén: las cuatro bases primero (códigos de 2 bits) y después los códigos IUPAC
+ALPHABET = 'acgtrykmswbdhvn-'
+
+# Sufijo del índice que acompaña al archivo de datos
+INDEX_SUFFIX = '.idx.json'
+
+# Tabla de traducción de bytes a códigos (255 = carácter no admitido)
+_ENCODE = np.full(256, 255, dtype=np.uint8)
+for _code, _char in enumerate(ALPHABET):
+    _ENCODE[ord(_char)] = _code
+    _ENCODE[ord(_char.upper())] = _code
+_DECODE = np.frombuffer(ALPHABET.encode(), dtype=np.uint8)
+
+# Función para convertir una secuencia en códigos del alfabeto
+def encode_sequence(sequence):
+    """
+    Convierte una secuencia en un arreglo de códigos del alfabeto del almacén.
+
+    Args:
+        sequence (str): Secuencia de nucleótidos (mayúsculas o minúsculas, códigos IUPAC admitidos).
+
+    Returns:
+        ndarray: Códigos uint8, de 0 a 15.
+
+    Raises:
+        ValueError: Si la secuencia contiene caracteres fuera del alfabeto IUPAC.
+    """
+    codes = _ENCODE[np.frombuffer(sequence.encode('latin-1'), dtype=np.uint8)]
+    if codes.size and codes.max() == 255:
+        bad = sequence[int(np.argmax(codes == 255))]
+        raise ValueError(f"Carácter no admitido en la secuencia: {bad!r}")
+    return codes
+
+# Función para empaquetar códigos con 2 o 4 bits por base
+def pack_codes(codes):
+    """
+    Empaqueta los códigos de una secuencia: 2 bits por base si solo contiene A, C, G y T,
+    y 4 bits por base si contiene otros códigos IUPAC.
+
+    Args:
+        codes (ndarray): Códigos uint8 de la secuencia.
+
+    Returns:
+        tuple: Bytes empaquetados (ndarray uint8) y número de bits por base (2 o 4).
+    """
+    bits = 2 if not codes.size or codes.max() < 4 else 4
+    per_byte = 8 // bits
+    padded = np.zeros(-(-len(codes) // per_byte) * per_byte, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    groups = padded.reshape(-1, per_byte)
+    packed = np.zeros(len(groups), dtype=np.uint8)
+    for index in range(per_byte):
+        packed |= groups[:, index] << (8 - bits * (index + 1))
+    return packed, bits
+
+# Función para desempaquetar los códigos de una secuencia
+def unpack_codes(packed, length, bits):
+    """
+    Desempaqueta los códigos de una secuencia guardada con pack_codes.
+
+    Args:
+        packed (ndarray): Bytes empaquetados (puede ser una vista de un archivo mapeado en memoria).
+        length (int): Número de bases de la secuencia.
+        bits (int): Bits por base (2 o 4).
+
+    Returns:
+        ndarray: Códigos uint8 de la secuencia.
+    """
+    per_byte = 8 // bits
+    mask = (1 << bits) - 1
+    shifts = np.arange(8 - bits, -1, -bits, dtype=np.uint8)
+    codes = (np.asarray(packed)[:, None] >> shifts) & mask
+    return codes.reshape(-1)[:length]
+
+# Función para convertir un archivo FASTA (o .ur) en un almacén empaquetado
+def build_sequence_store(fasta_file, store_path):
+    """
+    Convierte un archivo FASTA o .ur en un almacén binario empaquetado con un índice de registros.
+
+    El archivo de datos contiene las secuencias empaquetadas una tras otra; el índice
+    ('<store_path>.idx.json') guarda, en el orden del archivo original, el identificador,
+    desplazamiento, longitud y bits por base de cada registro. Los identificadores repetidos
+    se conservan como registros distintos, igual que al leer el FASTA como flujo.
+
+    Args:
+        fasta_file (str): Archivo FASTA o .ur (puede estar comprimido con gzip).
+        store_path (str): Ruta del archivo de datos del almacén.
+    """
+    records = []
+    offset = 0
+    with open(store_path, 'wb') as data:
+        for seq_id, seq in iter_fasta(fasta_file):
+            packed, bits = pack_codes(encode_sequence(seq))
+            data.write(packed.tobytes())
+            records.append([seq_id, offset, len(seq), bits])
+            offset += len(packed)
+    with open(store_path + INDEX_SUFFIX, 'w') as f:
+        json.dump(records, f)
+
+# Almacén de secuencias empaquetadas y mapeadas en memoria
+class SequenceStore:
+    """
+    Almacén de secuencias empaquetadas con 2 o 4 bits por base, abierto como archivo mapeado
+    en memoria de solo lectura. Varios procesos pueden abrir el mismo almacén y compartir
+    las páginas del archivo sin copiarlo. Los registros se identifican por su número de orden,
+    ya que un identificador puede repetirse; store[seq_id] y get_by_id devuelven el primer
+    registro con ese identificador.
+
+    Args:
+        store_path (str): Ruta del archivo de datos creado con build_sequence_store.
+    """
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        with open(store_path + INDEX_SUFFIX, 'r') as f:
+            self.records = json.load(f)
+        # Números de orden de los registros de cada identificador
+        self._by_id = {}
+        for record, entry in enumerate(self.records):
+            self._by_id.setdefault(entry[0], []).append(record)
+        size = os.path.getsize(store_path)
+        self._data = np.memmap(store_path, dtype=np.uint8, mode='r') if size else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, seq_id):
+        return seq_id in self._by_id
+
+    def __getitem__(self, seq_id):
+        return self.get_by_id(seq_id)
+
+    def __iter__(self):
+        """
+        Recorre las secuencias en el orden del archivo original como pares (identificador, secuencia).
+        """
+        for record in range(len(self.records)):
+            yield self.seq_id(record), self.get(record)
+
+    def ids(self):
+        """
+        Devuelve los identificadores de los registros en el orden del archivo original.
+        """
+        return [entry[0] for entry in self.records]
+
+    def records_for(self, seq_id):
+        """
+        Devuelve los números de orden de los registros con un identificador (lista vacía si no existe).
+        """
+        return list(self._by_id.get(seq_id, []))
+
+    def seq_id(self, record):
+        """
+        Devuelve el identificador de un registro.
+        """
+        return self.records[record][0]
+
+    def length(self, record):
+        """
+        Devuelve el número de bases de un registro.
+        """
+        return self.records[record][2]
+
+    def packed(self, record):
+        """
+        Devuelve los bytes empaquetados de un registro como vista del archivo, sin copiarlos.
+        """
+        _, offset, length, bits = self.records[record]
+        return self._data[offset:offset + -(-length * bits // 8)]
+
+    def codes(self, record):
+        """
+        Devuelve los códigos de un registro desempaquetados desde el archivo.
+        """
+        _, _, length, bits = self.records[record]
+        return unpack_codes(self.packed(record), length, bits)
+
+    def get(self, record):
+        """
+        Devuelve la secuencia de un registro en minúsculas, leyendo solo sus bytes del archivo.
+
+        Args:
+            record (int): Número de orden del registro en el archivo original.
+
+        Returns:
+            str: Secuencia en minúsculas.
+        """
+        return _DECODE[self.codes(record)].tobytes().decode('ascii')
+
+    def get_by_id(self, seq_id):
+        """
+        Devuelve la secuencia del primer registro con un identificador.
+
+        Args:
+            seq_id (str): Identificador de la secuencia.
+
+        Returns:
+            str: Secuencia en minúsculas.
+
+        Raises:
+            KeyError: Si ningún registro tiene ese identificador.
+        """
+        if seq_id not in self._by_id:
+            raise KeyError(f"La secuencia '{seq_id}' no está en el almacén '{self.store_path}'.")
+        return self.get(self._by_id[seq_id][0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte un archivo FASTA o .ur en un almacén de secuencias empaquetado.")
+    parser.add_argument('fasta_file', help="Archivo FASTA o .ur de entrada (puede estar comprimido con gzip)")
+    parser.add_argument('store_path', help="Archivo de datos del almacén de salida")
+    args = parser.parse_args()
+
+    build_sequence_store(args.fasta_file, args.store_path)
+    store = SequenceStore(args.store_path)
+    print(f"Almacén creado en '{args.store_path}' con {len(store)} secuencias.")
+
+if __name__ == '__main__':
+    main()
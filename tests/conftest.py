@@ -0,0 +1,59 @@
+import os
+import stat
+import sys
+
+import pytest
+
+# Los módulos del análisis están en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# MAST de prueba: registra cada llamada; si el archivo .ur contiene 'fail' deja un mast.xml
+# truncado y termina con código 2, y en otro caso copia tests/data/mast.xml a la carpeta de salida
+STUB = '''#!{python}
+import os
+import sys
+
+meme_file, ur_file, _, output_folder = sys.argv[1:5]
+with open(os.environ['STUB_MAST_LOG'], 'a') as log:
+    log.write(os.path.basename(ur_file) + '\\n')
+with open({result!r}) as f:
+    result = f.read()
+os.makedirs(output_folder, exist_ok=True)
+with open(ur_file) as f:
+    failed = 'fail' in f.read()
+with open(os.path.join(output_folder, 'mast.xml'), 'w') as f:
+    f.write(result[:len(result) // 2] if failed else result)
+if failed:
+    sys.stderr.write('error simulado\\n')
+    sys.exit(2)
+'''
+
+
+class StubMast:
+    """
+    Ejecutable 'mast' de prueba, instalado al principio del PATH.
+    """
+
+    def __init__(self, folder):
+        self.path = folder / 'mast'
+        self.path.write_text(STUB.format(python=sys.executable, result=os.path.join(DATA, 'mast.xml')))
+        self.path.chmod(self.path.stat().st_mode | stat.S_IXUSR)
+        self.log = folder / 'calls.log'
+
+    def calls(self):
+        """
+        Devuelve los archivos .ur con los que se llamó a MAST, ordenados.
+        """
+        return sorted(self.log.read_text().split()) if self.log.exists() else []
+
+
+@pytest.fixture
+def stub_mast(tmp_path, monkeypatch):
+    folder = tmp_path / 'bin'
+    folder.mkdir()
+    stub = StubMast(folder)
+    monkeypatch.setenv('STUB_MAST_LOG', str(stub.log))
+    monkeypatch.setenv('PATH', str(folder) + os.pathsep + os.environ.get('PATH', ''))
+    return stub
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from C6_Heatmap import read_class_table
+from class_aggregation import aggregate_by_group, read_combined_columns, write_aggregation
+
+HEADER = 'ID\tKEGG Phylum\tKEGG Class\tTaxonomy ID\tSigE_KO\tSigE_motivo\n'
+ROWS = [
+    'sp1\tFirmicutes\tBacilli\t11\t1\t0\n',
+    'sp2\tFirmicutes\tClostridia\t12\t1\t1\n',
+    'sp3\tFirmicutes\tBacilli\t13\t0\t1\n',
+]
+
+
+def write_table(tmp_path, rows, header=HEADER):
+    path = tmp_path / 'combined.tsv'
+    path.write_text(header + ''.join(rows))
+    return str(path)
+
+
+def test_value_columns_are_detected_from_the_header(tmp_path):
+    table = read_combined_columns(write_table(tmp_path, ROWS))
+
+    assert table['keys'] == [('Bacilli',), ('Clostridia',), ('Bacilli',)]
+    assert table['value_columns'] == ['SigE_KO', 'SigE_motivo']
+    assert table['values'].tolist() == [[1, 0], [1, 1], [0, 1]]
+
+
+def test_rows_with_a_wrong_field_count_are_not_misaligned(tmp_path):
+    # Una fila con un campo de menos y otra con uno de más suman tantos campos como la tabla
+    rows = ['sp1\tFirmicutes\tBacilli\t11\t1\n', 'sp2\tFirmicutes\tClostridia\t12\t1\t1\textra\n', ROWS[2]]
+    table = read_combined_columns(write_table(tmp_path, rows), value_columns=['SigE_KO'])
+
+    assert table['keys'] == [('Bacilli',), ('Clostridia',), ('Bacilli',)]
+    assert table['values'].tolist() == [[1], [1], [0]]
+
+
+def test_missing_group_by_column_is_a_clear_error(tmp_path):
+    with pytest.raises(ValueError, match="'KEGG Order'"):
+        read_combined_columns(write_table(tmp_path, ROWS), group_by=('KEGG Order',))
+
+
+@pytest.mark.parametrize('group_by, key_header, label', [
+    (('KEGG Class',), ['Class'], 'Class'),
+    (('KEGG Phylum',), ['KEGG Phylum'], 'KEGG Phylum'),
+    (('KEGG Phylum', 'KEGG Class'), ['KEGG Phylum', 'KEGG Class'], 'KEGG Phylum / KEGG Class'),
+])
+def test_percentage_header_names_the_grouping(tmp_path, group_by, key_header, label):
+    result = aggregate_by_group(read_combined_columns(write_table(tmp_path, ROWS), group_by))
+    output = str(tmp_path / 'classes.txt')
+    write_aggregation(result, output)
+
+    with open(output) as f:
+        header = f.readline().rstrip('\n').split('\t')
+    assert header[:len(key_header)] == key_header
+    assert f'SigE KO % by {label}' in header
+
+    # C6 encuentra las columnas de porcentaje por grupo con cualquier agrupación
+    row_labels, column_labels, matrix = read_class_table(output, 'pct_class')
+    assert column_labels == ['SigE KO', 'SigE Motif']
+    assert np.allclose(matrix, result['pct_by_group'].round(2))
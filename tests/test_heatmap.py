@@ -0,0 +1,13 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+from C6_Heatmap import render_heatmap
+
+
+def test_render_keeps_the_global_matplotlib_settings(tmp_path):
+    family, serif = list(plt.rcParams['font.family']), list(plt.rcParams['font.serif'])
+    output = tmp_path / 'heatmap.png'
+    render_heatmap(np.array([[1, 2], [3, 4]]), ['Bacilli', 'Clostridia'], ['SigE KO', 'SigE Motif'], str(output), dpi=50)
+
+    assert output.stat().st_size > 0
+    assert list(plt.rcParams['font.family']) == family and list(plt.rcParams['font.serif']) == serif
@@ -0,0 +1,75 @@
+import pytest
+
+from incremental import init_state, update_state, write_outputs
+from pipeline import run_pipeline
+
+KO_LINES = {
+    'sp1': 'K00001 K00002 sp1',
+    'sp2': 'K00001 sp2',
+    'sp3': 'K00002 K00003 K00001 sp3',
+    'sp4': 'K00003 sp4',
+    'bad': 'K00001 K00002 bad',
+}
+TAXONOMY = {'sp1': 'Bacilli', 'sp2': 'Clostridia', 'sp3': 'Bacilli', 'sp4': 'Clostridia', 'bad': 'Bacilli'}
+
+
+@pytest.fixture
+def make_config(tmp_path, stub_mast):
+    (tmp_path / 'panel.txt').write_text('K00001\nK00002\n')
+    (tmp_path / 'motifs.meme').write_text('MEME version 4\n')
+    (tmp_path / 'tax.tsv').write_text('ID\tKEGG Class\n' + ''.join(f'{name}\t{rank}\n' for name, rank in TAXONOMY.items()))
+    species_folder = tmp_path / 'species'
+    species_folder.mkdir()
+    for name in KO_LINES:
+        (species_folder / f'{name}.ur').write_text(f'>{name}\n' + ('fail\n' if name == 'bad' else 'acgt\n'))
+
+    def make(name, species):
+        folder = tmp_path / name
+        folder.mkdir()
+        config = {
+            'cache_dir': str(folder / 'cache'),
+            'state_dir': str(folder / 'state'),
+            'species_ko_file': str(folder / 'species_ko.txt'),
+            'main_species_file': str(folder / 'main.txt'),
+            'ko_groups': {'SigE_KO': {'kos_file': str(tmp_path / 'panel.txt'), 'min_kos': 2}},
+            'mast': {
+                'meme_file': str(tmp_path / 'motifs.meme'),
+                'species_folder': str(species_folder),
+                'output_folder': str(folder / 'mast_out'),
+                'motif_groups': {'SigE_motivo': ['MEME-1'], 'SpoIIID_motivo': ['MEME-2']},
+                'max_pvalue': 1e-4,
+            },
+            'taxonomy_file': str(tmp_path / 'tax.tsv'),
+            'matrix_output': str(folder / 'matrix.tsv'),
+            'class_output': str(folder / 'classes.txt'),
+        }
+        write_species(config, species)
+        return config
+
+    return make
+
+
+def write_species(config, species):
+    with open(config['species_ko_file'], 'w') as f:
+        f.writelines(KO_LINES[name] + '\n' for name in species)
+    with open(config['main_species_file'], 'w') as f:
+        f.writelines(name + '\n' for name in species)
+
+
+def read_outputs(config):
+    with open(config['matrix_output']) as matrix, open(config['class_output']) as classes:
+        return matrix.read(), classes.read()
+
+
+def test_update_matches_a_full_run(make_config):
+    full = make_config('full', ['sp1', 'sp2', 'sp3', 'bad'])
+    run_pipeline(full)
+
+    incremental = make_config('incremental', ['sp1', 'sp2', 'sp4'])
+    init_state(incremental)
+    write_species(incremental, ['sp1', 'sp2', 'sp3', 'bad'])
+    state = update_state(incremental, added=['sp3', 'bad'], removed=['sp4'])
+
+    write_outputs(incremental, state)
+    assert read_outputs(incremental) == read_outputs(full)
+    assert 'bad' not in state.mast_hits['SigE_motivo']
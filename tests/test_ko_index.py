@@ -0,0 +1,101 @@
+import json
+import os
+import random
+import shutil
+
+import pytest
+
+import ko_index
+from C1_KO_Filter import find_species_with_min_kos_and_fixed_ko
+from ko_index import META_FILE, KOIndex, build_ko_index
+
+# Más de 64 KOs distintos, para que cada fila ocupe varias palabras de bits
+KOS = [f'K{number:05d}' for number in range(150)]
+QUERIES = [
+    (KOS[:10], 3, None),
+    (KOS[:10], 2, KOS[3]),
+    (KOS[60:70] + ['K99999'], 1, None),
+    (KOS[100:140], 4, KOS[120]),
+    (KOS[:5], 0, None),
+    (KOS[:5], 1, 'K99999'),
+]
+
+
+def write_species(path, n_species, seed):
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        for index in range(n_species):
+            kos = rng.choices(KOS, k=rng.randint(0, 40))
+            f.write(' '.join(kos + [f'sp{index}']) + '  \n')
+
+
+@pytest.fixture
+def species_file(tmp_path):
+    path = str(tmp_path / 'species_ko.txt')
+    write_species(path, 300, seed=1)
+    return path
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+    real_build = ko_index.build_ko_index
+
+    def counting_build(file_name, index_dir):
+        calls.append(file_name)
+        real_build(file_name, index_dir)
+
+    monkeypatch.setattr(ko_index, 'build_ko_index', counting_build)
+    return calls
+
+
+@pytest.mark.parametrize('kos_list, min_kos, fixed_ko', QUERIES)
+def test_index_matches_the_linear_scan(species_file, tmp_path, kos_list, min_kos, fixed_ko):
+    build_ko_index(species_file, str(tmp_path / 'index'))
+    index = KOIndex(str(tmp_path / 'index'))
+
+    assert len(index) == 300
+    assert (index.find_species(set(kos_list), min_kos, fixed_ko)
+            == find_species_with_min_kos_and_fixed_ko(species_file, set(kos_list), min_kos, fixed_ko))
+
+
+def test_unchanged_file_reuses_the_index(species_file, tmp_path, builds):
+    KOIndex.open_or_build(species_file, str(tmp_path / 'index'))
+    KOIndex.open_or_build(species_file, str(tmp_path / 'index'))
+
+    assert builds == [species_file]
+
+
+def test_index_is_rebuilt_when_the_size_changes(species_file, tmp_path, builds):
+    index_dir = str(tmp_path / 'index')
+    KOIndex.open_or_build(species_file, index_dir)
+    write_species(species_file, 310, seed=2)
+    index = KOIndex.open_or_build(species_file, index_dir)
+
+    assert len(builds) == 2 and len(index) == 310
+    kos_list, min_kos, fixed_ko = QUERIES[0]
+    assert index.find_species(set(kos_list), min_kos, fixed_ko) == find_species_with_min_kos_and_fixed_ko(
+        species_file, set(kos_list), min_kos, fixed_ko)
+
+
+def test_index_is_rebuilt_when_the_mtime_changes(species_file, tmp_path, builds):
+    index_dir = str(tmp_path / 'index')
+    KOIndex.open_or_build(species_file, index_dir)
+    stat = os.stat(species_file)
+    os.utime(species_file, (stat.st_atime, stat.st_mtime + 10))
+    KOIndex.open_or_build(species_file, index_dir)
+
+    assert len(builds) == 2
+
+
+def test_index_is_rebuilt_for_another_path(species_file, tmp_path, builds):
+    index_dir = str(tmp_path / 'index')
+    KOIndex.open_or_build(species_file, index_dir)
+    # Mismo contenido, tamaño y fecha, pero otro archivo
+    copy = str(tmp_path / 'copy.txt')
+    shutil.copy2(species_file, copy)
+    KOIndex.open_or_build(copy, index_dir)
+
+    assert builds == [species_file, copy]
+    with open(os.path.join(index_dir, META_FILE)) as f:
+        assert json.load(f)['source'] == os.path.abspath(copy)
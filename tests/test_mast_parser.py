@@ -0,0 +1,77 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from mast_parser import (MAST_FOLDER_SUFFIX, MastHitTable, MastParseError, load_mast_results, parse_mast_folder,
+                         parse_mast_txt, parse_mast_xml)
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Motivos y sitios (secuencia, índice del motivo, posición, p-valor) de los dos archivos de ejemplo
+EXPECTED_MOTIFS = [('GGAATWTT', 'MEME-1'), ('CATATAGT', 'MEME-2')]
+EXPECTED_HITS = [('seq1', 0, 5, 3.4e-06), ('seq1', 1, 23, 1.0e-05), ('seq2', 1, 1, 2.0e-04)]
+
+
+def test_parse_mast_xml():
+    motifs, hits = parse_mast_xml(os.path.join(DATA, 'mast.xml'))
+    assert motifs == EXPECTED_MOTIFS
+    assert hits == EXPECTED_HITS
+
+
+def test_parse_mast_txt():
+    motifs, hits = parse_mast_txt(os.path.join(DATA, 'mast.txt'))
+    assert motifs == EXPECTED_MOTIFS
+    assert hits == EXPECTED_HITS
+
+
+@pytest.fixture
+def mast_folder(tmp_path):
+    # sp1 con mast.xml, sp2 solo con mast.txt y sp3 sin resultados
+    for species_id, name in (('sp1', 'mast.xml'), ('sp2', 'mast.txt'), ('sp3', None)):
+        folder = tmp_path / (species_id + MAST_FOLDER_SUFFIX)
+        folder.mkdir()
+        if name:
+            shutil.copy(os.path.join(DATA, name), folder / name)
+    return tmp_path
+
+
+def test_table_columns(mast_folder):
+    table = load_mast_results(str(mast_folder), workers=1)
+    assert table.species == ['sp1', 'sp2']
+    assert table.motifs == EXPECTED_MOTIFS
+    assert table.positions.tolist() == [5, 23, 1] * 2
+    assert np.allclose(table.pvalues, [3.4e-06, 1.0e-05, 2.0e-04] * 2)
+    assert table.membership_sets({'SigE': ['MEME-1'], 'SpoIIID': ['CATATAGT']}, max_pvalue=1e-4) == \
+        {'SigE': {'sp1', 'sp2'}, 'SpoIIID': {'sp1', 'sp2'}}
+
+
+def test_save_and_load(mast_folder, tmp_path):
+    table = load_mast_results(str(mast_folder), workers=1)
+    table.save(str(tmp_path / 'hits.npz'))
+    loaded = MastHitTable.load(str(tmp_path / 'hits.npz'))
+    assert loaded.species == table.species and loaded.motifs == table.motifs
+    assert loaded.positions.tolist() == table.positions.tolist()
+
+
+def test_species_filter(mast_folder):
+    table = load_mast_results(str(mast_folder), workers=1, species_ids=['sp2', 'sp3', 'missing'])
+    assert table.species == ['sp2']
+
+
+@pytest.mark.parametrize('name', ['mast.xml', 'mast.txt'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_truncated_output_names_the_folder(mast_folder, name, workers):
+    folder = mast_folder / ('bad' + MAST_FOLDER_SUFFIX)
+    folder.mkdir()
+    with open(os.path.join(DATA, name)) as f:
+        text = f.read()
+    (folder / name).write_text(text[:len(text) // 2])
+
+    with pytest.raises(MastParseError, match='bad_mast_out'):
+        parse_mast_folder(str(folder))
+    with pytest.raises(MastParseError, match='bad_mast_out'):
+        load_mast_results(str(mast_folder), workers=workers)
+    # Sin la especie afectada, la lectura termina
+    assert load_mast_results(str(mast_folder), workers=workers, species_ids=['sp1']).species == ['sp1']
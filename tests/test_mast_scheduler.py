@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+import C3_Concatenated_MAST
+import mast_scheduler
+from instrumentation import StageRecord
+from mast_scheduler import MANIFEST_NAME, load_manifest, schedule_mast_jobs
+
+@pytest.fixture
+def workspace(tmp_path, stub_mast):
+
+    species_folder = tmp_path / 'species'
+    species_folder.mkdir()
+    (species_folder / 'sp1.ur').write_text('>sp1\nacgt\n')
+    (species_folder / 'sp2.ur').write_text('>sp2\nacgt\n')
+    (species_folder / 'bad.ur').write_text('>bad\nfail\n')
+    meme_file = tmp_path / 'motifs.meme'
+    meme_file.write_text('MEME version 4\n')
+
+    def run(species_ids, jobs=2, mast_command=str(stub_mast.path), stage=None):
+        return schedule_mast_jobs(str(meme_file), species_ids, str(species_folder), str(tmp_path / 'out'),
+                                  jobs=jobs, mast_command=mast_command, stage=stage)
+
+    return run, stub_mast.calls, tmp_path / 'out'
+
+
+def test_exit_codes_are_recorded(workspace):
+    run, calls, output = workspace
+    manifest, ran = run(['sp1', 'bad', 'missing'])
+
+    assert manifest['sp1']['status'] == 'ok' and manifest['sp1']['returncode'] == 0
+    assert manifest['bad']['status'] == 'failed' and manifest['bad']['returncode'] == 2
+    assert 'error simulado' in manifest['bad']['stderr']
+    assert 'missing' not in manifest
+    assert calls() == ['bad.ur', 'sp1.ur']
+    assert load_manifest(str(output)) == manifest
+    assert ran == ['sp1', 'bad']
+
+
+def test_missing_executable_is_a_failed_job(workspace, tmp_path):
+    run, _, _ = workspace
+    manifest, _ = run(['sp1'], mast_command=str(tmp_path / 'no_mast'))
+
+    assert manifest['sp1']['status'] == 'failed'
+    assert manifest['sp1']['returncode'] is None
+
+
+def test_finished_species_are_skipped_and_failed_ones_rerun(workspace):
+    run, calls, _ = workspace
+    run(['sp1', 'bad'])
+    _, ran = run(['sp1', 'sp2', 'bad'])
+
+    assert calls() == ['bad.ur', 'bad.ur', 'sp1.ur', 'sp2.ur']
+    assert ran == ['sp2', 'bad']
+
+
+def test_interrupted_job_is_rerun_on_resume(workspace, monkeypatch):
+    run, calls, output = workspace
+    real_job = mast_scheduler.run_mast_job
+
+    # MAST escribe su salida, pero la ejecución se interrumpe antes de registrar el resultado
+    def interrupted_job(*args, **kwargs):
+        real_job(*args, **kwargs)
+        raise RuntimeError('interrumpido')
+
+    monkeypatch.setattr(mast_scheduler, 'run_mast_job', interrupted_job)
+    with pytest.raises(RuntimeError):
+        run(['sp1'], jobs=1)
+    assert os.path.exists(output / 'sp1_mast_out' / 'mast.xml')
+    assert load_manifest(str(output))['sp1']['status'] == 'running'
+
+    monkeypatch.setattr(mast_scheduler, 'run_mast_job', real_job)
+    manifest, _ = run(['sp1'])
+    assert calls() == ['sp1.ur', 'sp1.ur']
+    assert manifest['sp1']['status'] == 'ok'
+
+
+def test_folders_from_before_the_manifest_count_as_finished(workspace):
+    run, calls, output = workspace
+    legacy = output / 'sp1_mast_out'
+    legacy.mkdir(parents=True)
+    (legacy / 'mast.txt').write_text('resultado anterior\n')
+
+    _, ran = run(['sp1'])
+    assert calls() == [] and ran == []
+    assert not (output / MANIFEST_NAME).exists()
+
+
+def test_stage_records_only_jobs_run_in_this_call(workspace):
+    run, _, _ = workspace
+    first = StageRecord('mast')
+    run(['sp1', 'bad'], stage=first)
+    assert first.steps['mast_job']['calls'] == 2
+    assert sorted(key for _, _, key in first.slowest) == ['bad', 'sp1']
+
+    second = StageRecord('mast')
+    run(['sp1', 'sp2', 'bad'], stage=second)
+    assert second.steps['mast_job']['calls'] == 2
+    assert sorted(key for _, _, key in second.slowest) == ['bad', 'sp2']
+
+
+def test_c3_counts_only_jobs_run_in_this_call(workspace, tmp_path, monkeypatch):
+    run, _, _ = workspace
+    run(['sp1'])
+    (tmp_path / 'ids.txt').write_text('sp1\nsp2\nbad\n')
+    answers = iter([str(tmp_path / 'motifs.meme'), str(tmp_path / 'ids.txt'), str(tmp_path / 'species'), str(tmp_path / 'out')])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    monkeypatch.setattr('sys.argv', ['C3_Concatenated_MAST.py', '--report', str(tmp_path / 'report.json')])
+    C3_Concatenated_MAST.main()
+
+    with open(tmp_path / 'report.json') as f:
+        stage = json.load(f)['stages'][0]
+    assert stage['records'] == 2
+    assert stage['details'] == {'skipped': 1, 'failed': ['bad']}
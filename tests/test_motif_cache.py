@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+import motif_cache
+from motif_cache import CachedMotifScanner, MotifCache, sequence_hash
+from motif_scanner import MotifScanner
+
+MOTIFS = ['ACGT', 'GTA', 'TTTT', 'CGTAC']
+SEQUENCES = ['ACGTACGTAC', 'TTTTTACGTT', 'GGGGGGGG', 'ACGTACGTAC']
+
+
+def stored_bytes(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute('SELECT COALESCE(SUM(size), 0) FROM positions').fetchone()[0]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MotifCache(str(tmp_path / 'motifs.sqlite'))
+    yield cache
+    cache.close()
+
+
+def test_warm_scan_matches_cold_scan(cache):
+    scanner = MotifScanner(MOTIFS)
+    cold = [CachedMotifScanner(MOTIFS, cache).scan(sequence) for sequence in SEQUENCES]
+    warm = [CachedMotifScanner(MOTIFS, cache).scan(sequence) for sequence in SEQUENCES]
+
+    assert cold == warm == [scanner.scan(sequence) for sequence in SEQUENCES]
+
+
+def test_hits_and_misses_are_counted(cache):
+    scanner = CachedMotifScanner(MOTIFS, cache)
+    scanner.scan(SEQUENCES[0])
+    assert (cache.hits, cache.misses) == (0, len(MOTIFS))
+
+    # La misma secuencia otra vez y un motivo nuevo: solo el motivo nuevo se busca
+    CachedMotifScanner(MOTIFS + ['GGG'], cache).scan(SEQUENCES[0])
+    assert (cache.hits, cache.misses) == (len(MOTIFS), len(MOTIFS) + 1)
+
+
+def test_total_bytes_follows_inserts_replacements_and_deletions(cache):
+    cache.store('a', {'ACGT': [(0, 4), (4, 8)], 'GTA': []})
+    cache.store('a', {'ACGT': [(0, 4)]})
+    cache.store('b', {'TTTT': [(1, 5)]})
+    assert cache.total_bytes() == stored_bytes(cache.path)
+
+
+def test_size_limit_is_enforced(tmp_path):
+    path = str(tmp_path / 'motifs.sqlite')
+    cache = MotifCache(path, max_bytes=600)
+    scanner = CachedMotifScanner(MOTIFS, cache)
+    for index in range(6):
+        scanner.scan('ACGT' * (index + 1))
+        assert cache.total_bytes() <= 600
+    assert cache.total_bytes() == stored_bytes(path)
+
+    # Las entradas usadas hace más tiempo son las expulsadas
+    assert not cache.lookup(sequence_hash('ACGT'), MOTIFS)
+    assert len(cache.lookup(sequence_hash('ACGT' * 6), MOTIFS)) == len(MOTIFS)
+    cache.close()
+
+
+def test_existing_cache_without_meta_table_is_summed_on_open(tmp_path):
+    path = str(tmp_path / 'motifs.sqlite')
+    cache = MotifCache(path)
+    cache.store('a', {'ACGT': [(0, 4)]})
+    cache.close()
+    with sqlite3.connect(path) as connection:
+        connection.execute('DROP TABLE meta')
+
+    cache = MotifCache(path)
+    assert cache.total_bytes() == stored_bytes(path)
+    cache.close()
+
+
+def test_built_scanners_are_bounded(cache, monkeypatch):
+    monkeypatch.setattr(motif_cache, 'MAX_SCANNERS', 2)
+    scanner = CachedMotifScanner(MOTIFS, cache)
+    for motifs in (['ACGT'], ['GTA'], ['ACGT'], ['TTTT']):
+        scanner._scanner_for(motifs)
+
+    assert list(scanner._scanners) == [('ACGT',), ('TTTT',)]
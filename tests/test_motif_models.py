@@ -0,0 +1,81 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from motif_models import IUPAC_CODES, encode_bases, iupac_model, load_motif_models, pwm_model
+
+COMPLEMENT = str.maketrans('acgtn', 'tgcan')
+
+
+def reverse_complement(sequence):
+    return sequence.translate(COMPLEMENT)[::-1]
+
+
+def iupac_matches(motif, window):
+    return all(base in IUPAC_CODES[char] for char, base in zip(motif, window))
+
+
+def brute_force_sites(motif, sequence):
+    width = len(motif)
+    return [(start, start + width) for start in range(len(sequence) - width + 1)
+            if iupac_matches(motif, sequence[start:start + width])
+            or iupac_matches(motif, reverse_complement(sequence[start:start + width]))]
+
+
+@pytest.mark.parametrize('motif', ['gwwtrm', 'acnnnt', 'rrcgyy', 'bdhv'])
+def test_iupac_model_matches_the_expanded_consensus(motif):
+    sequence = ''.join(random.Random(motif).choices('acgt', k=2000))
+    assert iupac_model(motif).find(encode_bases(sequence)) == brute_force_sites(motif, sequence)
+
+
+def test_ambiguous_sequence_bases_only_match_n():
+    codes = encode_bases('aaNaa')
+    assert iupac_model('ana').find(codes) == [(1, 4)]
+    assert iupac_model('awa').find(codes) == []
+
+
+def test_reverse_strand_sites_are_reported_in_forward_coordinates():
+    # 'cgtt' es el complementario inverso de 'aacg'
+    sequence = 'ggggcgttgggg'
+    assert iupac_model('aacr').find(encode_bases(sequence)) == [(4, 8)]
+
+    probabilities = np.full((4, 4), 0.01)
+    probabilities[np.arange(4), [0, 0, 1, 2]] = 0.97
+    model = pwm_model('aacg', probabilities, np.full(4, 0.25), pvalue=0.005)
+    assert model.find(encode_bases(sequence)) == [(4, 8)]
+
+
+def test_pwm_threshold_follows_the_pvalue():
+    # Con fondo uniforme cada palabra de 4 bases tiene probabilidad 1/256: un p-valor de 0.01
+    # admite las dos palabras de mayor puntuación (2/256 < 0.01 < 3/256)
+    rng = np.random.default_rng(0)
+    probabilities = rng.dirichlet(np.ones(4), size=4)
+    background = np.full(4, 0.25)
+    model = pwm_model('m', probabilities, background, pvalue=0.01)
+
+    words = [''.join(word) for word in itertools.product('acgt', repeat=4)]
+    scores = np.array([model.window_scores(encode_bases(word))[0] for word in words])
+    assert np.count_nonzero(scores >= model.threshold) == 2
+    assert set(np.argsort(scores)[-2:].tolist()) == set(np.flatnonzero(scores >= model.threshold).tolist())
+
+
+def test_pwm_windows_with_ambiguous_bases_are_not_sites():
+    probabilities = np.full((3, 4), 0.25)
+    model = pwm_model('flat', probabilities, np.full(4, 0.25), pvalue=1.0)
+    assert model.find(encode_bases('acgnacg')) == [(0, 3), (4, 7)]
+
+
+def test_meme_motifs_are_namespaced_by_file(tmp_path):
+    meme = ('MEME version 4\n\nALPHABET= ACGT\n\nBackground letter frequencies\nA 0.3 C 0.2 G 0.2 T 0.3\n\n'
+            'MOTIF 1\nletter-probability matrix: alength= 4 w= 2\n0.9 0.03 0.03 0.04\n0.1 0.1 0.7 0.1\n')
+    (tmp_path / 'a.meme').write_text(meme)
+    (tmp_path / 'motifs.txt').write_text('ACGT\nGWWT\n')
+
+    names, models = load_motif_models(str(tmp_path / 'a.meme'))
+    assert names == ['a.meme:1'] and [model.name for model in models] == names
+    assert models[0].width == 2
+
+    names, models = load_motif_models(str(tmp_path / 'motifs.txt'))
+    assert names == ['acgt', 'gwwt'] and [model.name for model in models] == ['gwwt']
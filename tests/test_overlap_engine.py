@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from C2_Analysis_of_overlapping_motifs import check_superposition
+from motif_scanner import MotifScanner
+from overlap_engine import find_overlaps
+
+
+# Recorrido anidado original de C2: motivo1 -> motivo2 -> pos1 -> pos2
+def brute_force_overlaps(motif_positions1, motif_positions2):
+    return [(motif1, pos1, motif2, pos2)
+            for motif1, positions1 in motif_positions1.items()
+            for motif2, positions2 in motif_positions2.items()
+            for pos1 in positions1
+            for pos2 in positions2
+            if check_superposition(pos1, pos2)]
+
+
+# Posiciones distintas y ordenadas por inicio, como las devuelve el buscador de motivos;
+# incluye intervalos de longitud cero y muchos inicios repetidos
+def random_positions(rng, motifs, span, max_count):
+    positions = {}
+    for motif in motifs:
+        intervals = []
+        for _ in range(rng.randint(0, max_count)):
+            start = rng.randint(0, span)
+            intervals.append((start, start + rng.choice([0, 0, 1, 2, 3, 5, 8])))
+        positions[motif] = sorted(set(intervals))
+    return positions
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_random_intervals_match_brute_force(seed):
+    rng = random.Random(seed)
+    span = rng.choice([5, 20, 100])
+    motif_positions1 = random_positions(rng, [f'm1_{index}' for index in range(rng.randint(1, 4))], span, 15)
+    motif_positions2 = random_positions(rng, [f'm2_{index}' for index in range(rng.randint(1, 4))], span, 15)
+
+    assert find_overlaps(motif_positions1, motif_positions2) == brute_force_overlaps(motif_positions1, motif_positions2)
+
+
+def test_zero_length_and_equal_start_intervals():
+    motif_positions1 = {'': [(0, 0), (2, 2), (3, 3)], 'aa': [(2, 4), (3, 5)]}
+    motif_positions2 = {'a': [(2, 3), (3, 4)], 'b': [(2, 2), (2, 6)]}
+
+    overlaps = find_overlaps(motif_positions1, motif_positions2)
+    assert overlaps == brute_force_overlaps(motif_positions1, motif_positions2)
+    # Con la comprobación de C2, un intervalo vacío solo se solapa si queda estrictamente dentro de otro
+    assert ('', (3, 3), 'b', (2, 6)) in overlaps
+    assert ('', (2, 2), 'b', (2, 6)) not in overlaps
+    assert not any(pos2 == (2, 2) for _, _, _, pos2 in overlaps)
+
+
+def test_scanner_hits_match_brute_force():
+    rng = random.Random(1)
+    motifs1 = ['aa', 'at', 'tta', 'aaat', '']
+    motifs2 = ['ta', 'tt', 'aat', 'atta', 'a']
+    scanner = MotifScanner(motifs1 + motifs2)
+    sequence = ''.join(rng.choices('acgt', weights=[4, 1, 1, 4], k=2000))
+    hits = scanner.scan(sequence)
+    motif_positions1 = {motif: hits[motif] for motif in motifs1 if motif in hits}
+    motif_positions2 = {motif: hits[motif] for motif in motifs2 if motif in hits}
+
+    assert find_overlaps(motif_positions1, motif_positions2) == brute_force_overlaps(motif_positions1, motif_positions2)
+
+
+def test_empty_inputs():
+    assert find_overlaps({}, {'a': [(0, 1)]}) == []
+    assert find_overlaps({'a': []}, {'b': []}) == []
@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pytest
+
+from instrumentation import RunReport
+from mast_scheduler import load_manifest
+from pipeline import run_pipeline
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+@pytest.fixture
+def config(tmp_path, stub_mast):
+    (tmp_path / 'species_ko.txt').write_text('K00001 K00002 sp1\nK00001 bad\n')
+    (tmp_path / 'main.txt').write_text('sp1\nbad\n')
+    (tmp_path / 'panel.txt').write_text('K00001\nK00002\n')
+    (tmp_path / 'motifs.meme').write_text('MEME version 4\n')
+    species_folder = tmp_path / 'species'
+    species_folder.mkdir()
+    (species_folder / 'sp1.ur').write_text('>sp1\nacgt\n')
+    (species_folder / 'bad.ur').write_text('>bad\nfail\n')
+
+    # Carpeta de una ejecución anterior de una especie que ya no está en la lista
+    old = tmp_path / 'mast_out' / 'old_mast_out'
+    old.mkdir(parents=True)
+    shutil.copy(os.path.join(DATA, 'mast.xml'), old / 'mast.xml')
+
+    return {
+        'cache_dir': str(tmp_path / 'cache'),
+        'species_ko_file': str(tmp_path / 'species_ko.txt'),
+        'main_species_file': str(tmp_path / 'main.txt'),
+        'ko_groups': {'SigE_KO': {'kos_file': str(tmp_path / 'panel.txt'), 'min_kos': 1}},
+        'mast': {
+            'meme_file': str(tmp_path / 'motifs.meme'),
+            'species_folder': str(species_folder),
+            'output_folder': str(tmp_path / 'mast_out'),
+            'motif_groups': {'SigE_motivo': ['MEME-1']},
+        },
+    }
+
+
+def test_failed_mast_jobs_are_reported_and_not_parsed(config, stub_mast):
+    results = run_pipeline(config)
+
+    assert results['motif_groups'] == {'SigE_motivo': {'sp1'}}
+    assert load_manifest(config['mast']['output_folder'])['bad']['status'] == 'failed'
+    species, groups, matrix = results['matrix']
+    assert groups == ['SigE_KO', 'SigE_motivo']
+
+
+def test_incomplete_mast_results_are_not_cached(config, stub_mast):
+    run_pipeline(config)
+    run_pipeline(config)
+
+    # La tabla con un trabajo fallido no se reutiliza: el trabajo se reintenta y sp1 no se repite
+    assert stub_mast.calls() == ['bad.ur', 'bad.ur', 'sp1.ur']
+
+
+def test_ko_filter_records_scanned_lines(config):
+    report = RunReport('pipeline')
+    run_pipeline(config, report=report)
+    record = next(record for record in report.stages if record.name == 'ko_filter')
+
+    assert record.records == 2
+    assert record.details['groups'] == 1
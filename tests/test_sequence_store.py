@@ -0,0 +1,30 @@
+import pytest
+
+from sequence_io import iter_fasta
+from sequence_store import SequenceStore, build_sequence_store
+
+FASTA = '>seq1\nACGTACGTAC\n>seq2\nacgNNryk\n>seq1\nTTTT\n>empty\n\n'
+
+
+@pytest.fixture
+def store(tmp_path):
+    fasta_file = tmp_path / 'seqs.fa'
+    fasta_file.write_text(FASTA)
+    build_sequence_store(str(fasta_file), str(tmp_path / 'seqs.store'))
+    return SequenceStore(str(tmp_path / 'seqs.store')), str(fasta_file)
+
+
+def test_records_match_the_fasta(store):
+    store, fasta_file = store
+    assert list(store) == [(seq_id, seq.lower()) for seq_id, seq in iter_fasta(fasta_file)]
+
+
+def test_lookup_by_id_returns_the_first_record(store):
+    store, _ = store
+    assert store.records_for('seq1') == [0, 2]
+    assert store['seq1'] == store.get_by_id('seq1') == 'acgtacgtac'
+    assert store['seq2'] == 'acgnnryk'
+    assert 'empty' in store and store['empty'] == ''
+    assert 'missing' not in store and store.records_for('missing') == []
+    with pytest.raises(KeyError):
+        store['missing']